@@ -0,0 +1,222 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List, Tuple
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, script_dir)
+
+from domains.puzzle_generator import generate_puzzle
+from solver import ALGORITHMS, run_job, skip_reason
+
+DEFAULT_BUCKETS = [10, 16, 20, 24, 28]
+DEFAULT_ALGORITHMS = ['bfs', 'ids', 'ucs', 'astar_h1', 'astar_h2']
+DEFAULT_BATCH_SIZES = [1, 4, 16, 64, 256]
+WGC_START = ('0', '0', '0', '0')
+
+def bucket_label(depth: int, buckets: List[int]) -> str:
+    """Depth buckets are half-open ranges between consecutive lower bounds; the last one is open-ended."""
+    label = None
+    for i, lower in enumerate(buckets):
+        if depth >= lower:
+            upper = buckets[i + 1] if i + 1 < len(buckets) else None
+            label = f"{lower}-{upper - 1}" if upper is not None else f"{lower}+"
+    return label
+
+def generate_instance_set(seed: int, per_bucket: int, buckets: List[int], max_attempts: int = 200000) -> List[Tuple[str, Tuple[int, ...], int]]:
+    """
+    Seeded 8-puzzle instances, per_bucket of them for each optimal-depth bucket.
+    Optimal depths come from the exact distance table, so the same seed always
+    gives the same instance set.
+    """
+    from domains.eight_puzzle import EightPuzzleProblem
+    random.seed(seed)
+    counts = {bucket_label(lower, buckets): 0 for lower in buckets}
+    instances = []
+    seen = set()
+    for _ in range(max_attempts):
+        if all(count >= per_bucket for count in counts.values()):
+            break
+        state = generate_puzzle(shuffles=random.choice([10, 20, 40, 80, 200]))
+        if state in seen:
+            continue
+        seen.add(state)
+        depth = EightPuzzleProblem(state).heuristic(state, 'hstar')
+        label = bucket_label(depth, buckets)
+        if label is not None and counts[label] < per_bucket:
+            counts[label] += 1
+            instances.append((label, state, depth))
+    instances.sort(key=lambda instance: instance[2])
+    return instances
+
+def measure(job: Dict[str, Any], repeats: int) -> Dict[str, Any]:
+    runs = []
+    for _ in range(repeats):
+        job_result = run_job(job)
+        expanded = job_result['metrics']['nodes_expanded']
+        wall_time = job_result['wall_time']
+        runs.append({
+            'wall_time': wall_time,
+            'cpu_time': job_result['cpu_time'],
+            'nodes_per_sec': expanded / wall_time if wall_time > 0 else 0.0,
+        })
+
+    # Peak memory comes from one extra traced run, so tracing doesn't skew the timings.
+    tracemalloc.start()
+    run_job(job)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    wall_times = [run['wall_time'] for run in runs]
+    return {
+        'solution_cost': job_result['solution_cost'],
+        'solution_depth': job_result['solution_depth'],
+        'metrics': job_result['metrics'],
+        'runs': runs,
+        'median_wall_time': statistics.median(wall_times),
+        'min_wall_time': min(wall_times),
+        'median_nodes_per_sec': statistics.median(run['nodes_per_sec'] for run in runs),
+        'peak_memory_mb': peak / (1024 * 1024),
+    }
+
+def run_benchmarks(args: argparse.Namespace):
+    print(f"Generating instance set (seed {args.seed}, {args.per_bucket} per depth bucket)...")
+    instances = [('wgc', WGC_START, 7)] if not args.no_wgc else []
+    instances += generate_instance_set(args.seed, args.per_bucket, args.buckets)
+
+    results = []
+    for index, (label, state, depth) in enumerate(instances):
+        domain = 'wgc' if label == 'wgc' else '8puzzle'
+        for algo_key in args.algorithms:
+            if skip_reason(algo_key, domain):
+                continue
+            name, func, kwargs = ALGORITHMS[algo_key]
+            job = {'instance': index, 'domain': domain, 'state': state, 'packed': args.packed,
+                   'name': name, 'func': func, 'kwargs': kwargs}
+            measured = measure(job, args.repeats)
+            print(f"  [{label:>6}] {str(state):<30} {algo_key:<10} median {measured['median_wall_time']:8.4f}s | "
+                  f"{measured['median_nodes_per_sec']:>12,.0f} nodes/sec | peak {measured['peak_memory_mb']:7.2f} MB")
+            results.append({
+                'domain': domain, 'bucket': label, 'state': list(state), 'optimal_depth': depth,
+                'algorithm': algo_key, **measured,
+            })
+
+    report = {
+        'meta': {
+            'seed': args.seed, 'per_bucket': args.per_bucket, 'buckets': args.buckets,
+            'repeats': args.repeats, 'packed': args.packed, 'algorithms': args.algorithms,
+            'python': platform.python_version(), 'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=1)
+    print(f"\nWrote {len(results)} benchmark results to '{args.output}'.")
+
+def run_batch_sizes(args: argparse.Namespace):
+    """Times astar against astar_batched at each batch size on the same instances."""
+    from search_core import astar, astar_batched
+    instances = generate_instance_set(args.seed, args.per_bucket, args.buckets)
+
+    def job(index: int, state: Tuple[int, ...], func, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        return {'instance': index, 'domain': '8puzzle', 'state': state, 'packed': args.packed,
+                'name': func.__name__, 'func': func, 'kwargs': kwargs}
+
+    totals = {'scalar': 0.0}
+    totals.update({batch_size: 0.0 for batch_size in args.batch_sizes})
+    mismatches = 0
+    for index, (label, state, depth) in enumerate(instances):
+        scalar = measure(job(index, state, astar, {'heuristic_variant': args.heuristic}), args.repeats)
+        totals['scalar'] += scalar['median_wall_time']
+        line = f"  [{label:>6}] {str(state):<30} scalar {scalar['median_wall_time']:8.4f}s"
+        for batch_size in args.batch_sizes:
+            batched = measure(job(index, state, astar_batched, {'heuristic_variant': args.heuristic, 'batch_size': batch_size}), args.repeats)
+            totals[batch_size] += batched['median_wall_time']
+            if batched['metrics'] != scalar['metrics']:
+                mismatches += 1
+            line += f" | K={batch_size} {batched['median_wall_time']:8.4f}s"
+        print(line)
+
+    print(f"\nTotal median time over {len(instances)} instances ({args.heuristic}, {'packed' if args.packed else 'tuple'} states):")
+    print(f"  {'scalar':>8} {totals['scalar']:9.4f}s")
+    for batch_size in args.batch_sizes:
+        speedup = totals['scalar'] / totals[batch_size] if totals[batch_size] > 0 else 0.0
+        print(f"  {'K=' + str(batch_size):>8} {totals[batch_size]:9.4f}s | {speedup:5.2f}x vs scalar")
+    print(f"{mismatches} run(s) with metrics different from scalar astar.")
+
+def compare_results(args: argparse.Namespace) -> int:
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    def key(result: Dict[str, Any]) -> Tuple:
+        return (result['domain'], tuple(result['state']), result['algorithm'])
+
+    baseline_results = {key(result): result for result in baseline['results']}
+    regressions = 0
+    print(f"{'bucket':>7} {'algorithm':<10} {'state':<30} {'baseline':>10} {'candidate':>10} {'change':>8}")
+    for result in candidate['results']:
+        old = baseline_results.get(key(result))
+        if old is None:
+            continue
+        old_time, new_time = old['median_wall_time'], result['median_wall_time']
+        change = (new_time - old_time) / old_time if old_time > 0 else 0.0
+        flags = []
+        if change > args.threshold and new_time - old_time > args.min_seconds:
+            flags.append("SLOWER")
+            regressions += 1
+        if old['metrics']['nodes_expanded'] != result['metrics']['nodes_expanded'] or old['solution_cost'] != result['solution_cost']:
+            flags.append("METRICS CHANGED")
+        print(f"{result['bucket']:>7} {result['algorithm']:<10} {str(tuple(result['state'])):<30} "
+              f"{old_time:10.4f} {new_time:10.4f} {change:+8.1%} {' '.join(flags)}")
+
+    print(f"\n{regressions} slowdown(s) above {args.threshold:.0%}.")
+    return 1 if regressions else 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Reproducible benchmarks for the search algorithms.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Run the benchmark suite and write a JSON results file.')
+    run_parser.add_argument('--output', type=str, default='bench_results.json', help='Results file to write.')
+    run_parser.add_argument('--seed', type=int, default=0, help='Seed for the instance set.')
+    run_parser.add_argument('--per-bucket', type=int, default=3, help='Instances per optimal-depth bucket.')
+    run_parser.add_argument('--buckets', type=int, nargs='+', default=DEFAULT_BUCKETS, help='Lower bounds of the depth buckets.')
+    run_parser.add_argument('--repeats', type=int, default=3, help='Timed runs per (instance, algorithm).')
+    run_parser.add_argument('--algorithms', nargs='+', choices=list(ALGORITHMS), default=DEFAULT_ALGORITHMS, help='Algorithms to benchmark.')
+    run_parser.add_argument('--packed', action='store_true', help='Use packed 8-puzzle states.')
+    run_parser.add_argument('--no-wgc', action='store_true', help='Skip the WGC instance.')
+
+    batch_parser = subparsers.add_parser('batch', help='Time astar_batched against astar at each batch size and check their metrics agree (needs NumPy).')
+    batch_parser.add_argument('--seed', type=int, default=0, help='Seed for the instance set.')
+    batch_parser.add_argument('--per-bucket', type=int, default=2, help='Instances per optimal-depth bucket.')
+    batch_parser.add_argument('--buckets', type=int, nargs='+', default=DEFAULT_BUCKETS, help='Lower bounds of the depth buckets.')
+    batch_parser.add_argument('--repeats', type=int, default=3, help='Timed runs per (instance, batch size).')
+    batch_parser.add_argument('--batch-sizes', type=int, nargs='+', default=DEFAULT_BATCH_SIZES, help='Batch sizes to try.')
+    batch_parser.add_argument('--heuristic', type=str, choices=['h0', 'h1', 'h2'], default='h1', help='Heuristic for both searches.')
+    batch_parser.add_argument('--packed', action='store_true', help='Use packed 8-puzzle states.')
+
+    compare_parser = subparsers.add_parser('compare', help='Compare two results files and flag slowdowns.')
+    compare_parser.add_argument('baseline', type=str, help='Baseline results file.')
+    compare_parser.add_argument('candidate', type=str, help='Candidate results file.')
+    compare_parser.add_argument('--threshold', type=float, default=0.10, help='Relative slowdown to flag (0.10 = 10%%).')
+    compare_parser.add_argument('--min-seconds', type=float, default=0.001, help='Ignore slowdowns smaller than this many seconds.')
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        run_benchmarks(args)
+    elif args.command == 'batch':
+        run_batch_sizes(args)
+    else:
+        sys.exit(compare_results(args))
+
+if __name__ == "__main__":
+    main()
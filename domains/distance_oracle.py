@@ -0,0 +1,66 @@
+import argparse
+import mmap
+import os
+import sys
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from domains.eight_puzzle import GOAL_STATE, PackedEightPuzzleProblem, State, rank_state, unpack_state
+from domains.pattern_database import DEFAULT_CACHE_DIR
+
+# One distance byte per permutation rank; ranks outside the goal's component stay UNREACHED.
+STATE_SPACE_SIZE = 362880
+UNREACHED = 255
+DEFAULT_ORACLE_PATH = os.path.join(DEFAULT_CACHE_DIR, '8puzzle_goal123456780_distances.bin')
+
+def build_distance_table(goal_state: State = GOAL_STATE) -> bytearray:
+    """Backward BFS from goal_state over the whole 8-puzzle state space."""
+    table = bytearray([UNREACHED]) * STATE_SPACE_SIZE
+    table[rank_state(goal_state)] = 0
+    problem = PackedEightPuzzleProblem(goal_state)
+    frontier = [problem.initial_state]
+    distance = 0
+
+    while frontier:
+        distance += 1
+        next_frontier = []
+        for state in frontier:
+            for action in problem.actions(state):
+                child_state = problem.result(state, action)
+                rank = rank_state(unpack_state(child_state))
+                if table[rank] == UNREACHED:
+                    table[rank] = distance
+                    next_frontier.append(child_state)
+        frontier = next_frontier
+
+    return table
+
+def write_distance_table(path: str = DEFAULT_ORACLE_PATH, goal_state: State = GOAL_STATE) -> bytearray:
+    table = build_distance_table(goal_state)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(table)
+    os.replace(temp_path, path)
+    return table
+
+def load_distance_table(path: str = DEFAULT_ORACLE_PATH):
+    """Memory-maps the distance table, building it first if the file is missing."""
+    if not os.path.exists(path) or os.path.getsize(path) != STATE_SPACE_SIZE:
+        write_distance_table(path)
+    with open(path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the exact 8-puzzle distance table used by the oracle.")
+    parser.add_argument('--output', type=str, default=DEFAULT_ORACLE_PATH, help='Where to write the distance table.')
+    args = parser.parse_args()
+
+    table = write_distance_table(args.output)
+    reachable = STATE_SPACE_SIZE - table.count(UNREACHED)
+    max_distance = max(d for d in table if d != UNREACHED)
+    print(f"Wrote {args.output}: {reachable} reachable states, maximum distance {max_distance}.")
+
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,126 @@
-from typing import Tuple, List, Optional
+from typing import Any, Tuple, List, Optional
 
 State = Tuple[int, ...]
+PackedState = int
 GOAL_STATE = (1, 2, 3, 4, 5, 6, 7, 8, 0)
 
+# Action ids used by the packed representation; the names are only needed for printing.
+ACTION_NAMES = ('Move Up', 'Move Down', 'Move Left', 'Move Right')
+MOVE_UP, MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT = range(4)
+_MOVE_OFFSETS = (-3, 3, -1, 1)
+INVERSE_ACTION = (MOVE_DOWN, MOVE_UP, MOVE_RIGHT, MOVE_LEFT)
+
+def _blank_moves(blank_index: int) -> Tuple[int, ...]:
+    row, col = divmod(blank_index, 3)
+    moves = []
+    if row > 0: moves.append(MOVE_UP)
+    if row < 2: moves.append(MOVE_DOWN)
+    if col > 0: moves.append(MOVE_LEFT)
+    if col < 2: moves.append(MOVE_RIGHT)
+    return tuple(moves)
+
+# Precomputed blank-neighbor tables, indexed by blank position.
+BLANK_ACTIONS = tuple(_blank_moves(i) for i in range(9))
+BLANK_ACTION_NAMES = tuple(tuple(ACTION_NAMES[a] for a in moves) for moves in BLANK_ACTIONS)
+SWAP_INDEX = tuple(
+    tuple(i + _MOVE_OFFSETS[a] if a in BLANK_ACTIONS[i] else -1 for a in range(4))
+    for i in range(9)
+)
+_NAME_TO_ACTION = {name: a for a, name in enumerate(ACTION_NAMES)}
+
+# Packed layout: bits 0-3 hold the blank position, bits 4(i+1)..4(i+1)+3 hold the tile at cell i.
+_SHIFTS = tuple(4 * (i + 1) for i in range(9))
+
+def pack_state(state: State) -> PackedState:
+    packed = state.index(0)
+    for i, tile in enumerate(state):
+        packed |= tile << _SHIFTS[i]
+    return packed
+
+def unpack_state(packed: PackedState) -> State:
+    return tuple((packed >> shift) & 0xF for shift in _SHIFTS)
+
+_FACTORIALS = (40320, 5040, 720, 120, 24, 6, 2, 1, 1)
+
+def rank_state(state: State) -> int:
+    """Lehmer-code rank of a permutation of 0..8, in the range [0, 9!)."""
+    rank = 0
+    for i in range(9):
+        smaller = 0
+        tile = state[i]
+        for j in range(i + 1, 9):
+            if state[j] < tile:
+                smaller += 1
+        rank += smaller * _FACTORIALS[i]
+    return rank
+
+def unrank_state(rank: int) -> State:
+    remaining = list(range(9))
+    state = []
+    for i in range(9):
+        digit, rank = divmod(rank, _FACTORIALS[i])
+        state.append(remaining.pop(digit))
+    return tuple(state)
+
+def _require_numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("Batched expansion (expand_batch / astar_batched) requires NumPy: pip install numpy") from e
+    return numpy
+
 class EightPuzzleProblem:
     def __init__(self, initial_state: State):
         self._initial_state = initial_state
         self._goal_state = GOAL_STATE
         self._goal_positions = {val: i for i, val in enumerate(self._goal_state)}
+        self._pattern_database = None
+        self._distance_table = None
+        # Per-tile, per-position heuristic contributions; a move changes exactly one tile's entry.
+        self._misplaced_table = tuple(
+            tuple(0 if tile == 0 or self._goal_state[pos] == tile else 1 for pos in range(9))
+            for tile in range(9)
+        )
+        self._manhattan_table = tuple(
+            tuple(self._tile_distance(tile, pos) for pos in range(9))
+            for tile in range(9)
+        )
+        self._batch_tables = None
+
+    def _tile_distance(self, tile: int, pos: int) -> int:
+        if tile == 0:
+            return 0
+        row, col = divmod(pos, 3)
+        goal_row, goal_col = divmod(self._goal_positions[tile], 3)
+        return abs(row - goal_row) + abs(col - goal_col)
 
     @property
     def initial_state(self) -> State:
         return self._initial_state
 
+    @property
+    def goal_state(self) -> State:
+        return self._goal_state
+
     def is_goal(self, state: State) -> bool:
         return state == self._goal_state
 
-    def actions(self, state: State) -> List[str]:
+    def predecessors(self, state: State) -> List[Tuple[str, State]]:
+        """(action, previous_state) pairs such that result(previous_state, action) == state."""
         blank_index = state.index(0)
-        row, col = divmod(blank_index, 3)
-        valid_actions = []
-        if row > 0: valid_actions.append('Move Up')
-        if row < 2: valid_actions.append('Move Down')
-        if col > 0: valid_actions.append('Move Left')
-        if col < 2: valid_actions.append('Move Right')
-        return valid_actions
+        preds = []
+        for action in BLANK_ACTIONS[blank_index]:
+            previous = self.result(state, ACTION_NAMES[action])
+            preds.append((ACTION_NAMES[INVERSE_ACTION[action]], previous))
+        return preds
+
+    def actions(self, state: State) -> Tuple[str, ...]:
+        return BLANK_ACTION_NAMES[state.index(0)]
 
     def result(self, state: State, action: str) -> State:
         blank_index = state.index(0)
+        swap_index = SWAP_INDEX[blank_index][_NAME_TO_ACTION[action]]
         new_state_list = list(state)
-        
-        swap_index = -1
-        if action == 'Move Up':
-            swap_index = blank_index - 3
-        elif action == 'Move Down':
-            swap_index = blank_index + 3
-        elif action == 'Move Left':
-            swap_index = blank_index - 1
-        elif action == 'Move Right':
-            swap_index = blank_index + 1
-        
         new_state_list[blank_index], new_state_list[swap_index] = new_state_list[swap_index], new_state_list[blank_index]
         return tuple(new_state_list)
 
@@ -53,9 +134,99 @@ class EightPuzzleProblem:
             return self._h1_misplaced_tiles(state)
         elif variant == 'h2':
             return self._h2_manhattan_distance(state)
+        elif variant == 'h3':
+            return self._h3_pattern_database(state)
+        elif variant == 'hstar':
+            return self._exact_distance(state)
         else:
             raise ValueError(f"Unknown heuristic variant: {variant}")
 
+    def reverse_heuristic(self, state: State, variant: str) -> int:
+        """Estimate of the cost from the initial state to state, for backward search."""
+        if variant == 'h0':
+            return 0
+        initial = self._initial_state
+        if variant == 'h1':
+            return sum(1 for i in range(9) if state[i] != 0 and state[i] != initial[i])
+        elif variant == 'h2':
+            distance = 0
+            for i in range(9):
+                tile_value = state[i]
+                if tile_value != 0:
+                    current_row, current_col = divmod(i, 3)
+                    target_row, target_col = divmod(initial.index(tile_value), 3)
+                    distance += abs(current_row - target_row) + abs(current_col - target_col)
+            return distance
+        raise ValueError(f"Heuristic variant {variant} has no reverse form.")
+
+    def _delta_table(self, variant: str):
+        if variant == 'h1':
+            return self._misplaced_table
+        elif variant == 'h2':
+            return self._manhattan_table
+        return None
+
+    def heuristic_delta(self, parent_h: int, state: State, action: str, variant: str) -> Optional[int]:
+        """
+        Returns the heuristic of result(state, action) given the heuristic of
+        state, or None if the variant has no incremental form.
+        """
+        if variant == 'h0':
+            return parent_h
+        table = self._delta_table(variant)
+        if table is None:
+            return None
+        blank_index = state.index(0)
+        swap_index = SWAP_INDEX[blank_index][_NAME_TO_ACTION[action]]
+        tile = state[swap_index]
+        return parent_h + table[tile][blank_index] - table[tile][swap_index]
+
+    def _numpy_tables(self):
+        """NumPy copies of SWAP_INDEX and the heuristic tables, built on first use."""
+        if self._batch_tables is None:
+            np = _require_numpy()
+            self._batch_tables = {
+                'swap': np.array(SWAP_INDEX, dtype=np.int64),
+                'h1': np.array(self._misplaced_table, dtype=np.int64),
+                'h2': np.array(self._manhattan_table, dtype=np.int64),
+            }
+        return self._batch_tables
+
+    def _batch_child_h(self, np, parent_h, rows, tiles, blank_pos, swap_pos, children: List[Any], variant: str) -> List[int]:
+        if variant == 'h0':
+            return [0] * len(children)
+        table = self._numpy_tables().get(variant)
+        if table is None:
+            return [self.heuristic(child, variant) for child in children]
+        parent_h = np.asarray(parent_h, dtype=np.int64)
+        return (parent_h[rows] + table[tiles, blank_pos] - table[tiles, swap_pos]).tolist()
+
+    def expand_batch(self, states: List[State], parent_h: List[int], variant: str) -> Tuple[List[int], List[Any], List[Any], List[int]]:
+        """
+        Expands several states at once with NumPy. Returns (parent index, action,
+        child state, child heuristic) as parallel lists, ordered by parent and then
+        in actions() order, so consumers see the same sequence as one-by-one expansion.
+        """
+        np = _require_numpy()
+        tables = self._numpy_tables()
+        grid = np.array(states, dtype=np.uint8)
+        blanks = grid.argmin(axis=1)
+        swaps = tables['swap'][blanks]
+        rows, action_ids = np.nonzero(swaps >= 0)
+        blank_pos = blanks[rows]
+        swap_pos = swaps[rows, action_ids]
+
+        children = grid[rows]
+        cells = np.arange(len(rows))
+        tiles = children[cells, swap_pos].astype(np.int64)
+        children[cells, blank_pos] = tiles
+        children[cells, swap_pos] = 0
+        child_states = list(map(tuple, children.tolist()))
+
+        child_h = self._batch_child_h(np, parent_h, rows, tiles, blank_pos, swap_pos, child_states, variant)
+        actions = [ACTION_NAMES[a] for a in action_ids.tolist()]
+        return rows.tolist(), actions, child_states, child_h
+
     def _h1_misplaced_tiles(self, state: State) -> int:
         misplaced = 0
         for i in range(9):
@@ -72,4 +243,111 @@ class EightPuzzleProblem:
                 goal_index = self._goal_positions[tile_value]
                 goal_row, goal_col = divmod(goal_index, 3)
                 distance += abs(current_row - goal_row) + abs(current_col - goal_col)
-        return distance
\ No newline at end of file
+        return distance
+
+    def _h3_pattern_database(self, state: State) -> int:
+        if self._pattern_database is None:
+            from domains.pattern_database import PatternDatabaseHeuristic
+            self._pattern_database = PatternDatabaseHeuristic(self._goal_state)
+        return self._pattern_database(state)
+
+    def _exact_distance(self, state: State) -> int:
+        if self._distance_table is None:
+            if self._goal_state != GOAL_STATE:
+                raise ValueError("The distance oracle is only built for GOAL_STATE.")
+            from domains.distance_oracle import load_distance_table
+            self._distance_table = load_distance_table()
+        return self._distance_table[rank_state(state)]
+
+class PackedEightPuzzleProblem(EightPuzzleProblem):
+    """
+    Same puzzle as EightPuzzleProblem, but states are single ints (see pack_state)
+    and actions are small ints from ACTION_NAMES. Successors come from the
+    precomputed blank-neighbor tables, so no tuples are built during search.
+    Use decode_state/action_name to turn states and actions back into the
+    tuple/string form for printing.
+    """
+
+    def __init__(self, initial_state: State):
+        super().__init__(initial_state)
+        self._packed_initial = pack_state(initial_state)
+        self._packed_goal = pack_state(self._goal_state)
+
+    @property
+    def initial_state(self) -> PackedState:
+        return self._packed_initial
+
+    def decode_state(self, state: PackedState) -> State:
+        return unpack_state(state)
+
+    def action_name(self, action: int) -> str:
+        return ACTION_NAMES[action]
+
+    @property
+    def goal_state(self) -> PackedState:
+        return self._packed_goal
+
+    def is_goal(self, state: PackedState) -> bool:
+        return state == self._packed_goal
+
+    def predecessors(self, state: PackedState) -> List[Tuple[int, PackedState]]:
+        return [(INVERSE_ACTION[action], self.result(state, action)) for action in BLANK_ACTIONS[state & 0xF]]
+
+    def actions(self, state: PackedState) -> Tuple[int, ...]:
+        return BLANK_ACTIONS[state & 0xF]
+
+    def result(self, state: PackedState, action: int) -> PackedState:
+        blank_index = state & 0xF
+        swap_index = SWAP_INDEX[blank_index][action]
+        tile = (state >> _SHIFTS[swap_index]) & 0xF
+        return state - (tile << _SHIFTS[swap_index]) + (tile << _SHIFTS[blank_index]) - blank_index + swap_index
+
+    def step_cost(self, state: PackedState, action: int) -> int:
+        return 1
+
+    def heuristic(self, state: PackedState, variant: str) -> int:
+        if variant == 'h0':
+            return 0
+        table = self._delta_table(variant)
+        if table is None:
+            return super().heuristic(unpack_state(state), variant)
+        total = 0
+        state >>= 4
+        for pos in range(9):
+            total += table[state & 0xF][pos]
+            state >>= 4
+        return total
+
+    def reverse_heuristic(self, state: PackedState, variant: str) -> int:
+        return super().reverse_heuristic(unpack_state(state), variant)
+
+    def expand_batch(self, states: List[PackedState], parent_h: List[int], variant: str) -> Tuple[List[int], List[int], List[PackedState], List[int]]:
+        """Packed-state expand_batch: states are a 1-D int64 array and the move is the same bit arithmetic as result()."""
+        np = _require_numpy()
+        tables = self._numpy_tables()
+        shifts = np.array(_SHIFTS, dtype=np.int64)
+        packed = np.array(states, dtype=np.int64)
+        blanks = packed & 0xF
+        swaps = tables['swap'][blanks]
+        rows, action_ids = np.nonzero(swaps >= 0)
+        blank_pos = blanks[rows]
+        swap_pos = swaps[rows, action_ids]
+
+        parents = packed[rows]
+        tiles = (parents >> shifts[swap_pos]) & 0xF
+        children = parents - (tiles << shifts[swap_pos]) + (tiles << shifts[blank_pos]) - blank_pos + swap_pos
+        child_states = children.tolist()
+
+        child_h = self._batch_child_h(np, parent_h, rows, tiles, blank_pos, swap_pos, child_states, variant)
+        return rows.tolist(), action_ids.tolist(), child_states, child_h
+
+    def heuristic_delta(self, parent_h: int, state: PackedState, action: int, variant: str) -> Optional[int]:
+        if variant == 'h0':
+            return parent_h
+        table = self._delta_table(variant)
+        if table is None:
+            return None
+        blank_index = state & 0xF
+        swap_index = SWAP_INDEX[blank_index][action]
+        tile = (state >> _SHIFTS[swap_index]) & 0xF
+        return parent_h + table[tile][blank_index] - table[tile][swap_index]
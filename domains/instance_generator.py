@@ -0,0 +1,234 @@
+import argparse
+import os
+import random
+import sys
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from domains.eight_puzzle import unrank_state
+from domains.n_puzzle import INVERSE_ACTION, goal_state, is_solvable, neighbor_tables
+
+State = Tuple[int, ...]
+
+SAMPLING_MODES = ('walk', 'uniform', 'depth')
+
+def _require_numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("Bulk instance generation (generate_batch) requires NumPy: pip install numpy") from e
+    return numpy
+
+def random_walk(shuffles: int, size: int = 3, rng=random) -> State:
+    """
+    A walk of shuffles moves from the goal that never undoes its previous move, so
+    every move can add depth (unlike puzzle_generator.generate_puzzle).
+    """
+    blank_actions, swap_index = neighbor_tables(size)
+    state = list(goal_state(size))
+    blank = len(state) - 1
+    previous = None
+    for _ in range(shuffles):
+        action = rng.choice([a for a in blank_actions[blank] if previous is None or a != INVERSE_ACTION[previous]])
+        target = swap_index[blank][action]
+        state[blank], state[target] = state[target], 0
+        blank, previous = target, action
+    return tuple(state)
+
+def uniform_solvable(size: int = 3, rng=random) -> State:
+    """
+    A uniformly random solvable state: a random permutation, with its first two
+    tiles swapped if it is unsolvable. The swap flips the inversion parity without
+    moving the blank, pairing each unsolvable permutation with one solvable one.
+    """
+    state = list(range(size * size))
+    rng.shuffle(state)
+    if not is_solvable(state, size):
+        i, j = [pos for pos, tile in enumerate(state) if tile != 0][:2]
+        state[i], state[j] = state[j], state[i]
+    return tuple(state)
+
+_depth_ranks: Dict[int, List[int]] = {}
+
+def states_at_depth_count(depth: int) -> int:
+    return len(_ranks_at_depth(depth))
+
+def _ranks_at_depth(depth: int) -> List[int]:
+    """Permutation ranks of the 8-puzzle states exactly depth moves from the goal, from the distance oracle."""
+    ranks = _depth_ranks.get(depth)
+    if ranks is None:
+        from domains.distance_oracle import load_distance_table
+        table = load_distance_table()[:]
+        ranks = [rank for rank, distance in enumerate(table) if distance == depth]
+        _depth_ranks[depth] = ranks
+    return ranks
+
+def exact_depth(depth: int, size: int = 3, rng=random) -> State:
+    """A uniformly random 8-puzzle state whose optimal solution has exactly depth moves."""
+    if size != 3:
+        raise ValueError("Exact-depth sampling needs the 8-puzzle distance oracle (size 3).")
+    ranks = _ranks_at_depth(depth)
+    if not ranks:
+        raise ValueError(f"No 8-puzzle state is exactly {depth} moves from the goal.")
+    return unrank_state(rng.choice(ranks))
+
+def sample_state(sampling: str, size: int = 3, shuffles: int = 100, depth: Optional[int] = None, rng=random) -> State:
+    if sampling == 'walk':
+        return random_walk(shuffles, size, rng)
+    elif sampling == 'uniform':
+        return uniform_solvable(size, rng)
+    elif sampling == 'depth':
+        return exact_depth(depth, size, rng)
+    raise ValueError(f"Unknown sampling mode: {sampling}")
+
+def sample_unique(count: int, sampling: str, size: int = 3, shuffles: int = 100, depth: Optional[int] = None,
+                  rng=random, max_attempts: Optional[int] = None,
+                  sampler: Optional[Callable[[], State]] = None) -> List[State]:
+    """
+    count distinct states, in the order they were drawn (from sampler() if given).
+    Gives up after max_attempts draws (default 20 per state, at least 1000) with a
+    ValueError, since some settings (a few shuffles, a small depth) have fewer
+    distinct states than requested.
+    """
+    if max_attempts is None:
+        max_attempts = max(1000, 20 * count)
+    if sampling == 'depth' and size == 3 and states_at_depth_count(depth) < count:
+        raise ValueError(f"Only {states_at_depth_count(depth)} 8-puzzle state(s) lie exactly {depth} moves from the goal.")
+    if sampler is None:
+        sampler = lambda: sample_state(sampling, size, shuffles, depth, rng)
+    states = {}
+    for _ in range(max_attempts):
+        if len(states) == count:
+            break
+        states[sampler()] = None
+    if len(states) < count:
+        raise ValueError(f"Found only {len(states)} distinct instance(s) in {max_attempts} draws; "
+                         f"use more --shuffles, another --sampling mode or fewer --instances.")
+    return list(states)
+
+def _batch_uniform(np, rng, count: int, size: int):
+    cells = size * size
+    states = rng.permuted(np.tile(np.arange(cells, dtype=np.uint8), (count, 1)), axis=1)
+    # Inversions among non-blank tiles, accumulated one column at a time.
+    inversions = np.zeros(count, dtype=np.int64)
+    for i in range(cells - 1):
+        left = states[:, i:i + 1]
+        inversions += ((states[:, i + 1:] < left) & (states[:, i + 1:] != 0) & (left != 0)).sum(axis=1)
+    if size % 2 == 1:
+        unsolvable = inversions % 2 == 1
+    else:
+        blank_row = np.argmax(states == 0, axis=1) // size
+        unsolvable = (inversions + size - 1 - blank_row) % 2 == 1
+    blank = np.argmax(states == 0, axis=1)
+    first = np.where(blank == 0, 1, 0)
+    second = np.where(blank <= 1, 2, 1)
+    rows = np.flatnonzero(unsolvable)
+    a, b = states[rows, first[rows]], states[rows, second[rows]]
+    states[rows, first[rows]], states[rows, second[rows]] = b, a
+    return states
+
+def _batch_walk(np, rng, count: int, size: int, shuffles: int):
+    blank_actions, swap_index = neighbor_tables(size)
+    cells = size * size
+    swap = np.array(swap_index, dtype=np.int64)
+    inverse = np.array(INVERSE_ACTION, dtype=np.int64)
+    states = np.tile(np.array(goal_state(size), dtype=np.uint8), (count, 1))
+    rows = np.arange(count)
+    blank = np.full(count, cells - 1, dtype=np.int64)
+    previous = np.full(count, -1, dtype=np.int64)
+    for _ in range(shuffles):
+        legal = swap[blank] >= 0
+        legal[rows[previous >= 0], inverse[previous[previous >= 0]]] = False
+        action = np.argmax(rng.random((count, 4)) * legal, axis=1)
+        target = swap[blank, action]
+        states[rows, blank] = states[rows, target]
+        states[rows, target] = 0
+        blank, previous = target, action
+    return states
+
+def _batch_unrank(np, ranks):
+    factorials = (40320, 5040, 720, 120, 24, 6, 2, 1, 1)
+    remaining = np.tile(np.arange(9, dtype=np.uint8), (len(ranks), 1))
+    ranks = ranks.astype(np.int64)
+    states = np.empty((len(ranks), 9), dtype=np.uint8)
+    rows = np.arange(len(ranks))
+    for i in range(9):
+        digit, ranks = np.divmod(ranks, factorials[i])
+        states[:, i] = remaining[rows, digit]
+        keep = np.ones(remaining.shape, dtype=bool)
+        keep[rows, digit] = False
+        remaining = remaining[keep].reshape(len(ranks), 8 - i)
+    return states
+
+def generate_batch(count: int, sampling: str, size: int = 3, shuffles: int = 100,
+                   depth: Optional[int] = None, rng=None):
+    """
+    count states (with repeats) as a (count, size * size) uint8 array, drawn with a
+    numpy.random.Generator: the vectorized form of sample_state.
+    """
+    np = _require_numpy()
+    rng = rng if rng is not None else np.random.default_rng()
+    if sampling == 'walk':
+        return _batch_walk(np, rng, count, size, shuffles)
+    elif sampling == 'uniform':
+        return _batch_uniform(np, rng, count, size)
+    elif sampling == 'depth':
+        if size != 3:
+            raise ValueError("Exact-depth sampling needs the 8-puzzle distance oracle (size 3).")
+        ranks = np.asarray(_ranks_at_depth(depth), dtype=np.int64)
+        if not len(ranks):
+            raise ValueError(f"No 8-puzzle state is exactly {depth} moves from the goal.")
+        return _batch_unrank(np, ranks[rng.integers(len(ranks), size=count)])
+    raise ValueError(f"Unknown sampling mode: {sampling}")
+
+def write_instances(path: str, count: int, sampling: str, size: int = 3, shuffles: int = 100,
+                    depth: Optional[int] = None, seed: Optional[int] = None, chunk_size: int = 100000) -> int:
+    """
+    Streams count states to path, one comma-separated state per line (the run.py
+    initial_state format), generating chunk_size at a time. Returns count.
+    """
+    np = _require_numpy()
+    rng = np.random.default_rng(seed)
+    with open(path, 'w') as f:
+        f.write(f"# {count} {size}x{size} instance(s), sampling={sampling}"
+                f"{f' shuffles={shuffles}' if sampling == 'walk' else ''}"
+                f"{f' depth={depth}' if sampling == 'depth' else ''} seed={seed}\n")
+        for start in range(0, count, chunk_size):
+            batch = generate_batch(min(chunk_size, count - start), sampling, size, shuffles, depth, rng)
+            f.write("\n".join(",".join(map(str, row)) for row in batch.tolist()))
+            f.write("\n")
+    return count
+
+def read_instances(path: str) -> Iterator[State]:
+    """Yields the states in an instances file, skipping blank lines and # comments."""
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                yield tuple(int(tile) for tile in line.split(','))
+            except ValueError:
+                raise ValueError(f"{path}:{line_number}: expected comma-separated integers, got {line!r}") from None
+
+def main():
+    parser = argparse.ArgumentParser(description="Write sliding-tile puzzle instances to a file for run.py --instances-file.")
+    parser.add_argument('output', type=str, help='Where to write the instances, one comma-separated state per line.')
+    parser.add_argument('--count', type=int, default=1000, help='Number of instances (repeats are possible).')
+    parser.add_argument('--size', type=int, default=3, help='Board width.')
+    parser.add_argument('--sampling', type=str, choices=SAMPLING_MODES, default='uniform', help='Non-backtracking random walk, uniform over solvable states, or exact optimal depth (8-puzzle).')
+    parser.add_argument('--shuffles', type=int, default=100, help='Walk length for --sampling walk.')
+    parser.add_argument('--depth', type=int, help='Optimal solution length for --sampling depth.')
+    parser.add_argument('--seed', type=int, help='Seed for the NumPy generator.')
+    parser.add_argument('--chunk-size', type=int, default=100000, help='Instances generated per vectorized batch.')
+    args = parser.parse_args()
+    if args.sampling == 'depth' and args.depth is None:
+        parser.error("--sampling depth needs --depth.")
+
+    write_instances(args.output, args.count, args.sampling, args.size, args.shuffles, args.depth, args.seed, args.chunk_size)
+    print(f"Wrote {args.count} instance(s) to {args.output}.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+import bisect
+import functools
+import math
+from typing import Dict, List, Optional, Tuple
+
+State = Tuple[int, ...]
+
+ACTION_NAMES = ('Move Up', 'Move Down', 'Move Left', 'Move Right')
+_NAME_TO_ACTION = {name: a for a, name in enumerate(ACTION_NAMES)}
+INVERSE_ACTION = (1, 0, 3, 2)
+
+def goal_state(size: int) -> State:
+    return tuple(range(1, size * size)) + (0,)
+
+@functools.lru_cache(maxsize=None)
+def neighbor_tables(size: int) -> Tuple[Tuple[Tuple[int, ...], ...], Tuple[Tuple[int, ...], ...]]:
+    """
+    (BLANK_ACTIONS, SWAP_INDEX) for a size x size board: the legal action ids for each
+    blank position, and the cell each action swaps the blank with (-1 if illegal).
+    """
+    offsets = (-size, size, -1, 1)
+    blank_actions = []
+    swap_index = []
+    for blank in range(size * size):
+        row, col = divmod(blank, size)
+        legal = (row > 0, row < size - 1, col > 0, col < size - 1)
+        blank_actions.append(tuple(a for a in range(4) if legal[a]))
+        swap_index.append(tuple(blank + offsets[a] if legal[a] else -1 for a in range(4)))
+    return tuple(blank_actions), tuple(swap_index)
+
+def tile_bits(size: int) -> int:
+    """Bits per cell in pack_tiles: enough for the largest tile number."""
+    return max(1, (size * size - 1).bit_length())
+
+def pack_tiles(state: State, size: int) -> int:
+    """The state as one int, tile_bits(size) bits per cell with the first cell most significant."""
+    bits = tile_bits(size)
+    value = 0
+    for tile in state:
+        value = (value << bits) | tile
+    return value
+
+def unpack_tiles(value: int, size: int) -> State:
+    bits = tile_bits(size)
+    mask = (1 << bits) - 1
+    return tuple((value >> (bits * i)) & mask for i in range(size * size - 1, -1, -1))
+
+def count_inversions(values: List[int]) -> int:
+    """Number of pairs i < j with values[i] > values[j], by merge sort in O(n log n)."""
+    values = list(values)
+    inversions = 0
+    width = 1
+    while width < len(values):
+        merged = []
+        for start in range(0, len(values), 2 * width):
+            left = values[start:start + width]
+            right = values[start + width:start + 2 * width]
+            i = j = 0
+            while i < len(left) and j < len(right):
+                if right[j] < left[i]:
+                    merged.append(right[j])
+                    inversions += len(left) - i
+                    j += 1
+                else:
+                    merged.append(left[i])
+                    i += 1
+            merged.extend(left[i:])
+            merged.extend(right[j:])
+        values = merged
+        width *= 2
+    return inversions
+
+def validate_state(state, size: int) -> Optional[str]:
+    """Returns why state is not a size x size board (wrong length, not tiles 0..n-1 once each), or None."""
+    cells = size * size
+    if len(state) != cells:
+        return f"expected {cells} tiles for a {size}x{size} board, got {len(state)}"
+    if sorted(state) != list(range(cells)):
+        return f"tiles must be 0..{cells - 1}, each exactly once"
+    return None
+
+def is_solvable(state: State, size: int) -> bool:
+    """
+    Whether state can reach goal_state(size). Each move keeps the parity of the
+    inversion count (blank excluded) plus, on even-width boards, the blank's row
+    distance from the bottom; the goal has both at zero.
+    """
+    inversions = count_inversions([tile for tile in state if tile != 0])
+    if size % 2 == 1:
+        return inversions % 2 == 0
+    blank_row = state.index(0) // size
+    return (inversions + size - 1 - blank_row) % 2 == 0
+
+def _longest_increasing_run(values: List[int]) -> int:
+    """Length of the longest strictly increasing subsequence (patience sorting)."""
+    tails = []
+    for value in values:
+        i = bisect.bisect_left(tails, value)
+        if i == len(tails):
+            tails.append(value)
+        else:
+            tails[i] = value
+    return len(tails)
+
+class NPuzzleProblem:
+    """
+    Sliding-tile puzzle on a size x size board (size 3: 8-puzzle, 4: 15-puzzle,
+    5: 24-puzzle) with the blank last in the goal. Heuristics: h0, h1 (misplaced
+    tiles), h2 (Manhattan distance) and lc (Manhattan plus linear conflicts), all
+    with incremental heuristic_delta forms.
+    """
+
+    def __init__(self, initial_state: State, size: Optional[int] = None):
+        self.size = size if size is not None else math.isqrt(len(initial_state))
+        cells = self.size * self.size
+        self._initial_state = initial_state
+        self._goal_state = goal_state(self.size)
+        self._blank_actions, self._swap_index = neighbor_tables(self.size)
+        self._blank_action_names = tuple(tuple(ACTION_NAMES[a] for a in actions) for actions in self._blank_actions)
+        goal_positions = {tile: pos for pos, tile in enumerate(self._goal_state)}
+        self._goal_row = tuple(goal_positions[tile] // self.size for tile in range(cells))
+        self._goal_col = tuple(goal_positions[tile] % self.size for tile in range(cells))
+        self._misplaced_table = tuple(
+            tuple(0 if tile == 0 or self._goal_state[pos] == tile else 1 for pos in range(cells))
+            for tile in range(cells)
+        )
+        self._manhattan_table = tuple(
+            tuple(0 if tile == 0 else abs(pos // self.size - self._goal_row[tile]) + abs(pos % self.size - self._goal_col[tile])
+                  for pos in range(cells))
+            for tile in range(cells)
+        )
+        # Linear-conflict counts per (line, tiles in the line), filled in as lines are seen.
+        self._row_conflict_cache: Dict[Tuple[int, State], int] = {}
+        self._col_conflict_cache: Dict[Tuple[int, State], int] = {}
+
+    @property
+    def initial_state(self) -> State:
+        return self._initial_state
+
+    @property
+    def goal_state(self) -> State:
+        return self._goal_state
+
+    def is_goal(self, state: State) -> bool:
+        return state == self._goal_state
+
+    def actions(self, state: State) -> Tuple[str, ...]:
+        return self._blank_action_names[state.index(0)]
+
+    def result(self, state: State, action: str) -> State:
+        blank_index = state.index(0)
+        swap_index = self._swap_index[blank_index][_NAME_TO_ACTION[action]]
+        new_state_list = list(state)
+        new_state_list[blank_index], new_state_list[swap_index] = new_state_list[swap_index], new_state_list[blank_index]
+        return tuple(new_state_list)
+
+    def step_cost(self, state: State, action: str) -> int:
+        return 1
+
+    def predecessors(self, state: State) -> List[Tuple[str, State]]:
+        """(action, previous_state) pairs such that result(previous_state, action) == state."""
+        preds = []
+        for action in self._blank_actions[state.index(0)]:
+            previous = self.result(state, ACTION_NAMES[action])
+            preds.append((ACTION_NAMES[INVERSE_ACTION[action]], previous))
+        return preds
+
+    def heuristic(self, state: State, variant: str) -> int:
+        if variant == 'h0':
+            return 0
+        elif variant == 'h1':
+            return self._table_sum(self._misplaced_table, state)
+        elif variant == 'h2':
+            return self._table_sum(self._manhattan_table, state)
+        elif variant == 'lc':
+            return self._table_sum(self._manhattan_table, state) + 2 * self._linear_conflicts(state)
+        else:
+            raise ValueError(f"Unknown heuristic variant for the N-puzzle: {variant}")
+
+    def reverse_heuristic(self, state: State, variant: str) -> int:
+        """Estimate of the cost from the initial state to state, for backward search."""
+        if variant == 'h0':
+            return 0
+        initial_positions = {tile: pos for pos, tile in enumerate(self._initial_state)}
+        size = self.size
+        if variant == 'h1':
+            return sum(1 for pos, tile in enumerate(state) if tile != 0 and initial_positions[tile] != pos)
+        elif variant == 'h2':
+            return sum(abs(pos // size - initial_positions[tile] // size) + abs(pos % size - initial_positions[tile] % size)
+                       for pos, tile in enumerate(state) if tile != 0)
+        raise ValueError(f"Heuristic variant {variant} has no reverse form.")
+
+    def heuristic_delta(self, parent_h: int, state: State, action: str, variant: str) -> Optional[int]:
+        """
+        Returns the heuristic of result(state, action) given the heuristic of state.
+        A move changes one tile's Manhattan term, and only the conflicts in the two
+        lines the tile leaves and enters: rows for a vertical move, columns otherwise.
+        """
+        if variant == 'h0':
+            return parent_h
+        blank_index = state.index(0)
+        swap_index = self._swap_index[blank_index][_NAME_TO_ACTION[action]]
+        tile = state[swap_index]
+        if variant == 'h1':
+            table = self._misplaced_table
+        elif variant in ('h2', 'lc'):
+            table = self._manhattan_table
+        else:
+            return None
+        h_cost = parent_h + table[tile][blank_index] - table[tile][swap_index]
+        if variant == 'lc':
+            child = list(state)
+            child[blank_index], child[swap_index] = tile, 0
+            size = self.size
+            if abs(blank_index - swap_index) == size:
+                lines = (blank_index // size, swap_index // size)
+                old = sum(self._row_conflicts(state, row) for row in lines)
+                new = sum(self._row_conflicts(child, row) for row in lines)
+            else:
+                lines = (blank_index % size, swap_index % size)
+                old = sum(self._col_conflicts(state, col) for col in lines)
+                new = sum(self._col_conflicts(child, col) for col in lines)
+            h_cost += 2 * (new - old)
+        return h_cost
+
+    def _table_sum(self, table, state: State) -> int:
+        return sum(table[tile][pos] for pos, tile in enumerate(state))
+
+    def _linear_conflicts(self, state: State) -> int:
+        return (sum(self._row_conflicts(state, row) for row in range(self.size))
+                + sum(self._col_conflicts(state, col) for col in range(self.size)))
+
+    def _row_conflicts(self, state, row: int) -> int:
+        """
+        Tiles that must leave this row (their goal row) to let the others pass: the
+        tiles not in a longest run already in goal-column order. Each costs at least
+        two extra moves, which keeps the bound admissible.
+        """
+        size = self.size
+        tiles = tuple(state[row * size:(row + 1) * size])
+        key = (row, tiles)
+        conflicts = self._row_conflict_cache.get(key)
+        if conflicts is None:
+            goal_cols = [self._goal_col[tile] for tile in tiles if tile != 0 and self._goal_row[tile] == row]
+            conflicts = len(goal_cols) - _longest_increasing_run(goal_cols)
+            self._row_conflict_cache[key] = conflicts
+        return conflicts
+
+    def _col_conflicts(self, state, col: int) -> int:
+        size = self.size
+        tiles = tuple(state[col::size])
+        key = (col, tiles)
+        conflicts = self._col_conflict_cache.get(key)
+        if conflicts is None:
+            goal_rows = [self._goal_row[tile] for tile in tiles if tile != 0 and self._goal_col[tile] == col]
+            conflicts = len(goal_rows) - _longest_increasing_run(goal_rows)
+            self._col_conflict_cache[key] = conflicts
+        return conflicts
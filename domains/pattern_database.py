@@ -0,0 +1,113 @@
+import collections
+import mmap
+import os
+from typing import Sequence, Tuple
+
+from domains.eight_puzzle import GOAL_STATE, SWAP_INDEX, State
+
+# Two disjoint tile groups; the blank is in neither, so the lookups can be added.
+DEFAULT_GROUPS = ((1, 2, 3, 4), (5, 6, 7, 8))
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'pdb_cache')
+
+UNSEEN = 255
+_NEIGHBORS = tuple(tuple(i for i in row if i >= 0) for row in SWAP_INDEX)
+
+def pattern_space_size(group_size: int, cells: int = 9) -> int:
+    size = 1
+    for i in range(group_size):
+        size *= cells - i
+    return size
+
+def pattern_rank(positions: Sequence[int], cells: int = 9) -> int:
+    """Ranks the cells occupied by a group's tiles as a k-permutation of the board cells."""
+    rank = 0
+    for i, pos in enumerate(positions):
+        digit = pos
+        for j in range(i):
+            if positions[j] < pos:
+                digit -= 1
+        rank = rank * (cells - i) + digit
+    return rank
+
+def build_pattern_database(group: Sequence[int], goal_state: State = GOAL_STATE) -> bytearray:
+    """
+    Backward 0-1 BFS from the goal over abstract states (cells of the group's tiles
+    plus the blank). Moving a tile outside the group is free, so the stored cost only
+    counts moves of the group's own tiles, which is what makes the groups additive.
+    """
+    size = pattern_space_size(len(group))
+    abstract_distance = bytearray([UNSEEN]) * (size * 9)
+    table = bytearray([UNSEEN]) * size
+
+    start_positions = tuple(goal_state.index(tile) for tile in group)
+    start_blank = goal_state.index(0)
+    abstract_distance[pattern_rank(start_positions) * 9 + start_blank] = 0
+    frontier = collections.deque([(0, start_positions, start_blank)])
+
+    while frontier:
+        distance, positions, blank = frontier.popleft()
+        rank = pattern_rank(positions)
+        if abstract_distance[rank * 9 + blank] < distance:
+            continue
+        if distance < table[rank]:
+            table[rank] = distance
+
+        for neighbor in _NEIGHBORS[blank]:
+            if neighbor in positions:
+                moved = positions.index(neighbor)
+                new_positions = positions[:moved] + (blank,) + positions[moved + 1:]
+                new_distance = distance + 1
+            else:
+                new_positions = positions
+                new_distance = distance
+
+            key = pattern_rank(new_positions) * 9 + neighbor
+            if new_distance < abstract_distance[key]:
+                abstract_distance[key] = new_distance
+                if new_distance == distance:
+                    frontier.appendleft((new_distance, new_positions, neighbor))
+                else:
+                    frontier.append((new_distance, new_positions, neighbor))
+
+    return table
+
+def _cache_path(group: Sequence[int], goal_state: State, cache_dir: str) -> str:
+    goal = ''.join(map(str, goal_state))
+    tiles = ''.join(map(str, group))
+    return os.path.join(cache_dir, f"8puzzle_goal{goal}_tiles{tiles}.pdb")
+
+def load_pattern_database(group: Sequence[int], goal_state: State = GOAL_STATE, cache_dir: str = DEFAULT_CACHE_DIR):
+    """
+    Returns the group's table, memory-mapped from the cache file. The table is built
+    and written to the cache the first time (or if the cached file has the wrong size).
+    """
+    path = _cache_path(group, goal_state, cache_dir)
+    size = pattern_space_size(len(group))
+
+    if not os.path.exists(path) or os.path.getsize(path) != size:
+        table = build_pattern_database(group, goal_state)
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(table)
+        os.replace(temp_path, path)
+
+    with open(path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+class PatternDatabaseHeuristic:
+    """Additive disjoint pattern-database heuristic for the 8-puzzle."""
+
+    def __init__(self, goal_state: State = GOAL_STATE, groups: Tuple[Tuple[int, ...], ...] = DEFAULT_GROUPS,
+                 cache_dir: str = DEFAULT_CACHE_DIR):
+        self.groups = groups
+        self.tables = [load_pattern_database(group, goal_state, cache_dir) for group in groups]
+
+    def __call__(self, state: State) -> int:
+        positions = [0] * 9
+        for i, tile in enumerate(state):
+            positions[tile] = i
+        total = 0
+        for group, table in zip(self.groups, self.tables):
+            total += table[pattern_rank([positions[tile] for tile in group])]
+        return total
@@ -11,9 +11,22 @@ class WGCProblem:
     def initial_state(self) -> State:
         return self._initial_state
 
+    @property
+    def goal_state(self) -> State:
+        return self._goal_state
+
     def is_goal(self, state: State) -> bool:
         return state == self._goal_state
 
+    def predecessors(self, state: State) -> List[Tuple[str, State]]:
+        # Every crossing is undone by the same crossing, so predecessors are successors.
+        preds = []
+        for action in self.actions(state):
+            previous = self.result(state, action)
+            if previous is not None:
+                preds.append((action, previous))
+        return preds
+
     def actions(self, state: State) -> List[str]:
         possible_actions = ['Move Goat', 'Move Wolf', 'Move Cabbage', 'Move Alone']
         valid_actions = []
@@ -0,0 +1,209 @@
+import abc
+import collections
+import json
+import os
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+HEURISTIC_CACHE_POLICIES = ('lru', 'clock')
+DEFAULT_HEURISTIC_CACHE_SIZE = 1000000
+_CACHE_FORMAT_VERSION = 1
+
+def state_key(state: Any) -> Any:
+    """
+    A compact, hashable form of state: ints (packed states) as they are, tuples of
+    small ints (puzzle boards) as bytes, anything else unchanged.
+    """
+    if isinstance(state, tuple):
+        try:
+            return bytes(state)
+        except (TypeError, ValueError):
+            return state
+    return state
+
+def _key_state(key: Any) -> Any:
+    """The JSON form of a state_key (a list for boards)."""
+    return list(key) if isinstance(key, (bytes, tuple)) else key
+
+class HeuristicCache(abc.ABC):
+    """
+    A bounded map from (variant, state_key(state)) to heuristic values, counting
+    hits, misses and evictions. Subclasses choose what to evict when it is full.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_HEURISTIC_CACHE_SIZE):
+        if capacity < 1:
+            raise ValueError("A heuristic cache needs room for at least one entry.")
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @abc.abstractmethod
+    def get(self, key: Tuple[str, Any]) -> Optional[Any]:
+        ...
+
+    @abc.abstractmethod
+    def put(self, key: Tuple[str, Any], value: Any):
+        ...
+
+    @abc.abstractmethod
+    def items(self) -> Iterable[Tuple[Tuple[str, Any], Any]]:
+        ...
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    def preload(self, entries: Iterable[Tuple[str, Any, Any]]) -> int:
+        """Adds (variant, state, value) entries without counting them as misses; returns how many."""
+        count = 0
+        for variant, state, value in entries:
+            self.put((variant, state_key(state)), value)
+            count += 1
+        return count
+
+    def counts(self) -> Tuple[int, int, int]:
+        return self.hits, self.misses, self.evictions
+
+class LRUHeuristicCache(HeuristicCache):
+    """Evicts the least recently used entry."""
+
+    def __init__(self, capacity: int = DEFAULT_HEURISTIC_CACHE_SIZE):
+        super().__init__(capacity)
+        self._entries: 'collections.OrderedDict[Tuple[str, Any], Any]' = collections.OrderedDict()
+
+    def get(self, key):
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        elif len(self._entries) >= self.capacity:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        self._entries[key] = value
+
+    def items(self):
+        return self._entries.items()
+
+    def __len__(self):
+        return len(self._entries)
+
+class ClockHeuristicCache(HeuristicCache):
+    """
+    CLOCK (second chance): entries sit in a ring with a referenced bit that a hit
+    sets; the hand clears set bits as it sweeps and evicts the first clear entry.
+    A hit costs a dict lookup and a bit write, with no reordering.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_HEURISTIC_CACHE_SIZE):
+        super().__init__(capacity)
+        self._slots: Dict[Tuple[str, Any], int] = {}
+        self._keys = []
+        self._values = []
+        self._referenced = bytearray()
+        self._hand = 0
+
+    def get(self, key):
+        slot = self._slots.get(key)
+        if slot is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._referenced[slot] = 1
+        return self._values[slot]
+
+    def put(self, key, value):
+        slot = self._slots.get(key)
+        if slot is not None:
+            self._values[slot] = value
+            self._referenced[slot] = 1
+            return
+        if len(self._keys) < self.capacity:
+            self._slots[key] = len(self._keys)
+            self._keys.append(key)
+            self._values.append(value)
+            self._referenced.append(1)
+            return
+        while self._referenced[self._hand]:
+            self._referenced[self._hand] = 0
+            self._hand = (self._hand + 1) % self.capacity
+        slot = self._hand
+        del self._slots[self._keys[slot]]
+        self.evictions += 1
+        self._slots[key] = slot
+        self._keys[slot] = key
+        self._values[slot] = value
+        self._referenced[slot] = 1
+        self._hand = (slot + 1) % self.capacity
+
+    def items(self):
+        return ((key, self._values[slot]) for key, slot in self._slots.items())
+
+    def __len__(self):
+        return len(self._keys)
+
+def make_heuristic_cache(capacity: int = DEFAULT_HEURISTIC_CACHE_SIZE, policy: str = 'lru') -> HeuristicCache:
+    if policy == 'lru':
+        return LRUHeuristicCache(capacity)
+    elif policy == 'clock':
+        return ClockHeuristicCache(capacity)
+    raise ValueError(f"Unknown heuristic cache policy: {policy}")
+
+def save_heuristic_caches(caches: Dict[str, HeuristicCache], path: str):
+    """Writes the entries of each domain's cache to path as JSON, for load_heuristic_entries."""
+    data = {
+        'version': _CACHE_FORMAT_VERSION,
+        'domains': {domain: [[variant, _key_state(key), value] for (variant, key), value in cache.items()]
+                    for domain, cache in caches.items()},
+    }
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
+
+def load_heuristic_entries(path: str, domain: str) -> Iterable[Tuple[str, Any, Any]]:
+    """The (variant, state, value) entries saved for domain at path; none if the file is missing or from another version."""
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        data = json.load(f)
+    if data.get('version') != _CACHE_FORMAT_VERSION:
+        return []
+    return [(variant, tuple(state) if isinstance(state, list) else state, value)
+            for variant, state, value in data['domains'].get(domain, [])]
+
+class CachedHeuristicProblem:
+    """
+    Wraps a problem so heuristic(state, variant) goes through a HeuristicCache; every
+    other attribute is the wrapped problem's, except heuristic_delta, which is hidden
+    so searches look up each child's heuristic (through the cache) instead of
+    deriving it from the parent's. Attributes are copied onto the wrapper on first
+    use, so searches pay the delegation once rather than per call.
+    """
+
+    def __init__(self, problem, cache: HeuristicCache):
+        self.problem = problem
+        self.cache = cache
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('__') or name in ('problem', 'cache', 'heuristic_delta'):
+            raise AttributeError(name)
+        value = getattr(self.problem, name)
+        setattr(self, name, value)
+        return value
+
+    def heuristic(self, state: Any, variant: str) -> Any:
+        key = (variant, state_key(state))
+        value = self.cache.get(key)
+        if value is None:
+            value = self.problem.heuristic(state, variant)
+            self.cache.put(key, value)
+        return value
@@ -0,0 +1,185 @@
+import collections
+import time
+from typing import Any, Dict, List, Optional
+
+# Problem methods that are timed when a profiler wraps the problem.
+PROBLEM_PHASES = ('actions', 'result', 'step_cost', 'is_goal', 'heuristic', 'heuristic_delta')
+
+class _TimedProblem:
+    """Forwards everything to the wrapped problem; PROBLEM_PHASES methods are timed."""
+
+    def __init__(self, problem, profiler: 'SearchProfiler'):
+        self._problem = problem
+        for phase in PROBLEM_PHASES:
+            method = getattr(problem, phase, None)
+            if method is not None:
+                setattr(self, phase, profiler.timed(phase, method))
+
+    @property
+    def initial_state(self) -> Any:
+        return self._problem.initial_state
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._problem, name)
+
+class _TimedFrontier:
+    def __init__(self, frontier, profiler: 'SearchProfiler'):
+        self._frontier = frontier
+        self.push = profiler.timed('frontier_push', frontier.push)
+        self.pop = profiler.timed('frontier_pop', frontier.pop)
+
+    def __len__(self) -> int:
+        return len(self._frontier)
+
+class _TimedDict(dict):
+    """Explored table (state -> value) whose lookups and stores are timed."""
+
+    def __init__(self, data: dict, profiler: 'SearchProfiler'):
+        super().__init__(data)
+        self._profiler = profiler
+
+    def __contains__(self, key: Any) -> bool:
+        start = time.perf_counter_ns()
+        found = super().__contains__(key)
+        self._profiler.add('explored_lookup', time.perf_counter_ns() - start)
+        return found
+
+    def __getitem__(self, key: Any) -> Any:
+        start = time.perf_counter_ns()
+        value = super().__getitem__(key)
+        self._profiler.add('explored_lookup', time.perf_counter_ns() - start)
+        return value
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        start = time.perf_counter_ns()
+        value = super().get(key, default)
+        self._profiler.add('explored_lookup', time.perf_counter_ns() - start)
+        return value
+
+    def __setitem__(self, key: Any, value: Any):
+        start = time.perf_counter_ns()
+        super().__setitem__(key, value)
+        self._profiler.add('explored_store', time.perf_counter_ns() - start)
+
+class _TimedSet(set):
+    def __init__(self, data: set, profiler: 'SearchProfiler'):
+        super().__init__(data)
+        self._profiler = profiler
+
+    def __contains__(self, key: Any) -> bool:
+        start = time.perf_counter_ns()
+        found = super().__contains__(key)
+        self._profiler.add('explored_lookup', time.perf_counter_ns() - start)
+        return found
+
+    def add(self, key: Any):
+        start = time.perf_counter_ns()
+        super().add(key)
+        self._profiler.add('explored_store', time.perf_counter_ns() - start)
+
+def effective_branching_factor(nodes_generated: int, depth: int, tolerance: float = 1e-6) -> Optional[float]:
+    """Solves N + 1 = 1 + b + b^2 + ... + b^d for b by bisection."""
+    if depth <= 0 or nodes_generated <= depth:
+        return None
+
+    def total(b: float) -> float:
+        return sum(b ** i for i in range(depth + 1))
+
+    low, high = 1.0, float(nodes_generated)
+    while high - low > tolerance:
+        mid = (low + high) / 2
+        if total(mid) < nodes_generated + 1:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2
+
+class SearchProfiler:
+    """
+    Observer for the search functions in search_core. A search given observer=...
+    wraps its problem, frontier and explored table with the timed versions above
+    and calls on_expand once per expansion. Searches run without an observer
+    are untouched, so profiling costs nothing when it is off.
+
+    Collected: total time and call count per phase (perf_counter_ns, aggregated),
+    frontier size sampled every sample_every expansions, and expansions per f-layer.
+    """
+
+    def __init__(self, sample_every: int = 100):
+        self.sample_every = sample_every
+        self.phase_ns: Dict[str, int] = collections.defaultdict(int)
+        self.phase_calls: Dict[str, int] = collections.defaultdict(int)
+        self.frontier_samples: List[List[int]] = []
+        self.f_layer_expansions: Dict[Any, int] = collections.Counter()
+        self.expansions = 0
+
+    def add(self, phase: str, elapsed_ns: int):
+        self.phase_ns[phase] += elapsed_ns
+        self.phase_calls[phase] += 1
+
+    def timed(self, phase: str, func):
+        clock = time.perf_counter_ns
+        phase_ns, phase_calls = self.phase_ns, self.phase_calls
+
+        def timed_call(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                phase_ns[phase] += clock() - start
+                phase_calls[phase] += 1
+        return timed_call
+
+    def wrap_problem(self, problem):
+        return _TimedProblem(problem, self)
+
+    def wrap_frontier(self, frontier):
+        return _TimedFrontier(frontier, self)
+
+    def wrap_explored(self, explored):
+        if isinstance(explored, dict):
+            return _TimedDict(explored, self)
+        return _TimedSet(explored, self)
+
+    def on_expand(self, f_cost: Any, frontier_size: int):
+        if self.expansions % self.sample_every == 0:
+            self.frontier_samples.append([self.expansions, frontier_size])
+        self.expansions += 1
+        self.f_layer_expansions[f_cost] += 1
+
+    def report(self, total_seconds: Optional[float] = None, nodes_generated: Optional[int] = None,
+               solution_depth: Optional[int] = None) -> Dict[str, Any]:
+        phases = {
+            phase: {'seconds': self.phase_ns[phase] / 1e9, 'calls': self.phase_calls[phase]}
+            for phase in sorted(self.phase_ns, key=self.phase_ns.get, reverse=True)
+        }
+        report = {
+            'phases': phases,
+            'expansions': self.expansions,
+            'frontier_size_samples': self.frontier_samples,
+            'expansions_per_f_layer': {str(f): count for f, count in sorted(self.f_layer_expansions.items())},
+        }
+        if total_seconds is not None:
+            report['total_seconds'] = total_seconds
+            report['other_seconds'] = max(total_seconds - sum(p['seconds'] for p in phases.values()), 0.0)
+        if nodes_generated is not None and solution_depth is not None:
+            report['effective_branching_factor'] = effective_branching_factor(nodes_generated, solution_depth)
+        return report
+
+def print_profile(report: Dict[str, Any]):
+    total = report.get('total_seconds')
+    print("Profile:")
+    for phase, stats in report['phases'].items():
+        share = f" ({stats['seconds'] / total:6.1%})" if total else ""
+        print(f"    {phase:<16} {stats['seconds']:9.4f}s{share} | {stats['calls']:>10,} calls")
+    if total:
+        print(f"    {'other (loop)':<16} {report['other_seconds']:9.4f}s ({report['other_seconds'] / total:6.1%})")
+    layers = report['expansions_per_f_layer']
+    if layers:
+        print("    Expansions per f-layer: " + ", ".join(f"{f}: {count}" for f, count in layers.items()))
+    samples = report['frontier_size_samples']
+    if samples:
+        peak = max(size for _, size in samples)
+        print(f"    Frontier size: {len(samples)} samples, peak sampled {peak:,}")
+    if report.get('effective_branching_factor') is not None:
+        print(f"    Effective branching factor: {report['effective_branching_factor']:.3f}")
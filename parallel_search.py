@@ -0,0 +1,255 @@
+import heapq
+import math
+import multiprocessing
+import queue
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from search_core import Node
+from search_budget import budget_exceeded
+
+_GOLDEN = 0x9E3779B97F4A7C15
+_MASK64 = (1 << 64) - 1
+# Seconds an idle worker waits on its inbox, and the coordinator between termination checks.
+_IDLE_WAIT = 0.005
+_POLL_INTERVAL = 0.002
+
+def state_owner(state: Any, workers: int) -> int:
+    """
+    The worker that owns state. Stable across processes (unlike hash() of strings
+    under spawn): a multiplicative hash for int states, CRC32 of repr() otherwise.
+    """
+    if isinstance(state, int):
+        return (((state * _GOLDEN) & _MASK64) >> 32) % workers
+    return zlib.crc32(repr(state).encode()) % workers
+
+def _hda_worker(index: int, problem, heuristic_variant: str, batch_size: int, inboxes, results,
+                incumbent, incumbent_lock, idle, batches_sent, batches_received, expanded, frontier, finished):
+    """
+    One HDA* worker: A* over the states it owns. Successors owned by other workers
+    are queued per owner and sent in batches; received states are kept only if they
+    improve on the best known g. Once finished is set, it reports its metrics and
+    best goal, then answers ('trace', state) requests until ('stop',).
+    """
+    workers = len(inboxes)
+    inbox = inboxes[index]
+    open_list: List[Tuple[float, float, int, Any, float]] = []
+    best: Dict[Any, Tuple[float, Any, Any]] = {}
+    outboxes: List[List[Tuple[Any, float, Any, Any]]] = [[] for _ in range(workers)]
+    counter = 0
+    stats = {"nodes_expanded": 0, "nodes_generated": 0, "states_sent": 0, "batches_sent": 0,
+             "states_received": 0, "duplicates": 0, "max_frontier_size": 0}
+    goal = None
+
+    def add(state, g, parent, action):
+        nonlocal counter, goal
+        known = best.get(state)
+        if known is not None and known[0] <= g:
+            stats["duplicates"] += 1
+            return
+        best[state] = (g, parent, action)
+        if problem.is_goal(state):
+            # Paths through a goal cost at least g, so goals are never expanded.
+            with incumbent_lock:
+                if g < incumbent.value:
+                    incumbent.value = g
+                    goal = (state, g)
+            return
+        h = problem.heuristic(state, heuristic_variant)
+        if g + h < incumbent.value:
+            counter += 1
+            heapq.heappush(open_list, (g + h, h, counter, state, g))
+
+    def flush():
+        for owner, batch in enumerate(outboxes):
+            if batch:
+                batches_sent[index] += 1
+                stats["batches_sent"] += 1
+                stats["states_sent"] += len(batch)
+                inboxes[owner].put(('nodes', batch))
+                outboxes[owner] = []
+
+    def receive(message):
+        if message[0] != 'nodes':
+            return
+        idle[index] = 0
+        batches_received[index] += 1
+        stats["states_received"] += len(message[1])
+        for state, g, parent, action in message[1]:
+            add(state, g, parent, action)
+
+    while not finished.is_set():
+        while True:
+            try:
+                receive(inbox.get_nowait())
+            except queue.Empty:
+                break
+        bound = incumbent.value
+        if not open_list or open_list[0][0] >= bound:
+            open_list.clear()
+            flush()
+            frontier[index] = 0
+            idle[index] = 1
+            try:
+                receive(inbox.get(timeout=_IDLE_WAIT))
+            except queue.Empty:
+                pass
+            continue
+
+        for _ in range(batch_size):
+            if not open_list or open_list[0][0] >= bound:
+                break
+            _, _, _, state, g = heapq.heappop(open_list)
+            if best[state][0] < g:
+                continue
+            stats["nodes_expanded"] += 1
+            for action in problem.actions(state):
+                child_state = problem.result(state, action)
+                if child_state is None:
+                    continue
+                stats["nodes_generated"] += 1
+                child_g = g + problem.step_cost(state, action)
+                owner = state_owner(child_state, workers)
+                if owner == index:
+                    add(child_state, child_g, state, action)
+                else:
+                    outboxes[owner].append((child_state, child_g, state, action))
+                    if len(outboxes[owner]) >= batch_size:
+                        batches_sent[index] += 1
+                        stats["batches_sent"] += 1
+                        stats["states_sent"] += len(outboxes[owner])
+                        inboxes[owner].put(('nodes', outboxes[owner]))
+                        outboxes[owner] = []
+        flush()
+        stats["max_frontier_size"] = max(stats["max_frontier_size"], len(open_list))
+        expanded[index] = stats["nodes_expanded"]
+        frontier[index] = len(open_list)
+
+    results.put(('done', index, stats, goal))
+    while True:
+        message = inbox.get()
+        if message[0] == 'trace':
+            g, parent, action = best[message[1]]
+            results.put(('trace', parent, action, g))
+        elif message[0] == 'stop':
+            # Batches still queued for workers that have stopped are never read; don't wait to flush them.
+            for other in inboxes:
+                other.cancel_join_thread()
+            return
+
+def _all_idle_and_quiet(idle, batches_sent, batches_received) -> bool:
+    """
+    True once no worker has work and no batch is in flight. The counters are read
+    on both sides of the idle flags: a worker only leaves idle by receiving a batch,
+    which changes the counts, so equal, unchanged counts mean the flags were true
+    at the same time.
+    """
+    sent, received = sum(batches_sent), sum(batches_received)
+    if sent != received or not all(idle):
+        return False
+    return sum(batches_sent) == sent and sum(batches_received) == received
+
+def hda_star(problem, heuristic_variant: str, workers: int = 2, batch_size: int = 64, budget: Any = None,
+             start_method: Optional[str] = None) -> Tuple[Optional[Node], Dict[str, Any]]:
+    """
+    Hash-distributed A* (HDA*) over worker processes: each state belongs to one
+    worker (state_owner), which keeps the open list and best g for its states and
+    receives the successors others generate in batches of up to batch_size. Workers
+    prune against a shared incumbent cost, so with an admissible heuristic the
+    search ends with an optimal solution once every worker is idle and no batch is
+    in flight. The path is then traced back through the owners' parent records.
+
+    Besides the usual totals, metrics['workers'] holds each worker's expansions,
+    generations, states and batches sent and received, and duplicates dropped;
+    communication_ratio is states sent / states generated and load_balance is the
+    busiest worker's expansions over the mean. budget (a SearchBudget) is polled
+    by the coordinator against the workers' summed expansions and frontiers.
+    """
+    if workers < 1:
+        raise ValueError("hda_star needs at least one worker.")
+    context = multiprocessing.get_context(start_method)
+    inboxes = [context.Queue() for _ in range(workers)]
+    results = context.Queue()
+    incumbent = context.RawValue('d', math.inf)
+    incumbent_lock = context.Lock()
+    idle = context.RawArray('b', workers)
+    # One slot per worker, plus one for the coordinator's seed batch.
+    batches_sent = context.RawArray('q', workers + 1)
+    batches_received = context.RawArray('q', workers)
+    expanded = context.RawArray('q', workers)
+    frontier = context.RawArray('q', workers)
+    finished = context.Event()
+    processes = [
+        context.Process(target=_hda_worker,
+                        args=(i, problem, heuristic_variant, batch_size, inboxes, results, incumbent, incumbent_lock,
+                              idle, batches_sent, batches_received, expanded, frontier, finished))
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    try:
+        start = problem.initial_state
+        batches_sent[workers] += 1
+        inboxes[state_owner(start, workers)].put(('nodes', [(start, 0, None, None)]))
+        exceeded = None
+        while not _all_idle_and_quiet(idle, batches_sent, batches_received):
+            if budget is not None:
+                exceeded = budget.poll(sum(expanded), sum(frontier))
+                if exceeded:
+                    break
+            dead = [p.exitcode for p in processes if p.exitcode is not None]
+            if dead:
+                raise RuntimeError(f"An HDA* worker exited early (exit code {dead[0]}).")
+            time.sleep(_POLL_INTERVAL)
+        finished.set()
+
+        worker_stats = [None] * workers
+        goal = None
+        for _ in range(workers):
+            _, index, stats, worker_goal = results.get()
+            worker_stats[index] = stats
+            if worker_goal is not None and (goal is None or worker_goal[1] < goal[1]):
+                goal = worker_goal
+
+        steps = []
+        if goal is not None and not exceeded:
+            state = goal[0]
+            while True:
+                inboxes[state_owner(state, workers)].put(('trace', state))
+                _, parent, action, g = results.get()
+                steps.append((state, action, g))
+                if parent is None:
+                    break
+                state = parent
+    finally:
+        finished.set()
+        for inbox in inboxes:
+            inbox.put(('stop',))
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+    node = None
+    for state, action, g in reversed(steps):
+        node = Node(state, node, action, g)
+
+    totals = {key: sum(stats[key] for stats in worker_stats) for key in worker_stats[0]}
+    mean_expanded = totals["nodes_expanded"] / workers
+    metrics = {
+        "nodes_generated": totals["nodes_generated"] + 1,
+        "nodes_expanded": totals["nodes_expanded"],
+        # Sum of the per-worker peaks: an upper bound on the combined open lists.
+        "max_frontier_size": totals["max_frontier_size"],
+        "hda_workers": workers,
+        "states_sent": totals["states_sent"],
+        "batches_sent": totals["batches_sent"],
+        "communication_ratio": totals["states_sent"] / totals["nodes_generated"] if totals["nodes_generated"] else 0.0,
+        "load_balance": max(stats["nodes_expanded"] for stats in worker_stats) / mean_expanded if mean_expanded else 1.0,
+        "workers": worker_stats,
+    }
+    if exceeded:
+        return None, budget_exceeded(budget, metrics)
+    return node, metrics
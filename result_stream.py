@@ -0,0 +1,107 @@
+import csv
+import json
+import os
+from typing import Any, Dict, Set, Tuple
+
+from search_budget import BUDGET_EXCEEDED
+
+# Column order for CSV output; JSONL records use the same keys.
+RECORD_FIELDS = [
+    'instance', 'domain', 'initial_state', 'algorithm', 'status',
+    'solution_cost', 'solution_depth', 'nodes_generated', 'nodes_expanded', 'max_frontier_size',
+    'runtime_s', 'cpu_time_s', 'peak_rss_mb', 'worker', 'cache', 'actions', 'metrics',
+]
+# Fields that hold lists or dicts and are JSON-encoded inside a CSV cell.
+_JSON_FIELDS = ('initial_state', 'actions', 'metrics')
+
+def record_key(initial_state: Any, algorithm: str) -> Tuple[str, str]:
+    """Identifies an (instance, algorithm) job across runs, independent of instance numbering."""
+    return json.dumps(list(initial_state)), algorithm
+
+def make_record(instance: int, domain: str, initial_state: Any, job_result: Dict[str, Any]) -> Dict[str, Any]:
+    """One output record for a finished job; it holds the action list, never Node objects."""
+    metrics = job_result['metrics']
+    analysis = job_result['analysis']
+    if analysis['status'] != 'ok':
+        status = analysis['status']
+    elif job_result['actions'] is None and metrics.get('status') == BUDGET_EXCEEDED:
+        status = BUDGET_EXCEEDED
+    else:
+        status = 'solved' if job_result['actions'] is not None else 'no_solution'
+    return {
+        'instance': instance,
+        'domain': domain,
+        'initial_state': list(initial_state),
+        'algorithm': job_result['name'],
+        'status': status,
+        'solution_cost': job_result['solution_cost'],
+        'solution_depth': job_result['solution_depth'],
+        'nodes_generated': metrics['nodes_generated'],
+        'nodes_expanded': metrics['nodes_expanded'],
+        'max_frontier_size': metrics['max_frontier_size'],
+        'runtime_s': job_result['wall_time'],
+        'cpu_time_s': job_result['cpu_time'],
+        'peak_rss_mb': job_result['peak_rss_mb'],
+        'worker': job_result['worker'],
+        'cache': job_result['cache'],
+        'actions': job_result['actions'],
+        'metrics': metrics,
+    }
+
+def _is_csv(path: str) -> bool:
+    return path.lower().endswith('.csv')
+
+def _drop_partial_line(path: str):
+    """Truncates a final line left half-written by a crash, so appended records start on a fresh line."""
+    with open(path, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b'\n'):
+            f.truncate(data.rfind(b'\n') + 1)
+
+def read_completed(path: str) -> Set[Tuple[str, str]]:
+    """record_key()s of the jobs already in an output file; a partial last record is dropped."""
+    if not os.path.exists(path):
+        return set()
+    _drop_partial_line(path)
+    completed = set()
+    with open(path, newline='') as f:
+        if _is_csv(path):
+            for row in csv.DictReader(f):
+                completed.add((row['initial_state'], row['algorithm']))
+        else:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    completed.add(record_key(record['initial_state'], record['algorithm']))
+    return completed
+
+class ResultWriter:
+    """
+    Appends one record per finished job to a JSONL file, or to a CSV file when
+    the path ends in .csv, flushing after every record so a crashed run loses
+    at most the job in progress.
+    """
+
+    def __init__(self, path: str, append: bool = False):
+        self.path = path
+        self._csv = _is_csv(path)
+        write_header = not (append and os.path.exists(path) and os.path.getsize(path) > 0)
+        self._file = open(path, 'a' if append else 'w', newline='')
+        if self._csv:
+            self._writer = csv.DictWriter(self._file, fieldnames=RECORD_FIELDS)
+            if write_header:
+                self._writer.writeheader()
+                self._file.flush()
+
+    def write(self, record: Dict[str, Any]):
+        if self._csv:
+            row = dict(record)
+            for field in _JSON_FIELDS:
+                row[field] = json.dumps(row[field])
+            self._writer.writerow(row)
+        else:
+            self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
@@ -1,153 +1,582 @@
 import argparse
+import collections
+import json
+import math
+import random
 import sys
 import os
-from typing import List, Tuple, Any
+import time
+from typing import Any, Dict, List, Tuple
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, script_dir)
 
-from search_core import Node, bfs, ids, astar
-from table_generator import generate_table_images
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from instrumentation import print_profile
+from heuristic_cache import DEFAULT_HEURISTIC_CACHE_SIZE, HEURISTIC_CACHE_POLICIES, save_heuristic_caches
+from search_core import DEFAULT_MAX_COMPILED_STATES, Node, ara_star, astar, astar_batched, external_bfs
+from table_generator import SummaryAggregator, generate_table_images, write_summary
+from search_budget import BUDGET_EXCEEDED
+from result_stream import ResultWriter, make_record, read_completed, record_key
 from domains.puzzle_generator import generate_puzzle
+from domains.instance_generator import SAMPLING_MODES, read_instances, sample_unique
+from domains.eight_puzzle import GOAL_STATE, PackedEightPuzzleProblem
+from domains.n_puzzle import NPuzzleProblem, goal_state, pack_tiles, tile_bits, unpack_tiles
+from solver import ALGORITHMS, SINGLE_RUN_ALGORITHMS, DOMAIN_NAMES, DOMAIN_HEURISTICS, skip_reason, resolve_algorithm, build_problem, replay_actions, run_job, heuristic_caches
 
-def format_wgc_path(node: Node) -> List[Tuple[Any, str, Any]]:
+def format_wgc_path(node: Node, problem: Any = None) -> List[Tuple[Any, str, Any]]:
+    decode_state = getattr(problem, 'decode_state', None) or (lambda state: state)
+    action_name = getattr(problem, 'action_name', None) or (lambda action: action)
     path = []
     while node.parent:
-        path.append((node.parent.state, node.action, node.state))
+        path.append((decode_state(node.parent.state), action_name(node.action), decode_state(node.state)))
         node = node.parent
     path.reverse()
     return path
 
-def print_8puzzle_state(state: Tuple[int, ...]):
-    for i in range(0, 9, 3):
-        row = state[i:i+3]
-        print(" │ " + " ".join(str(x) if x != 0 else ' ' for x in row) + " │")
+def print_puzzle_state(state: Tuple[int, ...]):
+    size = math.isqrt(len(state))
+    width = len(str(len(state) - 1))
+    for i in range(0, len(state), size):
+        row = state[i:i+size]
+        print(" │ " + " ".join(str(x).rjust(width) if x != 0 else ' ' * width for x in row) + " │")
+
+# Algorithm-specific metrics, reported only when the search function returns them.
+EXTRA_METRICS = {
+    'iterations': 'Iterations',
+    'stale_pops': 'Stale Pops',
+    'reopened_nodes': 'Reopened Nodes',
+    'nodes_expanded_forward': 'Expanded (fwd)',
+    'nodes_expanded_backward': 'Expanded (bwd)',
+    'max_frontier_size_forward': 'Max Frontier (fwd)',
+    'max_frontier_size_backward': 'Max Frontier (bwd)',
+    'cached_suffix': 'Cached Suffix',
+    'suboptimality_bound': 'Suboptimality Bound',
+    'time_to_first_solution': 'First Solution (s)',
+    'time_budget_exhausted': 'Time Budget Exhausted',
+    'budget_hit': 'Budget Hit',
+    'compiled_states': 'Compiled States',
+    'compile_skipped': 'Compile Skipped (too many states)',
+    'hda_workers': 'HDA* Workers',
+    'states_sent': 'States Sent',
+    'communication_ratio': 'Sent/Generated',
+    'load_balance': 'Load Balance (max/mean expanded)',
+    'heuristic_cache_hits': 'H-Cache Hits',
+    'heuristic_cache_misses': 'H-Cache Misses',
+    'heuristic_cache_evictions': 'H-Cache Evictions',
+    'heuristic_cache_hit_rate': 'H-Cache Hit Rate',
+    # Not a search metric: set here when an HDA* run has its serial A* run alongside.
+    'speedup': 'Speedup over A*',
+}
+
+def print_extra_metrics(results: dict):
+    extras = [f"{label}: {results[label]:.3f}" if isinstance(results[label], float) else f"{label}: {results[label]}"
+              for label in EXTRA_METRICS.values() if label in results]
+    if extras:
+        print(" | ".join(extras))
+    for worker, stats in enumerate(results.get('Per-Worker', [])):
+        print(f"  Worker {worker}: expanded {stats['nodes_expanded']:,} | generated {stats['nodes_generated']:,} | "
+              f"sent {stats['states_sent']:,} state(s) in {stats['batches_sent']:,} batch(es) | "
+              f"received {stats['states_received']:,} | duplicates {stats['duplicates']:,}")
+    for improvement in results.get('Improvements', []):
+        print(f"  Improved to cost {improvement['cost']} at w={improvement['weight']:g} after {improvement['seconds']:.3f}s "
+              f"({improvement['nodes_expanded']:,} expanded) | bound {improvement['bound']:.3f}")
+
+def print_timing(results: dict):
+    if results.get('Solution Cache') == 'hit':
+        print(f"Time: {results['Runtime (s)']:.3f}s (solution cache hit; metrics are from the cached run)")
+        return
+    line = f"Time: {results['Runtime (s)']:.3f}s | Nodes expanded/sec: {results['Nodes/sec']:,.0f}"
+    if results.get('Peak RSS (MB)') is not None:
+        line += f" | Peak RSS so far: {results['Peak RSS (MB)']:.1f} MB"
+    print(line)
+
+def print_throughput_summary(totals: Dict[str, List[float]], instance_count: int, total_elapsed: float, packed: bool = False):
+    """totals maps each algorithm to [nodes expanded, seconds] over its searched (not cached) runs."""
+    state_repr = "packed" if packed else "tuple"
+    print(f"\n--- THROUGHPUT SUMMARY ({instance_count} instances, {state_repr} states) ---")
+    for algo_name, (expanded, elapsed) in totals.items():
+        rate = expanded / elapsed if elapsed > 0 else 0.0
+        print(f"  {algo_name:<10} expanded {int(expanded):>10,} nodes in {elapsed:8.3f}s | {rate:>12,.0f} nodes/sec")
+    rate = instance_count / total_elapsed if total_elapsed > 0 else 0.0
+    print(f"  Overall: {instance_count} instances in {total_elapsed:.3f}s wall time | {rate:,.2f} instances/sec")
+
+def print_worker_summary(worker_stats: Dict[int, List[float]]):
+    print(f"\n--- WORKER SUMMARY ({len(worker_stats)} worker processes) ---")
+    for worker, (jobs, wall_time, cpu_time) in sorted(worker_stats.items()):
+        print(f"  Worker {worker:<8} {int(jobs):>6} jobs | wall {wall_time:8.3f}s | cpu {cpu_time:8.3f}s")
+
+def print_budget_summary(budget_hits: Dict[str, int], job_count: int):
+    hits = ", ".join(f"{limit}: {count}" for limit, count in sorted(budget_hits.items())) or "none"
+    print(f"\n--- BUDGET: {sum(budget_hits.values())}/{job_count} job(s) stopped early ({hits}) ---")
+
+def print_service_summary(stats: Dict[str, Any]):
+    latency = stats['latency_s'] or {}
+    print(f"\n--- SOLVER SERVICE: {stats['completed']} request(s) served, {stats['coalesced']} coalesced, "
+          f"{stats['searches']} search(es) on {stats['workers']} worker(s) | queue depth {stats['queue_depth']} | "
+          f"latency p50 {latency.get('p50', 0.0):.3f}s p95 {latency.get('p95', 0.0):.3f}s | "
+          f"{stats['recent_throughput_rps']:.2f} req/s over the last minute ---")
+
+def run_layers(domain: str, state: Tuple[int, ...], size: int, memory_mb: float, work_dir: str = None, max_depth: int = None):
+    """Prints the breadth-first depth histogram from state, computed by the disk-backed external_bfs."""
+    if domain == '8puzzle':
+        problem = PackedEightPuzzleProblem(state)
+        kwargs = {'state_bits': 40}
+    else:
+        problem = NPuzzleProblem(state, size)
+        kwargs = {'state_bits': tile_bits(size) * size * size,
+                  'encode': lambda s: pack_tiles(s, size), 'decode': lambda v: unpack_tiles(v, size)}
+    start = time.perf_counter()
+    counts, metrics = external_bfs(problem, memory_budget_mb=memory_mb, work_dir=work_dir, max_depth=max_depth, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"\n{'Depth':>5}  {'States':>12}")
+    for depth, count in enumerate(counts):
+        print(f"{depth:>5}  {count:>12}")
+    print(f"Total: {sum(counts)} state(s), deepest layer {len(counts) - 1}, in {elapsed:.2f}s")
+    print(f"Largest layer: {metrics['max_frontier_size']}; successors generated: {metrics['nodes_generated']}")
+    print(f"Sorted runs: {metrics['sorted_runs']}; bytes written: {metrics['bytes_written']}; "
+          f"largest buffer: {metrics['max_buffer_states']} state(s)")
+
+def print_heuristic_cache_summary(hits: int, misses: int, evictions: int):
+    lookups = hits + misses
+    rate = hits / lookups if lookups else 0.0
+    print(f"\n--- HEURISTIC CACHE: {hits:,}/{lookups:,} hits ({rate:.1%}) | {evictions:,} eviction(s) ---")
+
+def print_cache_summary(hits: int, lookups: int, early_stops: int):
+    rate = hits / lookups if lookups else 0.0
+    print(f"\n--- SOLUTION CACHE: {hits}/{lookups} hits ({rate:.1%}) | "
+          f"{early_stops} search(es) stopped early on cached distances ---")
+
+def print_instance_report(instance: Dict[str, Any]):
+    print(f"\n--- CONSOLE REPORT: Instance starting {instance['initial_state']} ---")
+    for algo_name, results in instance['results_data'].items():
+        print(f"\nDomain: {instance['domain']} | Algorithm: {algo_name}")
+        solution_node = results['node']
+        if solution_node:
+            print("-" * 25)
+            print("Solution Found!")
+            bound = f" | Lower bound: {results['Lower Bound']}" if 'Lower Bound' in results else ""
+            print(f"Solution cost: {results['Solution Cost']} | Depth: {results['Solution Depth']}{bound}")
+            if 'Optimal Cost' in results:
+                verdict = "optimal" if results['Solution Cost'] == results['Optimal Cost'] else "NOT optimal"
+                print(f"Oracle check: {verdict} (optimal cost {results['Optimal Cost']})")
+            print(f"Nodes generated: {results['Nodes Generated']} | Nodes expanded: {results['Nodes Expanded']} | Max frontier: {results['Max Frontier Size']}")
+            print_extra_metrics(results)
+            print_timing(results)
+            if 'profile' in results:
+                print_profile(results['profile'])
+            path = format_wgc_path(solution_node, instance['problem'])
+            print("Path:")
+            if instance['domain'] != 'WGC':
+                for i, (p_state, action, c_state) in enumerate(path, 1):
+                    print(f"\nStep {i}: Action: {action}\nFrom:"); print_puzzle_state(p_state); print("To:"); print_puzzle_state(c_state)
+            else:
+                for i, (p_state, action, c_state) in enumerate(path, 1):
+                    print(f"  {i}) {action:<15} {p_state} -> {c_state}")
+        elif 'Status' in results:
+            print(f"\nPrecheck: {results['Status']} start state ({results['Reason']}); no search was run.")
+        else:
+            if results.get('status') == BUDGET_EXCEEDED:
+                print(f"\nBudget exceeded ({results['budget_hit']}): search stopped early; metrics are partial.")
+            else:
+                print("\nNo solution found.")
+            print(f"Nodes generated: {results['nodes_generated']} | Nodes expanded: {results['nodes_expanded']} | Max frontier: {results['max_frontier_size']}")
+            print_extra_metrics(results)
+            print_timing(results)
+            if 'profile' in results:
+                print_profile(results['profile'])
+
+def _run_serial(jobs: List[Dict[str, Any]], instance_count: int):
+    """Runs jobs in this process, announcing each one before it starts."""
+    current_instance = None
+    for job in jobs:
+        if job['instance'] != current_instance:
+            current_instance = job['instance']
+            print(f"\n--- Running Instance {current_instance+1}/{instance_count} | Start State: {job['state']} ---")
+        print(f"  - Running {job['name']}...")
+        yield run_job(job)
 
 def main():
     parser = argparse.ArgumentParser(description="Run search algorithms on various domains.")
-    parser.add_argument("domain", type=str, choices=["wgc", "8puzzle"], help="The problem domain to solve.")
-    parser.add_argument("algorithm", type=str, nargs='?', default=None, help="The search algorithm to use for a single run.")
-    parser.add_argument("initial_state", type=str, nargs='?', default=None, help="For 8-puzzle: the initial state as a comma-separated string.")
+    parser.add_argument("domain", type=str, choices=["wgc", "8puzzle", "npuzzle"], help="The problem domain to solve; npuzzle is the size x size sliding-tile puzzle (see --size).")
+    parser.add_argument("algorithm", type=str, nargs='?', default=None, help=f"The search algorithm to use for a single run: {', '.join(SINGLE_RUN_ALGORITHMS)}.")
+    parser.add_argument("initial_state", type=str, nargs='?', default=None, help="For 8-puzzle/N-puzzle: the initial state as a comma-separated string (0 is the blank).")
     
-    parser.add_argument("--heuristic", type=str, choices=["h1", "h2"], help="For A* on 8-puzzle: h1 or h2.")
-    parser.add_argument('--gentable', nargs='+', choices=['bfs', 'ids', 'ucs', 'astar_h1', 'astar_h2'], help='Generate a comparison table for the given algorithms.')
+    parser.add_argument("--heuristic", type=str, choices=["h1", "h2", "h3", "hstar", "lc"], help="For A*/IDA*: h1, h2, h3 (8-puzzle pattern database), hstar (8-puzzle exact distance table) or lc (N-puzzle Manhattan + linear conflicts).")
+    parser.add_argument('--size', type=int, default=4, help='For npuzzle: the board width (4 = 15-puzzle, 5 = 24-puzzle).')
+    parser.add_argument('--gentable', nargs='+', choices=list(ALGORITHMS), help='Generate a comparison table for the given algorithms.')
     
     parser.add_argument('--instances', type=int, default=1, help='Number of instances to run.')
     parser.add_argument('--randomstart', action='store_true', help='Generate random start state(s) for the 8-puzzle.')
     parser.add_argument('--shuffles', type=int, default=100, help='Number of random moves to generate a puzzle.')
+    parser.add_argument('--sampling', type=str, choices=SAMPLING_MODES, help='With --randomstart: non-backtracking random walk of --shuffles moves, uniform over solvable states, or exactly --depth moves from the goal (8-puzzle). Default: the original random walk.')
+    parser.add_argument('--depth', type=int, help='Optimal solution length for --sampling depth.')
+    parser.add_argument('--instances-file', type=str, metavar='PATH', help='Read start states from PATH, one comma-separated state per line (see domains/instance_generator.py).')
+    parser.add_argument('--seed', type=int, help='Seed for --randomstart, so a run (and its --resume) sees the same instances.')
+    parser.add_argument('--packed', action='store_true', help='For 8-puzzle: search on packed-integer states with precomputed move tables.')
+    parser.add_argument('--frontier', type=str, choices=['heap', 'bucket', 'bucket_g'], default='heap', help='Frontier for A*/UCS: binary heap, or f-bucket queue (LIFO or highest-g first within a bucket).')
+    parser.add_argument('--batch-size', type=int, default=0, help='For A*/UCS on 8-puzzle: generate the children of up to this many equal-f nodes at once with NumPy (heap frontier only). Same metrics as plain A*; duplicate checks and pushes stay per child, so it is not faster.')
+    parser.add_argument('--weight', type=float, help='For A*: weighted A* with f = g + WEIGHT * h; solutions cost at most WEIGHT times optimal. With --time-budget, the initial ARA* weight (default 5).')
+    parser.add_argument('--time-budget', type=float, metavar='SECONDS', help='For A*: run anytime ARA*, improving the solution and its suboptimality bound until optimal or out of time.')
+    parser.add_argument('--parallel', type=int, metavar='N', help='For A*: also run each A* as hash-distributed A* (HDA*) over N processes, with per-worker metrics and the speedup over the serial run.')
+    parser.add_argument('--timeout', type=float, metavar='SECONDS', help='Per-job time limit; a search that runs out stops and is reported as budget_exceeded.')
+    parser.add_argument('--max-nodes', type=int, metavar='N', help='Per-job limit on node expansions, reported the same way.')
+    parser.add_argument('--compile', type=int, nargs='?', const=DEFAULT_MAX_COMPILED_STATES, metavar='MAX_STATES', help=f'Search a compiled state graph (integer states, cached under pdb_cache/) when at most MAX_STATES (default {DEFAULT_MAX_COMPILED_STATES}) states are reachable.')
+    parser.add_argument('--workers', type=int, default=1, help='Number of worker processes for (instance, algorithm) jobs; with --server, concurrent requests.')
+    parser.add_argument('--server', type=str, metavar='ADDRESS', help='Send jobs to a running solver_service.py (http://HOST:PORT or unix:PATH) instead of searching here.')
+    parser.add_argument('--verify-optimal', action='store_true', help='For 8-puzzle: check each solution cost against the exact distance table.')
+    parser.add_argument('--check-heuristic', action='store_true', help='Debug: verify incremental heuristic values against full evaluation.')
+    parser.add_argument('--cache', type=str, metavar='PATH', help='SQLite solution cache to reuse and extend across runs.')
+    parser.add_argument('--heuristic-cache', type=int, nargs='?', const=DEFAULT_HEURISTIC_CACHE_SIZE, metavar='SIZE', help=f'Memoize heuristic values in a bounded cache of SIZE entries (default {DEFAULT_HEURISTIC_CACHE_SIZE}), shared by all the jobs a process runs. Every child is looked up in it, so h1/h2/lc no longer use their cheaper incremental updates.')
+    parser.add_argument('--heuristic-cache-policy', type=str, choices=HEURISTIC_CACHE_POLICIES, default='lru', help='Eviction policy for --heuristic-cache: least recently used, or CLOCK (second chance).')
+    parser.add_argument('--heuristic-cache-file', type=str, metavar='PATH', help='With --heuristic-cache: preload entries from PATH if it exists, and (with one worker) save the cache back to it at the end.')
+    parser.add_argument('--output', type=str, metavar='PATH', help='Stream one record per (instance, algorithm) to PATH as each finishes: JSONL, or CSV if PATH ends in .csv.')
+    parser.add_argument('--resume', action='store_true', help='With --output: skip jobs already recorded in PATH and append the rest.')
+    parser.add_argument('--summary', type=str, metavar='PATH', help='Write mean/median/p95/max of each metric per algorithm and solution depth to one PNG, CSV or HTML file (by extension); with --gentable, instead of per-instance images.')
+    parser.add_argument('--layers', action='store_true', help='Instead of solving, print how many states lie at each breadth-first depth from the start state (the goal by default), using disk-backed BFS.')
+    parser.add_argument('--max-layer', type=int, metavar='N', help='With --layers: stop after counting layer N.')
+    parser.add_argument('--memory-mb', type=float, default=64.0, help='With --layers: memory budget for buffered successors; larger layers are sorted in runs on disk.')
+    parser.add_argument('--work-dir', type=str, metavar='DIR', help='With --layers: where layer and run files go (default: a temporary directory).')
+    parser.add_argument('--profile', nargs='?', const='-', metavar='TRACE_JSON', help='Profile BFS/IDS/A*/IDA* runs and print a time breakdown; with a path, also write a JSON trace.')
 
     args = parser.parse_args()
 
+    # With --gentable or --layers there is no single-run algorithm, so a lone positional is the start state.
+    if (args.gentable or args.layers) and args.algorithm and not args.initial_state:
+        args.initial_state, args.algorithm = args.algorithm, None
+
     if args.domain == 'wgc' and (args.randomstart or args.instances > 1):
-        parser.error("--randomstart and --instances > 1 are only supported for the 8puzzle domain.")
+        parser.error("--randomstart and --instances > 1 are only supported for the puzzle domains.")
+    if args.heuristic and args.domain in DOMAIN_HEURISTICS and args.heuristic not in DOMAIN_HEURISTICS[args.domain]:
+        parser.error(f"--heuristic {args.heuristic} is not available for {args.domain}; choose from {', '.join(DOMAIN_HEURISTICS[args.domain])}.")
+    if args.domain == 'npuzzle' and (args.packed or args.batch_size):
+        parser.error("--packed and --batch-size are only supported for the 8puzzle domain.")
     if args.randomstart and args.initial_state:
         parser.error("Cannot specify an initial_state when using --randomstart.")
+    if args.instances_file and (args.randomstart or args.initial_state):
+        parser.error("--instances-file cannot be combined with --randomstart or an initial_state.")
+    if args.sampling and not args.randomstart:
+        parser.error("--sampling needs --randomstart.")
+    if args.sampling == 'depth' and args.depth is None:
+        parser.error("--sampling depth needs --depth.")
+    if args.weight is not None and args.weight < 1:
+        parser.error("--weight must be at least 1.")
+    if args.weight not in (None, 1) and args.time_budget is None and args.frontier != 'heap':
+        parser.error("--weight needs the heap frontier.")
+    if args.time_budget is not None and args.time_budget <= 0:
+        parser.error("--time-budget must be positive.")
+    if args.batch_size and (args.weight is not None or args.time_budget is not None):
+        parser.error("--batch-size cannot be combined with --weight or --time-budget.")
+    if args.batch_size and args.frontier != 'heap':
+        parser.error("--batch-size needs the heap frontier.")
+    if args.batch_size and args.check_heuristic:
+        parser.error("--batch-size cannot be combined with --check-heuristic.")
+    if args.batch_size and args.profile:
+        parser.error("--batch-size cannot be combined with --profile.")
+    if args.parallel is not None and args.parallel < 1:
+        parser.error("--parallel needs at least 1 process.")
+    if args.parallel and (args.batch_size or args.weight is not None or args.time_budget is not None):
+        parser.error("--parallel cannot be combined with --batch-size, --weight or --time-budget.")
+    if args.parallel and args.workers > 1:
+        parser.error("--parallel cannot be combined with --workers > 1: HDA* would share the CPUs with other jobs, so its speedup would be meaningless.")
+    if args.timeout is not None and args.timeout <= 0:
+        parser.error("--timeout must be positive.")
+    if args.max_nodes is not None and args.max_nodes < 0:
+        parser.error("--max-nodes cannot be negative.")
+    if args.compile is not None and args.batch_size:
+        parser.error("--compile cannot be combined with --batch-size.")
+    if args.server and args.cache:
+        parser.error("--cache is set on the solver service (solver_service.py --cache), not with --server.")
+    if args.heuristic_cache is not None and args.heuristic_cache < 1:
+        parser.error("--heuristic-cache needs room for at least one entry.")
+    if args.heuristic_cache_file and args.heuristic_cache is None:
+        parser.error("--heuristic-cache-file needs --heuristic-cache.")
+    if args.heuristic_cache is not None and args.server:
+        parser.error("--heuristic-cache runs in this process's workers, not with --server.")
+    if args.resume and not args.output:
+        parser.error("--resume needs --output.")
+    if args.layers and args.domain == 'wgc':
+        parser.error("--layers is only supported for the puzzle domains.")
+    if args.layers and (args.randomstart or args.instances_file or args.gentable):
+        parser.error("--layers takes a single start state, not --randomstart, --instances-file or --gentable.")
+    if args.max_layer is not None and not args.layers:
+        parser.error("--max-layer needs --layers.")
+    if args.max_layer is not None and args.max_layer < 0:
+        parser.error("--max-layer cannot be negative.")
+    if args.memory_mb <= 0:
+        parser.error("--memory-mb must be positive.")
 
+    size = args.size if args.domain == 'npuzzle' else 3
+    domain_name = f"{size * size - 1}-Puzzle" if args.domain == 'npuzzle' else DOMAIN_NAMES[args.domain]
     initial_states = []
-    if args.domain == '8puzzle':
+    if args.domain in ('8puzzle', 'npuzzle'):
         if args.randomstart:
-            print(f"Generating {args.instances} random 8-puzzle instance(s)...")
-            puzzles = set()
-            while len(puzzles) < args.instances:
-                puzzles.add(generate_puzzle(shuffles=args.shuffles))
-            initial_states = list(puzzles)
+            print(f"Generating {args.instances} random {domain_name} instance(s)...")
+            if args.seed is not None:
+                random.seed(args.seed)
+            try:
+                if args.sampling:
+                    initial_states = sample_unique(args.instances, args.sampling, size, args.shuffles, args.depth)
+                else:
+                    initial_states = sample_unique(args.instances, 'walk', size, args.shuffles,
+                                                   sampler=lambda: generate_puzzle(shuffles=args.shuffles, size=size))
+            except ValueError as e:
+                parser.error(str(e))
+        elif args.instances_file:
+            try:
+                initial_states = list(read_instances(args.instances_file))
+            except (OSError, ValueError) as e:
+                parser.error(str(e))
+            print(f"Read {len(initial_states)} {domain_name} instance(s) from '{args.instances_file}'.")
         elif args.initial_state:
             try:
                 initial_states.append(tuple(map(int, args.initial_state.split(','))))
             except (ValueError, TypeError):
-                parser.error("Initial state for 8-puzzle must be 9 unique comma-separated integers.")
+                parser.error(f"Initial state for the {domain_name} must be {size * size} unique comma-separated integers.")
     elif args.domain == 'wgc':
         initial_states.append(('0','0','0','0'))
 
-    all_instance_results = []
-    algo_map = {
-        'bfs': ('BFS', bfs, {}), 'ids': ('IDS', ids, {}),
-        'ucs': ('UCS', astar, {'heuristic_variant': 'h0'}),
-        'astar_h1': ('A* (h1)', astar, {'heuristic_variant': 'h1'}),
-        'astar_h2': ('A* (h2)', astar, {'heuristic_variant': 'h2'})
-    }
+    if args.layers:
+        state = initial_states[0] if initial_states else (GOAL_STATE if args.domain == '8puzzle' else goal_state(size))
+        print(f"Counting {domain_name} states by breadth-first depth from {','.join(map(str, state))}...")
+        run_layers(args.domain, state, size, args.memory_mb, args.work_dir, args.max_layer)
+        return
 
     algos_to_run = args.gentable if args.gentable else [args.algorithm]
     if algos_to_run == [None]:
         parser.error("You must specify an algorithm for a single run, or use --gentable.")
 
-    for i, state in enumerate(initial_states):
-        print(f"\n--- Running Instance {i+1}/{len(initial_states)} | Start State: {state} ---")
-        
-        if args.domain == 'wgc':
-            from domains.wgc import WGCProblem
-            problem = WGCProblem()
-            domain_name = "WGC"
+    algorithms = []
+    # HDA* run name -> the serial A* run it is compared with.
+    parallel_runs = {}
+    for algo_key in algos_to_run:
+        reason = skip_reason(algo_key, args.domain)
+        if reason:
+            print(f"Skipping {algo_key} for {args.domain} domain: {reason}.")
+            continue
+
+        if args.gentable:
+            name, func, kwargs = ALGORITHMS[algo_key]
         else:
-            from domains.eight_puzzle import EightPuzzleProblem
-            problem = EightPuzzleProblem(state)
-            domain_name = "8-Puzzle"
-
-        instance_results_data = {}
-        for algo_key in algos_to_run:
-            if algo_key in ['ucs', 'astar_h1', 'astar_h2'] and args.domain != '8puzzle':
-                print(f"Skipping {algo_key} for {args.domain} domain.")
-                continue
+            try:
+                name, func, kwargs = resolve_algorithm(args.algorithm, args.heuristic)
+            except ValueError as e:
+                parser.error(str(e))
 
-            if args.gentable:
-                 name, func, kwargs = algo_map[algo_key]
-            else:
-                name = args.algorithm.upper()
-                func = {'bfs': bfs, 'ids': ids, 'astar': astar, 'ucs': astar}.get(args.algorithm)
-                kwargs = {}
-                if args.algorithm in ['astar', 'ucs']:
-                    heuristic = 'h0' if args.algorithm == 'ucs' else args.heuristic
-                    if args.algorithm == 'astar' and not heuristic: parser.error("A* requires --heuristic.")
-                    kwargs = {'heuristic_variant': heuristic}
-                    name = f"A* ({heuristic.upper()})" if args.algorithm == 'astar' else "UCS"
-            
-            print(f"  - Running {name}...")
-            solution_node, metrics = func(problem, **kwargs)
-            
-            result_entry = {}
-            if solution_node:
-                result_entry.update({
-                    "Solution Cost": solution_node.path_cost, "Solution Depth": solution_node.depth,
-                    "Nodes Generated": metrics['nodes_generated'], "Nodes Expanded": metrics['nodes_expanded'],
-                    "Max Frontier Size": metrics['max_frontier_size'],
-                    "node": solution_node
-                })
-            else:
-                result_entry.update({m: 'N/A' for m in ["Solution Cost", "Solution Depth"]})
-                result_entry.update(metrics)
-                result_entry['node'] = None
-            instance_results_data[name] = result_entry
-
-        all_instance_results.append({
-            'initial_state': state,
-            'domain': domain_name,
-            'results_data': instance_results_data
-        })
-
-    if args.gentable:
-        generate_table_images(all_instance_results)
+        if func is astar and args.time_budget is not None and kwargs['heuristic_variant'] != 'h0':
+            initial_weight = args.weight if args.weight is not None else 5.0
+            name, func = f"{name} [ARA* w={initial_weight:g}, {args.time_budget:g}s]", ara_star
+            kwargs = dict(kwargs, initial_weight=initial_weight, time_budget=args.time_budget)
+        elif func is astar and args.batch_size:
+            name, func = f"{name} [batch {args.batch_size}]", astar_batched
+            kwargs = dict(kwargs, batch_size=args.batch_size)
+        elif func is astar:
+            kwargs = dict(kwargs, frontier=args.frontier)
+            if args.weight is not None and args.weight != 1 and kwargs['heuristic_variant'] != 'h0':
+                name = f"{name} [w={args.weight:g}]"
+                kwargs['weight'] = args.weight
+            if args.check_heuristic:
+                kwargs['check_heuristic'] = True
+        algorithms.append((name, func, kwargs))
+        if args.parallel and func is astar:
+            from parallel_search import hda_star
+            parallel_name = f"{name} [HDA* x{args.parallel}]"
+            parallel_runs[parallel_name] = name
+            algorithms.append((parallel_name, hda_star, {'heuristic_variant': kwargs['heuristic_variant'], 'workers': args.parallel}))
+
+    jobs = [
+        {'instance': i, 'domain': args.domain, 'state': state, 'packed': args.packed,
+         'size': args.size if args.domain == 'npuzzle' else None,
+         'name': name, 'func': func, 'kwargs': kwargs, 'profile': bool(args.profile), 'cache': args.cache,
+         'compile': args.compile,
+         'heuristic_cache': {'capacity': args.heuristic_cache, 'policy': args.heuristic_cache_policy,
+                             'path': args.heuristic_cache_file} if args.heuristic_cache is not None else None,
+         'budget': {'timeout': args.timeout, 'max_expansions': args.max_nodes}
+                   if args.timeout is not None or args.max_nodes is not None else None}
+        for i, state in enumerate(initial_states)
+        for name, func, kwargs in algorithms
+    ]
+
+    completed = set()
+    if args.resume and os.path.exists(args.output):
+        completed = read_completed(args.output)
+        remaining = [job for job in jobs if record_key(job['state'], job['name']) not in completed]
+        print(f"Resuming from '{args.output}': {len(jobs) - len(remaining)} of {len(jobs)} job(s) already done.")
+        jobs = remaining
+    writer = ResultWriter(args.output, append=args.resume) if args.output else None
+    jobs_per_instance = collections.Counter(job['instance'] for job in jobs)
+
+    # Only --gentable without --summary keeps per-instance results (without Node chains)
+    # until the end; otherwise each instance is reported as soon as its last job finishes.
+    table_instances = []
+    summary = SummaryAggregator() if args.summary else None
+    profile_traces = []
+    worker_stats = {}
+    throughput_totals = {}
+    cache_hits = cache_lookups = cache_early_stops = 0
+    heuristic_cache_counts = [0, 0, 0]
+    budget_hits = collections.Counter()
+    instances_done = 0
+    batch_start = time.perf_counter()
+    executor = None
+    client = None
+    if args.server:
+        from solver_service import ServiceClient
+        client = ServiceClient(args.server)
+    if client is not None:
+        print(f"Sending {len(jobs)} job(s) to the solver service at {args.server}...")
+        if args.workers > 1:
+            executor = ThreadPoolExecutor(max_workers=args.workers)
+            job_results = executor.map(client.solve_job, jobs)
+        else:
+            job_results = map(client.solve_job, jobs)
+    elif args.workers > 1:
+        print(f"Dispatching {len(jobs)} job(s) to {args.workers} worker processes...")
+        executor = ProcessPoolExecutor(max_workers=args.workers)
+        job_results = executor.map(run_job, jobs)
     else:
-        for instance in all_instance_results:
-            print(f"\n--- CONSOLE REPORT: Instance starting {instance['initial_state']} ---")
-            for algo_name, results in instance['results_data'].items():
-                print(f"\nDomain: {instance['domain']} | Algorithm: {algo_name}")
-                solution_node = results['node']
+        job_results = _run_serial(jobs, len(initial_states))
+
+    try:
+        for i, state in enumerate(initial_states):
+            if not jobs_per_instance[i]:
+                continue
+            # Built on first use: a start state that failed the precheck may not even be a board.
+            problem = None
+            instance_results_data = {}
+            for _ in range(jobs_per_instance[i]):
+                job_result = next(job_results)
+                name, metrics, elapsed = job_result['name'], job_result['metrics'], job_result['wall_time']
+                if executor is not None:
+                    if not instance_results_data:
+                        print(f"\n--- Instance {i+1}/{len(initial_states)} | Start State: {state} ---")
+                    print(f"  - {name} finished on worker {job_result['worker']} in {elapsed:.3f}s")
+                if writer is not None:
+                    writer.write(make_record(i, args.domain, state, job_result))
+
+                stats = worker_stats.setdefault(job_result['worker'], [0, 0.0, 0.0])
+                stats[0] += 1
+                stats[1] += elapsed
+                stats[2] += job_result['cpu_time']
+                if job_result['cache'] is not None:
+                    cache_lookups += 1
+                    cache_hits += job_result['cache'] == 'hit'
+                    cache_early_stops += job_result['cache'] == 'miss' and 'cached_suffix' in metrics
+                if 'budget_hit' in metrics:
+                    budget_hits[metrics['budget_hit']] += 1
+                if 'heuristic_cache_hits' in metrics and job_result['cache'] != 'hit':
+                    heuristic_cache_counts[0] += metrics['heuristic_cache_hits']
+                    heuristic_cache_counts[1] += metrics['heuristic_cache_misses']
+                    heuristic_cache_counts[2] += metrics['heuristic_cache_evictions']
+                if job_result['cache'] != 'hit':
+                    algo_totals = throughput_totals.setdefault(name, [0, 0.0])
+                    algo_totals[0] += metrics['nodes_expanded']
+                    algo_totals[1] += elapsed
+                if job_result['profile'] is not None:
+                    profile_traces.append({'instance': i, 'initial_state': list(state), 'algorithm': name, 'profile': job_result['profile']})
+
+                solution_node = None
+                if job_result['actions'] is not None:
+                    if problem is None:
+                        problem = build_problem(args.domain, state, args.packed, size)
+                    solution_node = replay_actions(problem, job_result['actions'])
+
+                result_entry = {}
                 if solution_node:
-                    print("-" * 25)
-                    print("Solution Found!")
-                    print(f"Solution cost: {results['Solution Cost']} | Depth: {results['Solution Depth']}")
-                    print(f"Nodes generated: {results['Nodes Generated']} | Nodes expanded: {results['Nodes Expanded']} | Max frontier: {results['Max Frontier Size']}")
-                    path = format_wgc_path(solution_node)
-                    print("Path:")
-                    if instance['domain'] == '8-Puzzle':
-                        for i, (p_state, action, c_state) in enumerate(path, 1):
-                            print(f"\nStep {i}: Action: {action}\nFrom:"); print_8puzzle_state(p_state); print("To:"); print_8puzzle_state(c_state)
-                    else:
-                        for i, (p_state, action, c_state) in enumerate(path, 1):
-                            print(f"  {i}) {action:<15} {p_state} -> {c_state}")
+                    result_entry.update({
+                        "Solution Cost": solution_node.path_cost, "Solution Depth": solution_node.depth,
+                        "Nodes Generated": metrics['nodes_generated'], "Nodes Expanded": metrics['nodes_expanded'],
+                        "Max Frontier Size": metrics['max_frontier_size'],
+                        "node": solution_node
+                    })
                 else:
-                    print("\nNo solution found.")
-                    print(f"Nodes generated: {results['nodes_generated']} | Nodes expanded: {results['nodes_expanded']} | Max frontier: {results['max_frontier_size']}")
+                    result_entry.update({m: 'N/A' for m in ["Solution Cost", "Solution Depth"]})
+                    result_entry.update(metrics)
+                    result_entry['node'] = None
+                for metric_key, label in EXTRA_METRICS.items():
+                    if metric_key in metrics:
+                        result_entry[label] = metrics[metric_key]
+                if metrics.get('solutions'):
+                    result_entry['Improvements'] = metrics['solutions']
+                if metrics.get('workers'):
+                    result_entry['Per-Worker'] = metrics['workers']
+                if args.verify_optimal and solution_node and args.domain == '8puzzle':
+                    result_entry['Optimal Cost'] = problem.heuristic(problem.initial_state, 'hstar')
+                analysis = job_result['analysis']
+                if analysis['status'] != 'ok':
+                    result_entry['Status'] = analysis['status']
+                    result_entry['Reason'] = analysis['reason']
+                if analysis['lower_bound'] is not None:
+                    result_entry['Lower Bound'] = analysis['lower_bound']
+                result_entry['Runtime (s)'] = elapsed
+                result_entry['Peak RSS (MB)'] = job_result['peak_rss_mb']
+                result_entry['Nodes/sec'] = metrics['nodes_expanded'] / elapsed if elapsed > 0 and job_result['cache'] != 'hit' else 0.0
+                if job_result['cache'] is not None:
+                    result_entry['Solution Cache'] = job_result['cache']
+                if job_result['profile'] is not None:
+                    result_entry['profile'] = job_result['profile']
+                instance_results_data[name] = result_entry
+                if summary is not None:
+                    summary.add(name, result_entry)
+
+            for parallel_name, serial_name in parallel_runs.items():
+                parallel_entry = instance_results_data.get(parallel_name)
+                serial_entry = instance_results_data.get(serial_name)
+                if (parallel_entry and serial_entry and parallel_entry['Runtime (s)'] > 0
+                        and 'hit' not in (parallel_entry.get('Solution Cache'), serial_entry.get('Solution Cache'))):
+                    parallel_entry['Speedup over A*'] = serial_entry['Runtime (s)'] / parallel_entry['Runtime (s)']
+
+            instances_done += 1
+            instance = {
+                'initial_state': state,
+                'domain': domain_name,
+                'problem': problem,
+                'results_data': instance_results_data
+            }
+            if args.gentable:
+                if summary is None:
+                    for result_entry in instance_results_data.values():
+                        result_entry['node'] = None
+                    instance['problem'] = None
+                    table_instances.append(instance)
+            else:
+                print_instance_report(instance)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if writer is not None:
+            writer.close()
+    batch_elapsed = time.perf_counter() - batch_start
+
+    if writer is not None:
+        print(f"\nStreamed {len(jobs)} record(s) to '{args.output}'.")
+    if args.profile and args.profile != '-':
+        with open(args.profile, 'w') as f:
+            json.dump(profile_traces, f, indent=1)
+        print(f"\nWrote {len(profile_traces)} profile trace(s) to '{args.profile}'.")
+
+    if summary is not None:
+        write_summary(summary, args.summary)
+    elif args.gentable and table_instances:
+        generate_table_images(table_instances)
+
+    if args.workers > 1:
+        print_worker_summary(worker_stats)
+    if client is not None:
+        print_service_summary(client.stats())
+    if args.timeout is not None or args.max_nodes is not None:
+        print_budget_summary(budget_hits, len(jobs))
+    if args.cache:
+        print_cache_summary(cache_hits, cache_lookups, cache_early_stops)
+    if args.heuristic_cache is not None:
+        print_heuristic_cache_summary(*heuristic_cache_counts)
+        # Worker processes keep their own caches; only one run in this process has them all.
+        if args.heuristic_cache_file and executor is None and heuristic_caches():
+            save_heuristic_caches(heuristic_caches(), args.heuristic_cache_file)
+            print(f"Saved {sum(map(len, heuristic_caches().values())):,} heuristic cache entries to '{args.heuristic_cache_file}'.")
+    if instances_done > 1:
+        print_throughput_summary(throughput_totals, instances_done, batch_elapsed, packed=args.packed)
 
 if __name__ == "__main__":
     main()
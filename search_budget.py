@@ -0,0 +1,81 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+
+BUDGET_EXCEEDED = 'budget_exceeded'
+BUDGET_LIMITS = ('deadline', 'max_expansions', 'max_frontier', 'cancelled')
+
+class CancellationToken:
+    """A flag another thread sets with cancel() to stop a search at its next budget check."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    def is_set(self) -> bool:
+        return self._event.is_set()
+
+class SearchBudget:
+    """
+    Limits for one search, passed to a search function as budget=. Searches call
+    on_expand(frontier_size) before each expansion; it returns the name of the limit
+    that was hit (one of BUDGET_LIMITS) or None. Once a limit is hit, every later
+    call returns it too, so recursive searches unwind quickly.
+
+    deadline is a time.monotonic() value; the clock and cancel_token (anything with
+    is_set(), e.g. a CancellationToken or a multiprocessing.Event) are only checked
+    every check_every expansions. max_frontier caps the frontier (or, for depth-first
+    searches, the path/stack) size, the main driver of memory use.
+    """
+
+    def __init__(self, deadline: Optional[float] = None, max_expansions: Optional[int] = None,
+                 max_frontier: Optional[int] = None, cancel_token: Any = None, check_every: int = 64):
+        self.deadline = deadline
+        self.max_expansions = max_expansions
+        self.max_frontier = max_frontier
+        self.cancel_token = cancel_token
+        self.check_every = check_every
+        self.expansions = 0
+        self.exceeded: Optional[str] = None
+
+    @classmethod
+    def with_timeout(cls, timeout: Optional[float], **limits) -> 'SearchBudget':
+        """A budget whose deadline is timeout seconds from now (no deadline for None)."""
+        return cls(deadline=time.monotonic() + timeout if timeout is not None else None, **limits)
+
+    def on_expand(self, frontier_size: int) -> Optional[str]:
+        if self.exceeded is not None:
+            return self.exceeded
+        if self.max_expansions is not None and self.expansions >= self.max_expansions:
+            self.exceeded = 'max_expansions'
+        elif self.max_frontier is not None and frontier_size > self.max_frontier:
+            self.exceeded = 'max_frontier'
+        elif self.expansions % self.check_every == 0:
+            if self.cancel_token is not None and self.cancel_token.is_set():
+                self.exceeded = 'cancelled'
+            elif self.deadline is not None and time.monotonic() > self.deadline:
+                self.exceeded = 'deadline'
+        self.expansions += 1
+        return self.exceeded
+
+    def poll(self, expansions: int, frontier_size: int) -> Optional[str]:
+        """Checks every limit against counts kept elsewhere (e.g. by worker processes); for a coordinating loop."""
+        if self.exceeded is None:
+            self.expansions = expansions
+            if self.max_expansions is not None and expansions >= self.max_expansions:
+                self.exceeded = 'max_expansions'
+            elif self.max_frontier is not None and frontier_size > self.max_frontier:
+                self.exceeded = 'max_frontier'
+            elif self.cancel_token is not None and self.cancel_token.is_set():
+                self.exceeded = 'cancelled'
+            elif self.deadline is not None and time.monotonic() > self.deadline:
+                self.exceeded = 'deadline'
+        return self.exceeded
+
+def budget_exceeded(budget: SearchBudget, metrics: Dict[str, Any]) -> Dict[str, Any]:
+    """Marks metrics as belonging to a search stopped by budget; the metrics so far are kept."""
+    metrics["status"] = BUDGET_EXCEEDED
+    metrics["budget_hit"] = budget.exceeded
+    return metrics
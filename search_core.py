@@ -1,8 +1,22 @@
+import bisect
 import collections
+import copy
+import json
+import math
 import heapq
+import mmap
+import os
+import shutil
+import tempfile
+import time
+from array import array
 from typing import Any, Dict, Optional, Tuple, List
 
+from search_budget import budget_exceeded
+
 class Node:
+    __slots__ = ('state', 'parent', 'action', 'path_cost', 'depth')
+
     def __init__(self, state: Any, parent: Optional['Node'] = None, action: Optional[str] = None, path_cost: int = 0):
         self.state = state
         self.parent = parent
@@ -14,119 +28,996 @@ class Node:
 
     def __repr__(self) -> str:
         return f"<Node {self.state}>"
-    
-def astar(problem, heuristic_variant: str) -> Tuple[Optional[Node], Dict[str, int]]:
+
+class NodeArena:
+    """
+    Struct-of-arrays node store. A node is an integer index into array-backed
+    parent, action-id and path-cost columns; states are kept in a plain list (they
+    are shared with the explored table). Only the solution is turned back into a
+    Node chain, by to_node.
+    """
+
+    def __init__(self):
+        self.states: List[Any] = []
+        self.parents = array('i')
+        self.action_ids = array('i')
+        self.path_costs = array('q')
+        self._actions: List[Any] = []
+        self._action_index: Dict[Any, int] = {}
+
+    def add(self, state: Any, parent: int = -1, action: Any = None, path_cost: int = 0) -> int:
+        action_id = self._action_index.get(action)
+        if action_id is None:
+            action_id = self._action_index[action] = len(self._actions)
+            self._actions.append(action)
+        self.states.append(state)
+        self.parents.append(parent)
+        self.action_ids.append(action_id)
+        try:
+            self.path_costs.append(path_cost)
+        except TypeError:
+            # Non-integer step costs: fall back to a float column.
+            self.path_costs = array('d', self.path_costs)
+            self.path_costs.append(path_cost)
+        return len(self.states) - 1
+
+    def to_node(self, index: int) -> Node:
+        chain = []
+        while index >= 0:
+            chain.append(index)
+            index = self.parents[index]
+        node = None
+        for index in reversed(chain):
+            action = self._actions[self.action_ids[index]] if node is not None else None
+            node = Node(self.states[index], node, action, self.path_costs[index])
+        return node
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+class HeapFrontier:
+    """Binary-heap frontier ordered by (f, insertion order). Improved paths are pushed
+    as new entries; the stale ones are left in the heap for the caller to skip."""
+
+    def __init__(self):
+        self._heap = []
+        self._counter = 0
+        self._batch = []
+
+    def push(self, f_cost: int, g_cost: int, key: Any, item: Any):
+        heapq.heappush(self._heap, (f_cost, self._counter, item))
+        self._counter += 1
+
+    def pop(self) -> Tuple[int, Any]:
+        f_cost, _, item = heapq.heappop(self._heap)
+        return f_cost, item
+
+    def pop_batch(self, limit: int) -> Tuple[int, List[Any]]:
+        """
+        Pops up to limit items sharing the minimum f, in the order pop() would return
+        them. The entries are kept until the next pop_batch for restore_batch.
+        """
+        heap = self._heap
+        f_cost = heap[0][0]
+        entries = self._batch = []
+        while heap and heap[0][0] == f_cost and len(entries) < limit:
+            entries.append(heapq.heappop(heap))
+        return f_cost, [entry[2] for entry in entries]
+
+    def restore_batch(self, start: int):
+        """Puts the last batch's items from position start on back, in their original insertion order."""
+        for entry in self._batch[start:]:
+            heapq.heappush(self._heap, entry)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+class BucketFrontier:
+    """
+    Bucket (radix) frontier for integer f-values, as found in unit-cost domains.
+    Each f has its own bucket; within a bucket items are popped LIFO, or highest g
+    first with tie_break='g'. Pushing a key that is already queued replaces the old
+    entry (decrease-key), so no stale entries are ever stored.
+    """
+
+    def __init__(self, tie_break: str = 'lifo'):
+        if tie_break not in ('lifo', 'g'):
+            raise ValueError(f"Unknown tie-break rule: {tie_break}")
+        self._by_g = tie_break == 'g'
+        self._buckets: List[Dict] = []
+        self._entries: Dict[Any, Tuple[int, int]] = {}
+        self._min_f = 0
+
+    def push(self, f_cost: int, g_cost: int, key: Any, item: Any):
+        old_entry = self._entries.get(key)
+        if old_entry is not None:
+            self._remove(key, *old_entry)
+        while len(self._buckets) <= f_cost:
+            self._buckets.append({})
+        bucket = self._buckets[f_cost]
+        if self._by_g:
+            bucket = bucket.setdefault(g_cost, {})
+        bucket[key] = item
+        self._entries[key] = (f_cost, g_cost)
+        if f_cost < self._min_f or len(self._entries) == 1:
+            self._min_f = f_cost
+
+    def pop(self) -> Tuple[int, Any]:
+        if not self._entries:
+            raise IndexError("pop from an empty frontier")
+        while not self._buckets[self._min_f]:
+            self._min_f += 1
+        f_cost = self._min_f
+        bucket = self._buckets[f_cost]
+        if self._by_g:
+            g_cost = max(bucket)
+            g_bucket = bucket[g_cost]
+            key, item = g_bucket.popitem()
+            if not g_bucket:
+                del bucket[g_cost]
+        else:
+            key, item = bucket.popitem()
+        del self._entries[key]
+        return f_cost, item
+
+    def _remove(self, key: Any, f_cost: int, g_cost: int):
+        bucket = self._buckets[f_cost]
+        if self._by_g:
+            g_bucket = bucket[g_cost]
+            del g_bucket[key]
+            if not g_bucket:
+                del bucket[g_cost]
+        else:
+            del bucket[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+FRONTIERS = {
+    'heap': HeapFrontier,
+    'bucket': BucketFrontier,
+    'bucket_g': lambda: BucketFrontier(tie_break='g'),
+}
+
+def _make_frontier(frontier: Any):
+    if isinstance(frontier, str):
+        if frontier not in FRONTIERS:
+            raise ValueError(f"Unknown frontier: {frontier}")
+        return FRONTIERS[frontier]()
+    return frontier
+
+def _check_heuristic(problem, state: Any, heuristic_variant: str, h_cost: int):
+    expected = problem.heuristic(state, heuristic_variant)
+    if h_cost != expected:
+        raise AssertionError(
+            f"Incremental {heuristic_variant} gave {h_cost} for {state}, full evaluation gives {expected}"
+        )
+
+def _splice_suffix(problem, node: Node, actions: List[Any]) -> Node:
+    for action in actions:
+        node = Node(problem.result(node.state, action), node, action,
+                    node.path_cost + problem.step_cost(node.state, action))
+    return node
+
+DEFAULT_MAX_COMPILED_STATES = 100000
+_COMPILED_FORMAT_VERSION = 1
+
+class StateSpaceTooLarge(ValueError):
+    """Raised by compile_problem when more than max_states states are reachable."""
+
+class CompiledProblem:
+    """
+    A problem's reachable state graph with integer states 0..N-1 in CSR form: the edges leaving state s are offsets[s]..offsets[s + 1] - 1,
+    each with a target state, a step cost and an action label. Actions are edge ids,
+    so actions/result/step_cost/is_goal are array lookups. decode_state and
+    action_name give back the original states and actions, and decompile turns a
+    solution Node into one over the original problem. Heuristics are computed on the
+    original states the first time each compiled state asks for them.
+
+    The initial state is start_id (0, the state it was compiled from, by default);
+    with_start gives the same graph searched from another of its states, so one
+    compilation serves every start state in the space. reverse_heuristic (an
+    estimate of the distance from the start) is asked of the problem given to
+    with_start, whose initial state is the new start.
+    """
+
+    def __init__(self, problem, states: List[Any], offsets: array, targets: array, costs: array,
+                 edge_actions: array, action_labels: List[Any], goals: bytearray,
+                 ids: Optional[Dict[Any, int]] = None):
+        self.problem = problem
+        self.states = states
+        self.ids = ids if ids is not None else {state: i for i, state in enumerate(states)}
+        self.start_id = 0
+        self.offsets = offsets
+        self.targets = targets
+        self.costs = costs
+        self.edge_actions = edge_actions
+        self.action_labels = action_labels
+        self.goals = goals
+        goal_ids = [s for s in range(len(states)) if goals[s]]
+        # Only a unique goal can be searched backward from (bidirectional search).
+        self.goal_state = goal_ids[0] if len(goal_ids) == 1 else None
+        # Per-variant heuristic values and the predecessor lists (built on first use), shared with with_start views.
+        self._tables: Dict[str, List[Any]] = {}
+        self._predecessors: List[Optional[List[Tuple[int, int]]]] = []
+        # Per-variant reverse heuristic values, which depend on the start state.
+        self._reverse_tables: Dict[str, List[Any]] = {}
+
+    @property
+    def initial_state(self) -> int:
+        return self.start_id
+
+    def with_start(self, state: Any, problem: Any = None) -> Optional['CompiledProblem']:
+        """
+        This graph searched from the original state, or None if state is not in it.
+        problem, if given, is the original problem started from state.
+        """
+        start_id = self.ids.get(state)
+        if start_id is None:
+            return None
+        view = copy.copy(self)
+        view.start_id = start_id
+        if problem is not None:
+            view.problem = problem
+        view._reverse_tables = {}
+        return view
+
+    def is_goal(self, state: int) -> bool:
+        return self.goals[state] == 1
+
+    def actions(self, state: int) -> range:
+        return range(self.offsets[state], self.offsets[state + 1])
+
+    def result(self, state: int, action: int) -> int:
+        return self.targets[action]
+
+    def step_cost(self, state: int, action: int) -> Any:
+        return self.costs[action]
+
+    def heuristic(self, state: int, variant: str) -> Any:
+        values = self._tables.get(variant)
+        if values is None:
+            values = self._tables[variant] = [None] * len(self.states)
+        h_cost = values[state]
+        if h_cost is None:
+            h_cost = values[state] = self.problem.heuristic(self.states[state], variant)
+        return h_cost
+
+    def reverse_heuristic(self, state: int, variant: str) -> Any:
+        values = self._reverse_tables.get(variant)
+        if values is None:
+            values = self._reverse_tables[variant] = [None] * len(self.states)
+        h_cost = values[state]
+        if h_cost is None:
+            h_cost = values[state] = self.problem.reverse_heuristic(self.states[state], variant)
+        return h_cost
+
+    def predecessors(self, state: int) -> List[Tuple[int, int]]:
+        """
+        The original problem's predecessors as (edge, state id) pairs, in its order
+        so backward searches break ties as they do uncompiled. Predecessors that are
+        not reachable from the compiled start cannot lie on a solution and are left out.
+        """
+        reverse = self._predecessors
+        if not reverse:
+            # Filled in place, so every with_start view sees it.
+            reverse.extend([None] * len(self.states))
+        edges = reverse[state]
+        if edges is None:
+            edges = reverse[state] = []
+            for action, previous_state in self.problem.predecessors(self.states[state]):
+                source = self.ids.get(previous_state)
+                if source is None:
+                    continue
+                for edge in self.actions(source):
+                    if self.targets[edge] == state and self.action_labels[self.edge_actions[edge]] == action:
+                        edges.append((edge, source))
+                        break
+        return edges
+
+    def decode_state(self, state: int) -> Any:
+        return self.states[state]
+
+    def action_name(self, action: int) -> Any:
+        return self.action_labels[self.edge_actions[action]]
+
+    def decompile(self, node: Optional[Node]) -> Optional[Node]:
+        """The same solution as a Node chain over the original problem's states and actions."""
+        if node is None:
+            return None
+        chain = []
+        while node is not None:
+            chain.append(node)
+            node = node.parent
+        decoded = None
+        for compiled in reversed(chain):
+            action = self.action_name(compiled.action) if decoded is not None else None
+            decoded = Node(self.states[compiled.state], decoded, action, compiled.path_cost)
+        return decoded
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def save(self, path: str):
+        data = {
+            'version': _COMPILED_FORMAT_VERSION,
+            'problem': type(self.problem).__name__,
+            'states': self.states,
+            'offsets': list(self.offsets), 'targets': list(self.targets), 'costs': list(self.costs),
+            'edge_actions': list(self.edge_actions), 'action_labels': self.action_labels,
+            'goals': list(self.goals),
+        }
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, problem, path: str) -> Optional['CompiledProblem']:
+        """The graph saved at path, or None if it is missing, from another version or compiled from another problem."""
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            data = json.load(f)
+        decode = lambda value: tuple(decode(v) for v in value) if isinstance(value, list) else value
+        states = [decode(state) for state in data['states']]
+        if data.get('version') != _COMPILED_FORMAT_VERSION or data['problem'] != type(problem).__name__ or not states:
+            return None
+        costs = data['costs']
+        return cls(problem, states, array('q', data['offsets']), array('l', data['targets']),
+                   array('d', costs) if any(isinstance(c, float) for c in costs) else array('q', costs),
+                   array('l', data['edge_actions']), [decode(a) for a in data['action_labels']], bytearray(data['goals']))
+
+def compile_problem(problem, max_states: int = DEFAULT_MAX_COMPILED_STATES,
+                    cache_path: Optional[str] = None) -> CompiledProblem:
+    """
+    Enumerates the states reachable from problem.initial_state (breadth-first,
+    keeping each state's action order) through actions/result/step_cost/is_goal,
+    and returns them as a CompiledProblem. Raises StateSpaceTooLarge once more than
+    max_states states are found, so unbounded or huge spaces are never materialized.
+    With cache_path, a graph saved there for the same kind of problem is loaded
+    instead (searched from problem.initial_state, which must be one of its states),
+    and a newly compiled one is saved there.
+    """
+    if cache_path is not None:
+        compiled = CompiledProblem.load(problem, cache_path)
+        if compiled is not None:
+            if len(compiled) > max_states:
+                raise StateSpaceTooLarge(f"the saved graph has {len(compiled)} states, more than {max_states}; not using it")
+            view = compiled.with_start(problem.initial_state, problem)
+            if view is not None:
+                return view
+    start_state = problem.initial_state
+    states = [start_state]
+    ids = {start_state: 0}
+    offsets = array('q', [0])
+    targets = array('l')
+    costs = array('q')
+    edge_actions = array('l')
+    action_labels: List[Any] = []
+    label_ids: Dict[Any, int] = {}
+    goals = bytearray()
+
+    for state in states:
+        goals.append(1 if problem.is_goal(state) else 0)
+        for action in problem.actions(state):
+            child_state = problem.result(state, action)
+            if child_state is None:
+                continue
+            child_id = ids.get(child_state)
+            if child_id is None:
+                if len(states) >= max_states:
+                    raise StateSpaceTooLarge(f"more than {max_states} reachable states; not compiling")
+                child_id = ids[child_state] = len(states)
+                states.append(child_state)
+            label_id = label_ids.get(action)
+            if label_id is None:
+                label_id = label_ids[action] = len(action_labels)
+                action_labels.append(action)
+            targets.append(child_id)
+            cost = problem.step_cost(state, action)
+            try:
+                costs.append(cost)
+            except TypeError:
+                costs = array('d', costs)
+                costs.append(cost)
+            edge_actions.append(label_id)
+        offsets.append(len(targets))
+
+    compiled = CompiledProblem(problem, states, offsets, targets, costs, edge_actions, action_labels, goals, ids)
+    if cache_path is not None:
+        compiled.save(cache_path)
+    return compiled
+
+def astar(problem, heuristic_variant: str, check_heuristic: bool = False, frontier: Any = 'heap',
+          observer: Any = None, exact_distances: Any = None, weight: float = 1,
+          budget: Any = None) -> Tuple[Optional[Node], Dict[str, int]]:
+    """
+    A* search; weight > 1 runs weighted A* (f = g + weight * h), whose cost is at most
+    weight times optimal (metrics["suboptimality_bound"]).
+    """
+    if weight < 1:
+        raise ValueError(f"weight must be at least 1, got {weight}")
+    # frontier: a name from FRONTIERS or an object with the same push/pop/__len__ interface.
+    if weight != 1 and isinstance(frontier, str) and frontier != 'heap':
+        raise ValueError("Weighted A* needs the heap frontier: f = g + w*h is not an integer.")
+    # An integer weight of 1 keeps f integral for the bucket frontiers.
+    weight = 1 if weight == 1 else weight
+    # observer (e.g. instrumentation.SearchProfiler) may wrap the problem, frontier and
+    # explored table and hears about every expansion; None adds no work to the loop.
+    if observer is not None:
+        problem = observer.wrap_problem(problem)
+    # heuristic_delta(parent_h, state, action, variant) derives a child's h from its
+    # parent's; None falls back to problem.heuristic. check_heuristic verifies each one.
+    heuristic_delta = getattr(problem, 'heuristic_delta', None)
     metrics = {
         "nodes_generated": 0,
         "nodes_expanded": 0,
         "max_frontier_size": 0,
+        "stale_pops": 0,
+        "reopened_nodes": 0,
     }
+    if weight != 1:
+        metrics["suboptimality_bound"] = weight
     
-    counter = 0
-    start_node = Node(problem.initial_state)
-    h_start = problem.heuristic(start_node.state, heuristic_variant)
-    f_start = start_node.path_cost + h_start
+    nodes = NodeArena()
+    start_state = problem.initial_state
+    start_index = nodes.add(start_state)
+    h_start = problem.heuristic(start_state, heuristic_variant)
+    # h per arena index: with a weight, h can no longer be recovered as f - g.
+    h_costs = [h_start]
     
-    frontier = [(f_start, counter, start_node)]
-    counter += 1
-    heapq.heapify(frontier)
+    frontier = _make_frontier(frontier)
+    if observer is not None:
+        frontier = observer.wrap_frontier(frontier)
+    frontier.push(weight * h_start, 0, start_state, start_index)
     
-    explored = {start_node.state: start_node.path_cost}
+    # explored maps each state to the arena index of its best node; closed flags expanded nodes.
+    explored = {start_state: start_index}
+    if observer is not None:
+        explored = observer.wrap_explored(explored)
+    closed = bytearray(1)
     
     metrics["nodes_generated"] += 1
     metrics["max_frontier_size"] = 1
 
     while frontier:
-        _, _, node = heapq.heappop(frontier)
-        if node.path_cost > explored[node.state]:
+        f_cost, node_index = frontier.pop()
+        state = nodes.states[node_index]
+        if explored[state] != node_index:
+            metrics["stale_pops"] += 1
             continue
+        g_cost = nodes.path_costs[node_index]
+        h_cost = h_costs[node_index]
+        # budget (search_budget.SearchBudget): stop with status 'budget_exceeded' and the metrics so far.
+        if budget is not None and budget.on_expand(len(frontier)):
+            return None, budget_exceeded(budget, metrics)
             
         metrics["nodes_expanded"] += 1
+        closed[node_index] = 1
+        if observer is not None:
+            observer.on_expand(f_cost, len(frontier))
 
-        if problem.is_goal(node.state):
-            return node, metrics
+        if problem.is_goal(state):
+            return nodes.to_node(node_index), metrics
+        # exact_distances (e.g. solution_cache.ExactDistances) knows true goal distances for
+        # some states, used as their h. Popping one ends the search: its f is the cost of a
+        # real solution and no frontier node can do better, so the cached suffix is spliced on.
+        if exact_distances is not None and exact_distances.get(state) is not None:
+            suffix = exact_distances.suffix(state)
+            metrics["cached_suffix"] = len(suffix)
+            return _splice_suffix(problem, nodes.to_node(node_index), suffix), metrics
 
-        for action in problem.actions(node.state):
-            child_state = problem.result(node.state, action)
+        for action in problem.actions(state):
+            child_state = problem.result(state, action)
             
             if child_state is None:
                 continue
 
-            g_cost_child = node.path_cost + problem.step_cost(node.state, action)
+            g_cost_child = g_cost + problem.step_cost(state, action)
 
-            if child_state not in explored or g_cost_child < explored[child_state]:
-                explored[child_state] = g_cost_child
-                
-                h_cost_child = problem.heuristic(child_state, heuristic_variant)
-                f_cost_child = g_cost_child + h_cost_child
-
-                child_node = Node(
-                    child_state,
-                    node,
-                    action,
-                    g_cost_child
-                )
+            known_index = explored.get(child_state)
+            if known_index is None or g_cost_child < nodes.path_costs[known_index]:
+                if known_index is not None and closed[known_index]:
+                    metrics["reopened_nodes"] += 1
                 
-                heapq.heappush(frontier, (f_cost_child, counter, child_node))
-                counter += 1
+                h_cost_child = None
+                if exact_distances is not None:
+                    h_cost_child = exact_distances.get(child_state)
+                if h_cost_child is None and heuristic_delta is not None:
+                    h_cost_child = heuristic_delta(h_cost, state, action, heuristic_variant)
+                    if h_cost_child is not None and check_heuristic:
+                        _check_heuristic(problem, child_state, heuristic_variant, h_cost_child)
+                if h_cost_child is None:
+                    h_cost_child = problem.heuristic(child_state, heuristic_variant)
+                f_cost_child = g_cost_child + weight * h_cost_child
+
+                child_index = nodes.add(child_state, node_index, action, g_cost_child)
+                h_costs.append(h_cost_child)
+                closed.append(0)
+                explored[child_state] = child_index
+                frontier.push(f_cost_child, g_cost_child, child_state, child_index)
                 metrics["nodes_generated"] += 1
                 metrics["max_frontier_size"] = max(metrics["max_frontier_size"], len(frontier))
 
     return None, metrics
 
-def bfs(problem) -> Tuple[Optional[Node], Dict[str, int]]:
+def ara_star(problem, heuristic_variant: str, initial_weight: float = 5.0, weight_step: float = 0.5,
+             time_budget: Optional[float] = None, budget: Any = None) -> Tuple[Optional[Node], Dict[str, Any]]:
+    """
+    Anytime Repairing A* (ARA*): a weighted A* search with initial_weight that
+    returns a first solution quickly, then repeatedly lowers the weight by
+    weight_step and improves the solution, reusing the previous search: states
+    whose g dropped after they were expanded (kept in an INCONS list) are merged
+    back into the frontier instead of restarting from scratch. Children that cannot
+    beat the incumbent (g + h >= its cost) are pruned.
+
+    After each improvement the incumbent's suboptimality bound is its cost divided
+    by the smallest g + h on the frontier and INCONS list, a lower bound on the
+    optimal cost. The search stops when the bound reaches 1 (optimal) or, with
+    time_budget in seconds, when time runs out; it then returns the best solution
+    found so far (None if there is none yet). Hitting a budget limit stops it the
+    same way, with metrics["budget_hit"] set; only without any solution is the
+    status 'budget_exceeded'.
+
+    metrics["solutions"] lists every improvement as {cost, weight, bound, seconds,
+    nodes_expanded}; metrics["time_to_first_solution"] and
+    metrics["suboptimality_bound"] describe the first and the returned solution.
+    """
+    if initial_weight < 1 or weight_step <= 0:
+        raise ValueError("ARA* needs initial_weight >= 1 and weight_step > 0.")
+    start_time = time.perf_counter()
+    deadline = start_time + time_budget if time_budget is not None else None
+    heuristic_delta = getattr(problem, 'heuristic_delta', None)
+    metrics = {
+        "nodes_generated": 0,
+        "nodes_expanded": 0,
+        "max_frontier_size": 0,
+        "stale_pops": 0,
+        "iterations": 0,
+        "solutions": [],
+    }
+
+    nodes = NodeArena()
+    start_state = problem.initial_state
+    start_index = nodes.add(start_state)
+    h_costs = [problem.heuristic(start_state, heuristic_variant)]
+    explored = {start_state: start_index}
+    metrics["nodes_generated"] += 1
+
+    incumbent = start_index if problem.is_goal(start_state) else None
+    incumbent_cost = 0 if incumbent is not None else math.inf
+    weight = initial_weight
+    counter = 0
+    open_heap = []
+    pending = [] if incumbent is not None else [start_index]
+    out_of_time = False
+
+    while True:
+        # Re-key the surviving frontier and the INCONS states with the current weight.
+        for node_index in pending:
+            heapq.heappush(open_heap, (nodes.path_costs[node_index] + weight * h_costs[node_index], counter, node_index))
+            counter += 1
+        metrics["max_frontier_size"] = max(metrics["max_frontier_size"], len(open_heap))
+        closed = set()
+        incons = []
+        metrics["iterations"] += 1
+        previous_cost = incumbent_cost
+
+        while open_heap:
+            f_cost, _, node_index = open_heap[0]
+            state = nodes.states[node_index]
+            if explored[state] != node_index:
+                heapq.heappop(open_heap)
+                metrics["stale_pops"] += 1
+                continue
+            if f_cost >= incumbent_cost:
+                break
+            if deadline is not None and time.perf_counter() > deadline:
+                out_of_time = True
+                break
+            if budget is not None and budget.on_expand(len(open_heap) + len(incons)):
+                out_of_time = True
+                break
+            heapq.heappop(open_heap)
+            closed.add(state)
+            metrics["nodes_expanded"] += 1
+            g_cost = nodes.path_costs[node_index]
+            h_cost = h_costs[node_index]
+
+            for action in problem.actions(state):
+                child_state = problem.result(state, action)
+                if child_state is None:
+                    continue
+                g_cost_child = g_cost + problem.step_cost(state, action)
+                known_index = explored.get(child_state)
+                if known_index is not None and g_cost_child >= nodes.path_costs[known_index]:
+                    continue
+
+                if known_index is not None:
+                    h_cost_child = h_costs[known_index]
+                else:
+                    h_cost_child = None
+                    if heuristic_delta is not None:
+                        h_cost_child = heuristic_delta(h_cost, state, action, heuristic_variant)
+                    if h_cost_child is None:
+                        h_cost_child = problem.heuristic(child_state, heuristic_variant)
+                metrics["nodes_generated"] += 1
+                if g_cost_child + h_cost_child >= incumbent_cost:
+                    continue
+
+                child_index = nodes.add(child_state, node_index, action, g_cost_child)
+                h_costs.append(h_cost_child)
+                explored[child_state] = child_index
+                if problem.is_goal(child_state):
+                    incumbent, incumbent_cost = child_index, g_cost_child
+                elif child_state in closed:
+                    incons.append(child_index)
+                else:
+                    heapq.heappush(open_heap, (g_cost_child + weight * h_cost_child, counter, child_index))
+                    counter += 1
+                    metrics["max_frontier_size"] = max(metrics["max_frontier_size"], len(open_heap) + len(incons))
+
+        pending = [node_index for _, _, node_index in open_heap
+                   if explored[nodes.states[node_index]] == node_index] + incons
+        open_heap = []
+        lower_bound = min((nodes.path_costs[i] + h_costs[i] for i in pending), default=math.inf)
+        if incumbent is None or lower_bound <= 0:
+            bound = math.inf
+        elif lower_bound >= incumbent_cost:
+            bound = 1.0
+        else:
+            bound = incumbent_cost / lower_bound
+        if not out_of_time:
+            # A completed iteration is weighted A* with this weight, so its solution is within it.
+            bound = min(bound, weight)
+        if incumbent is not None and incumbent_cost < previous_cost:
+            metrics["solutions"].append({
+                "cost": incumbent_cost, "weight": weight, "bound": bound,
+                "seconds": time.perf_counter() - start_time, "nodes_expanded": metrics["nodes_expanded"],
+            })
+        elif metrics["solutions"]:
+            metrics["solutions"][-1]["bound"] = bound
+        if out_of_time or bound <= 1 or not pending:
+            break
+        weight = max(1.0, weight - weight_step)
+
+    if budget is not None and budget.exceeded is not None:
+        if incumbent is None:
+            return None, budget_exceeded(budget, metrics)
+        metrics["budget_hit"] = budget.exceeded
+    elif out_of_time:
+        metrics["time_budget_exhausted"] = 1
+    if incumbent is None:
+        return None, metrics
+    metrics["time_to_first_solution"] = metrics["solutions"][0]["seconds"] if metrics["solutions"] else 0.0
+    metrics["suboptimality_bound"] = bound
+    return nodes.to_node(incumbent), metrics
+
+def astar_batched(problem, heuristic_variant: str, batch_size: int = 64, budget: Any = None) -> Tuple[Optional[Node], Dict[str, int]]:
+    """
+    A* that pops up to batch_size heap entries with the same (minimum) f and expands
+    them together through problem.expand_batch (see EightPuzzleProblem), which
+    generates children and their heuristics with NumPy. The popped entries are then
+    processed one at a time, in pop order, exactly as astar would: children pushed
+    during a batch get later insertion counters than every entry already in the
+    batch, so with a consistent heuristic the expansion order and all metrics match
+    astar with the heap frontier. If a child ever has a lower f than the batch
+    (inconsistent heuristic), the rest of the batch goes back into the heap with
+    its original insertion counters, so the metrics match astar then too.
+    """
+    expand_batch = getattr(problem, 'expand_batch', None)
+    if expand_batch is None:
+        raise ValueError(f"{type(problem).__name__} has no expand_batch; use astar instead.")
+    metrics = {
+        "nodes_generated": 0,
+        "nodes_expanded": 0,
+        "max_frontier_size": 0,
+        "stale_pops": 0,
+        "reopened_nodes": 0,
+    }
+
+    nodes = NodeArena()
+    start_state = problem.initial_state
+    start_index = nodes.add(start_state)
+    frontier = HeapFrontier()
+    frontier.push(problem.heuristic(start_state, heuristic_variant), 0, start_state, start_index)
+    explored = {start_state: start_index}
+    closed = bytearray(1)
+
+    metrics["nodes_generated"] += 1
+    metrics["max_frontier_size"] = 1
+
+    while frontier:
+        f_cost, batch = frontier.pop_batch(batch_size)
+
+        # Entries that are stale now stay stale; the rest are expanded up front.
+        live = [node_index for node_index in batch if explored[nodes.states[node_index]] == node_index]
+        live_states = [nodes.states[node_index] for node_index in live]
+        live_h = [f_cost - nodes.path_costs[node_index] for node_index in live]
+        rows, actions, child_states, child_h = expand_batch(live_states, live_h, heuristic_variant) if live else ([], [], [], [])
+        live_position = {node_index: position for position, node_index in enumerate(live)}
+
+        for position, node_index in enumerate(batch):
+            # The entries still waiting in this batch are part of astar's frontier.
+            waiting = len(batch) - position - 1
+            state = nodes.states[node_index]
+            if explored[state] != node_index:
+                metrics["stale_pops"] += 1
+                continue
+            g_cost = nodes.path_costs[node_index]
+            if budget is not None and budget.on_expand(len(frontier) + waiting + 1):
+                return None, budget_exceeded(budget, metrics)
+
+            metrics["nodes_expanded"] += 1
+            closed[node_index] = 1
+
+            if problem.is_goal(state):
+                return nodes.to_node(node_index), metrics
+
+            row = live_position[node_index]
+            lowest_child_f = f_cost
+            for child in range(bisect.bisect_left(rows, row), bisect.bisect_right(rows, row)):
+                action = actions[child]
+                child_state = child_states[child]
+                h_cost_child = child_h[child]
+                g_cost_child = g_cost + problem.step_cost(state, action)
+                known_index = explored.get(child_state)
+                if known_index is None or g_cost_child < nodes.path_costs[known_index]:
+                    if known_index is not None and closed[known_index]:
+                        metrics["reopened_nodes"] += 1
+                    f_cost_child = g_cost_child + h_cost_child
+                    lowest_child_f = min(lowest_child_f, f_cost_child)
+
+                    child_index = nodes.add(child_state, node_index, action, g_cost_child)
+                    closed.append(0)
+                    explored[child_state] = child_index
+                    frontier.push(f_cost_child, g_cost_child, child_state, child_index)
+                    metrics["nodes_generated"] += 1
+                    metrics["max_frontier_size"] = max(metrics["max_frontier_size"], len(frontier) + waiting)
+
+            if lowest_child_f < f_cost:
+                frontier.restore_batch(position + 1)
+                break
+
+    return None, metrics
+
+def bfs(problem, observer: Any = None, budget: Any = None) -> Tuple[Optional[Node], Dict[str, int]]:
+    if observer is not None:
+        problem = observer.wrap_problem(problem)
     metrics = {
         "nodes_generated": 0,
         "nodes_expanded": 0,
         "max_frontier_size": 0,
     }
     
-    start_node = Node(problem.initial_state)
+    nodes = NodeArena()
+    start_state = problem.initial_state
+    start_index = nodes.add(start_state)
     metrics["nodes_generated"] += 1
     
-    if problem.is_goal(start_node.state):
-        return start_node, metrics
+    if problem.is_goal(start_state):
+        return nodes.to_node(start_index), metrics
 
-    frontier = collections.deque([start_node])
-    explored = {start_node.state}
+    frontier = collections.deque([start_index])
+    explored = {start_state}
+    if observer is not None:
+        explored = observer.wrap_explored(explored)
     metrics["max_frontier_size"] = 1
 
     while frontier:
-        node = frontier.popleft()
+        node_index = frontier.popleft()
+        state = nodes.states[node_index]
+        if budget is not None and budget.on_expand(len(frontier) + 1):
+            return None, budget_exceeded(budget, metrics)
         metrics["nodes_expanded"] += 1
+        if observer is not None:
+            observer.on_expand(nodes.path_costs[node_index], len(frontier))
 
-        for action in problem.actions(node.state):
-            child_state = problem.result(node.state, action)
+        for action in problem.actions(state):
+            child_state = problem.result(state, action)
             
             if child_state is None or child_state in explored:
                 continue
 
             metrics["nodes_generated"] += 1
-            child_node = Node(
+            child_index = nodes.add(
                 child_state,
-                node,
+                node_index,
                 action,
-                node.path_cost + problem.step_cost(node.state, action)
+                nodes.path_costs[node_index] + problem.step_cost(state, action)
             )
 
-            if problem.is_goal(child_node.state):
-                return child_node, metrics
+            if problem.is_goal(child_state):
+                return nodes.to_node(child_index), metrics
             
             explored.add(child_state)
-            frontier.append(child_node)
+            frontier.append(child_index)
             metrics["max_frontier_size"] = max(metrics["max_frontier_size"], len(frontier))
     
     return None, metrics
 
-def ids(problem) -> Tuple[Optional[Node], Dict[str, int]]:
+# Rough bytes per buffered state (a Python int in a list, plus sorting), for external_bfs's memory budget.
+_EXTERNAL_BYTES_PER_STATE = 64
+_EXTERNAL_CHUNK_RECORDS = 1 << 16
+_EXTERNAL_MAX_OPEN_RUNS = 256
+
+def _write_records(path: str, values, words: int) -> int:
+    """Writes ints as fixed-width records of words 64-bit words (most significant first); returns the count."""
+    count = 0
+    chunk = array('Q')
+    with open(path, 'wb') as f:
+        for value in values:
+            if words == 1:
+                chunk.append(value)
+            else:
+                chunk.extend((value >> (64 * (words - 1 - j))) & 0xFFFFFFFFFFFFFFFF for j in range(words))
+            count += 1
+            if len(chunk) >= _EXTERNAL_CHUNK_RECORDS * words:
+                chunk.tofile(f)
+                chunk = array('Q')
+        chunk.tofile(f)
+    return count
+
+def _read_records(path: str, words: int):
+    """Streams the ints in a record file through a read-only memory map."""
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        if hasattr(mapped, 'madvise'):
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        view = memoryview(mapped).cast('Q')
+        try:
+            if words == 1:
+                yield from view
+            else:
+                for i in range(0, len(view), words):
+                    value = 0
+                    for j in range(words):
+                        value = (value << 64) | view[i + j]
+                    yield value
+        finally:
+            view.release()
+
+def _unique_sorted_difference(values, *excluded):
+    """Distinct items of the sorted iterable values that are in none of the sorted iterables excluded."""
+    excluded = [iter(values_out) for values_out in excluded]
+    heads = [next(it, None) for it in excluded]
+    previous = None
+    for value in values:
+        if value == previous:
+            continue
+        previous = value
+        found = False
+        for i, it in enumerate(excluded):
+            while heads[i] is not None and heads[i] < value:
+                heads[i] = next(it, None)
+            if heads[i] == value:
+                found = True
+        if not found:
+            yield value
+
+def external_bfs(problem, memory_budget_mb: float = 64.0, work_dir: Optional[str] = None, encode: Any = None,
+                 decode: Any = None, state_bits: int = 64, max_depth: Optional[int] = None) -> Tuple[List[int], Dict[str, int]]:
+    """
+    Breadth-first layer counts (the depth histogram from problem.initial_state) with
+    the layers on disk instead of in an explored set. Each layer is a file of sorted,
+    fixed-width states (state_bits wide; encode/decode map states to and from ints,
+    or states must already be ints, as with PackedEightPuzzleProblem). Successors of
+    a layer are buffered, sorted and written as runs; the runs are then merged and
+    duplicates dropped, along with anything in the current or previous layer. That
+    delayed duplicate detection is exact for spaces where every move can be undone,
+    such as the sliding-tile puzzles.
+
+    memory_budget_mb bounds the successor buffer (the only part that grows with the
+    space); merging streams the memory-mapped files. Returns (layer counts, metrics).
+    """
+    words = max(1, -(-state_bits // 64))
+    max_buffer = max(1024, int(memory_budget_mb * 1024 * 1024) // _EXTERNAL_BYTES_PER_STATE)
+    own_dir = work_dir is None
+    work_dir = tempfile.mkdtemp(prefix='external_bfs_') if own_dir else work_dir
+    os.makedirs(work_dir, exist_ok=True)
+    metrics = {
+        "nodes_generated": 1,
+        "nodes_expanded": 0,
+        "max_frontier_size": 1,
+        "sorted_runs": 0,
+        "bytes_written": 0,
+        "max_buffer_states": 0,
+    }
+
+    def layer_path(depth: int) -> str:
+        return os.path.join(work_dir, f"layer_{depth}.bin")
+
+    def write(path: str, values) -> int:
+        count = _write_records(path, values, words)
+        metrics["bytes_written"] += count * 8 * words
+        return count
+
+    start = problem.initial_state
+    counts = [write(layer_path(0), [encode(start) if encode else start])]
+    depth = 0
+    try:
+        while counts[-1] and (max_depth is None or depth < max_depth):
+            runs = []
+            buffer = []
+
+            def flush():
+                buffer.sort()
+                path = os.path.join(work_dir, f"run_{depth + 1}_{len(runs)}.bin")
+                write(path, _unique_sorted_difference(buffer))
+                runs.append(path)
+                metrics["sorted_runs"] += 1
+                buffer.clear()
+
+            for value in _read_records(layer_path(depth), words):
+                state = decode(value) if decode else value
+                metrics["nodes_expanded"] += 1
+                for action in problem.actions(state):
+                    child_state = problem.result(state, action)
+                    if child_state is None:
+                        continue
+                    buffer.append(encode(child_state) if encode else child_state)
+                    metrics["nodes_generated"] += 1
+                    if len(buffer) >= max_buffer:
+                        metrics["max_buffer_states"] = max(metrics["max_buffer_states"], len(buffer))
+                        flush()
+            metrics["max_buffer_states"] = max(metrics["max_buffer_states"], len(buffer))
+            if buffer or not runs:
+                flush()
+
+            # Too many runs to hold open at once: merge them in groups first.
+            while len(runs) > _EXTERNAL_MAX_OPEN_RUNS:
+                merged = []
+                for i in range(0, len(runs), _EXTERNAL_MAX_OPEN_RUNS):
+                    group = runs[i:i + _EXTERNAL_MAX_OPEN_RUNS]
+                    path = os.path.join(work_dir, f"run_{depth + 1}_merged_{len(merged)}_{i}.bin")
+                    write(path, _unique_sorted_difference(heapq.merge(*(_read_records(run, words) for run in group))))
+                    for run in group:
+                        os.remove(run)
+                    merged.append(path)
+                runs = merged
+
+            excluded = [_read_records(layer_path(depth), words)]
+            if depth > 0:
+                excluded.append(_read_records(layer_path(depth - 1), words))
+            candidates = heapq.merge(*(_read_records(run, words) for run in runs))
+            counts.append(write(layer_path(depth + 1), _unique_sorted_difference(candidates, *excluded)))
+            for run in runs:
+                os.remove(run)
+            if depth > 0:
+                os.remove(layer_path(depth - 1))
+            metrics["max_frontier_size"] = max(metrics["max_frontier_size"], counts[-1])
+            depth += 1
+    finally:
+        if own_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        else:
+            for name in os.listdir(work_dir):
+                if name.startswith(('layer_', 'run_')) and name.endswith('.bin'):
+                    os.remove(os.path.join(work_dir, name))
+
+    if not counts[-1]:
+        counts.pop()
+    return counts, metrics
+
+def ids(problem, observer: Any = None, max_depth: Optional[int] = None, budget: Any = None) -> Tuple[Optional[Node], Dict[str, int]]:
+    """
+    Iterative deepening: dls with limits 0, 1, 2, ... until a solution is found or
+    a pass cuts nothing off at its limit (no solution at any depth). With max_depth
+    it gives up after that limit; metrics["cutoff"] is then True if deeper nodes
+    were left unexplored.
+    """
     total_metrics = {
         "nodes_generated": 0,
         "nodes_expanded": 0,
         "max_frontier_size": 0,
     }
     
-    for depth_limit in range(100):
-        result, metrics = dls(problem, depth_limit)
+    depth_limit = 0
+    while max_depth is None or depth_limit <= max_depth:
+        result, metrics = dls(problem, depth_limit, observer, budget)
         
         total_metrics["nodes_generated"] += metrics["nodes_generated"]
         total_metrics["nodes_expanded"] += metrics["nodes_expanded"]
@@ -134,28 +1025,53 @@ def ids(problem) -> Tuple[Optional[Node], Dict[str, int]]:
 
         if result is not None:
             return result, total_metrics
+        if "budget_hit" in metrics:
+            return None, budget_exceeded(budget, total_metrics)
+        if not metrics["cutoff"]:
+            return None, total_metrics
+        depth_limit += 1
             
+    total_metrics["cutoff"] = True
     return None, total_metrics
 
-def dls(problem, limit: int) -> Tuple[Optional[Node], Dict[str, int]]:
+def dls(problem, limit: int, observer: Any = None, budget: Any = None) -> Tuple[Optional[Node], Dict[str, int]]:
+    """
+    Depth-limited search; metrics["cutoff"] tells whether a node at the limit had a
+    child not yet reached in this pass, i.e. whether a deeper limit could find more.
+    """
+    if observer is not None:
+        problem = observer.wrap_problem(problem)
     metrics = {
         "nodes_generated": 1,
         "nodes_expanded": 0,
         "max_frontier_size": 1,
+        "cutoff": False,
     }
     
     start_node = Node(problem.initial_state)
     frontier = [start_node]
     explored = {start_node.state: 0}
+    if observer is not None:
+        explored = observer.wrap_explored(explored)
+    # Children of nodes at the limit that were not yet reached within it.
+    beyond_limit = set()
 
     while frontier:
         node = frontier.pop()
+        if budget is not None and budget.on_expand(len(frontier) + 1):
+            return None, budget_exceeded(budget, metrics)
         metrics["nodes_expanded"] += 1
+        if observer is not None:
+            observer.on_expand(limit, len(frontier))
 
         if problem.is_goal(node.state):
             return node, metrics
 
         if node.depth >= limit:
+            for action in problem.actions(node.state):
+                child_state = problem.result(node.state, action)
+                if child_state is not None and child_state not in explored:
+                    beyond_limit.add(child_state)
             continue
 
         for action in problem.actions(node.state):
@@ -178,5 +1094,305 @@ def dls(problem, limit: int) -> Tuple[Optional[Node], Dict[str, int]]:
             explored[child_state] = child_node.depth
             frontier.append(child_node)
             metrics["max_frontier_size"] = max(metrics["max_frontier_size"], len(frontier))
-    
+
+    # Depth-first order can reach a state deep first and shallower later, so this is
+    # only settled at the end: if every child of a node at the limit is within it,
+    # the pass has covered the whole reachable space.
+    metrics["cutoff"] = any(state not in explored for state in beyond_limit)
     return None, metrics
+
+def ida_star(problem, heuristic_variant: str, observer: Any = None, budget: Any = None) -> Tuple[Optional[Node], Dict[str, int]]:
+    """
+    Iterative-deepening A*: repeated depth-first searches bounded by f = g + h, each
+    threshold being the smallest f that exceeded the previous one. Only the current
+    path is kept in memory; instead of an explored table, moves that lead straight
+    back to the parent's state are pruned.
+    """
+    if observer is not None:
+        problem = observer.wrap_problem(problem)
+    heuristic_delta = getattr(problem, 'heuristic_delta', None)
+    metrics = {
+        "nodes_generated": 1,
+        "nodes_expanded": 0,
+        "max_frontier_size": 1,
+        "iterations": 0,
+    }
+
+    def search(node: Node, h_cost: int, threshold: int) -> Tuple[Optional[Node], float]:
+        f_cost = node.path_cost + h_cost
+        if f_cost > threshold:
+            return None, f_cost
+        if budget is not None and budget.on_expand(node.depth + 1):
+            return None, math.inf
+
+        metrics["nodes_expanded"] += 1
+        if observer is not None:
+            observer.on_expand(threshold, node.depth + 1)
+        if problem.is_goal(node.state):
+            return node, f_cost
+
+        grandparent_state = node.parent.state if node.parent else None
+        next_threshold = math.inf
+        for action in problem.actions(node.state):
+            child_state = problem.result(node.state, action)
+
+            if child_state is None or child_state == grandparent_state:
+                continue
+
+            metrics["nodes_generated"] += 1
+            child_node = Node(
+                child_state,
+                node,
+                action,
+                node.path_cost + problem.step_cost(node.state, action)
+            )
+            metrics["max_frontier_size"] = max(metrics["max_frontier_size"], child_node.depth + 1)
+
+            h_cost_child = None
+            if heuristic_delta is not None:
+                h_cost_child = heuristic_delta(h_cost, node.state, action, heuristic_variant)
+            if h_cost_child is None:
+                h_cost_child = problem.heuristic(child_state, heuristic_variant)
+
+            found, child_threshold = search(child_node, h_cost_child, threshold)
+            if found is not None:
+                return found, child_threshold
+            next_threshold = min(next_threshold, child_threshold)
+
+        return None, next_threshold
+
+    start_node = Node(problem.initial_state)
+    h_start = problem.heuristic(start_node.state, heuristic_variant)
+    threshold = start_node.path_cost + h_start
+
+    while True:
+        metrics["iterations"] += 1
+        found, next_threshold = search(start_node, h_start, threshold)
+        if found is not None:
+            return found, metrics
+        if budget is not None and budget.exceeded is not None:
+            return None, budget_exceeded(budget, metrics)
+        if next_threshold == math.inf:
+            return None, metrics
+        threshold = next_threshold
+
+def oracle_search(problem, heuristic_variant: str = 'hstar', unreachable: int = 255, budget: Any = None) -> Tuple[Optional[Node], Dict[str, int]]:
+    """
+    Follows an exact distance-to-goal heuristic (such as the 8-puzzle's 'hstar' table)
+    downhill from the initial state: at each step some child is exactly one step cost
+    closer. No search is done, so the cost is O(depth x branching factor).
+    """
+    metrics = {
+        "nodes_generated": 1,
+        "nodes_expanded": 0,
+        "max_frontier_size": 1,
+    }
+
+    node = Node(problem.initial_state)
+    distance = problem.heuristic(node.state, heuristic_variant)
+    if distance == unreachable:
+        return None, metrics
+
+    while True:
+        if budget is not None and budget.on_expand(1):
+            return None, budget_exceeded(budget, metrics)
+        metrics["nodes_expanded"] += 1
+        if problem.is_goal(node.state):
+            return node, metrics
+
+        for action in problem.actions(node.state):
+            child_state = problem.result(node.state, action)
+            if child_state is None:
+                continue
+            metrics["nodes_generated"] += 1
+
+            step_cost = problem.step_cost(node.state, action)
+            child_distance = problem.heuristic(child_state, heuristic_variant)
+            if child_distance == distance - step_cost:
+                node = Node(child_state, node, action, node.path_cost + step_cost)
+                distance = child_distance
+                break
+        else:
+            raise ValueError(f"Heuristic '{heuristic_variant}' is not an exact distance: no child of {node.state} is closer to the goal.")
+
+def _bidirectional_metrics() -> Dict[str, int]:
+    metrics = {
+        "nodes_generated": 0,
+        "nodes_expanded": 0,
+        "max_frontier_size": 0,
+    }
+    for direction in ("forward", "backward"):
+        metrics[f"nodes_generated_{direction}"] = 0
+        metrics[f"nodes_expanded_{direction}"] = 0
+        metrics[f"max_frontier_size_{direction}"] = 0
+    return metrics
+
+def _expand_backward(problem, node: Node) -> List[Node]:
+    """
+    Backward children of node. A backward node's parent is the next state on the way
+    to the goal, its action is the forward action leading there, and its path_cost is
+    the cost to the goal.
+    """
+    children = []
+    for action, previous_state in problem.predecessors(node.state):
+        children.append(Node(previous_state, node, action, node.path_cost + problem.step_cost(previous_state, action)))
+    return children
+
+def _expand_forward(problem, node: Node) -> List[Node]:
+    children = []
+    for action in problem.actions(node.state):
+        child_state = problem.result(node.state, action)
+        if child_state is not None:
+            children.append(Node(child_state, node, action, node.path_cost + problem.step_cost(node.state, action)))
+    return children
+
+def _stitch(problem, forward_node: Node, backward_node: Node) -> Node:
+    """Extends the forward Node chain with the backward chain from the meeting state to the goal."""
+    node = forward_node
+    while backward_node.parent is not None:
+        action = backward_node.action
+        node = Node(backward_node.parent.state, node, action, node.path_cost + problem.step_cost(node.state, action))
+        backward_node = backward_node.parent
+    return node
+
+def bidirectional_bfs(problem, budget: Any = None) -> Tuple[Optional[Node], Dict[str, int]]:
+    """
+    Breadth-first search from both ends, using problem.goal_state and
+    problem.predecessors. The smaller frontier is grown one whole layer at a time,
+    and the cheapest meeting found in that layer is returned, which is optimal
+    for unit step costs.
+    """
+    metrics = _bidirectional_metrics()
+
+    start_node = Node(problem.initial_state)
+    goal_node = Node(problem.goal_state)
+    metrics["nodes_generated_forward"] = metrics["nodes_generated_backward"] = 1
+    metrics["nodes_generated"] = 2
+
+    if problem.is_goal(start_node.state):
+        return start_node, metrics
+
+    visited = {"forward": {start_node.state: start_node}, "backward": {goal_node.state: goal_node}}
+    frontiers = {"forward": [start_node], "backward": [goal_node]}
+    expanders = {"forward": _expand_forward, "backward": _expand_backward}
+
+    while frontiers["forward"] and frontiers["backward"]:
+        direction = "forward" if len(frontiers["forward"]) <= len(frontiers["backward"]) else "backward"
+        other = "backward" if direction == "forward" else "forward"
+        this_visited, other_visited = visited[direction], visited[other]
+
+        best_meeting = None
+        next_layer = []
+        for node in frontiers[direction]:
+            if budget is not None and budget.on_expand(len(frontiers["forward"]) + len(frontiers["backward"]) + len(next_layer)):
+                return None, budget_exceeded(budget, metrics)
+            metrics["nodes_expanded"] += 1
+            metrics[f"nodes_expanded_{direction}"] += 1
+            for child_node in expanders[direction](problem, node):
+                if child_node.state in this_visited:
+                    continue
+                metrics["nodes_generated"] += 1
+                metrics[f"nodes_generated_{direction}"] += 1
+                this_visited[child_node.state] = child_node
+                next_layer.append(child_node)
+
+                meeting = other_visited.get(child_node.state)
+                if meeting is not None:
+                    cost = child_node.path_cost + meeting.path_cost
+                    if best_meeting is None or cost < best_meeting[0]:
+                        best_meeting = (cost, child_node, meeting)
+
+        frontiers[direction] = next_layer
+        metrics[f"max_frontier_size_{direction}"] = max(metrics[f"max_frontier_size_{direction}"], len(next_layer))
+        metrics["max_frontier_size"] = max(metrics["max_frontier_size"], len(frontiers["forward"]) + len(frontiers["backward"]))
+
+        if best_meeting is not None:
+            _, this_node, other_node = best_meeting
+            if direction == "forward":
+                return _stitch(problem, this_node, other_node), metrics
+            return _stitch(problem, other_node, this_node), metrics
+
+    return None, metrics
+
+def bidirectional_astar(problem, heuristic_variant: str, budget: Any = None) -> Tuple[Optional[Node], Dict[str, int]]:
+    """
+    Front-to-end bidirectional heuristic search meeting in the middle (MM). Each side
+    orders its frontier by max(g + h, 2g), using problem.heuristic forward and
+    problem.reverse_heuristic (distance from the initial state) backward. The
+    direction with the smaller priority is expanded, and search stops once the best
+    meeting cost U is no larger than either frontier's minimum priority, which proves
+    U optimal. With heuristic_variant 'h0' this is bidirectional uniform-cost search.
+    """
+    metrics = _bidirectional_metrics()
+    heuristics = {
+        "forward": lambda state: problem.heuristic(state, heuristic_variant),
+        "backward": lambda state: problem.reverse_heuristic(state, heuristic_variant),
+    }
+    expanders = {"forward": _expand_forward, "backward": _expand_backward}
+
+    start_node = Node(problem.initial_state)
+    goal_node = Node(problem.goal_state)
+    if problem.is_goal(start_node.state):
+        metrics["nodes_generated"] = metrics["nodes_generated_forward"] = 1
+        return start_node, metrics
+
+    counter = 0
+    frontiers = {}
+    best_nodes = {}
+    for direction, node in (("forward", start_node), ("backward", goal_node)):
+        h_cost = heuristics[direction](node.state)
+        frontiers[direction] = [(max(h_cost, 0), counter, node)]
+        best_nodes[direction] = {node.state: node}
+        counter += 1
+        metrics["nodes_generated"] += 1
+        metrics[f"nodes_generated_{direction}"] += 1
+        metrics[f"max_frontier_size_{direction}"] = 1
+    metrics["max_frontier_size"] = 2
+
+    best_cost = math.inf
+    best_meeting = None
+
+    def top_priority(direction: str) -> float:
+        frontier = frontiers[direction]
+        while frontier and frontier[0][2].path_cost > best_nodes[direction][frontier[0][2].state].path_cost:
+            heapq.heappop(frontier)
+        return frontier[0][0] if frontier else math.inf
+
+    while True:
+        forward_priority, backward_priority = top_priority("forward"), top_priority("backward")
+        if best_cost <= min(forward_priority, backward_priority):
+            break
+        if forward_priority == math.inf and backward_priority == math.inf:
+            break
+
+        direction = "forward" if forward_priority <= backward_priority else "backward"
+        other = "backward" if direction == "forward" else "forward"
+        if budget is not None and budget.on_expand(len(frontiers["forward"]) + len(frontiers["backward"])):
+            return None, budget_exceeded(budget, metrics)
+        _, _, node = heapq.heappop(frontiers[direction])
+        metrics["nodes_expanded"] += 1
+        metrics[f"nodes_expanded_{direction}"] += 1
+
+        for child_node in expanders[direction](problem, node):
+            known = best_nodes[direction].get(child_node.state)
+            if known is not None and known.path_cost <= child_node.path_cost:
+                continue
+            best_nodes[direction][child_node.state] = child_node
+
+            g_cost = child_node.path_cost
+            priority = max(g_cost + heuristics[direction](child_node.state), 2 * g_cost)
+            heapq.heappush(frontiers[direction], (priority, counter, child_node))
+            counter += 1
+            metrics["nodes_generated"] += 1
+            metrics[f"nodes_generated_{direction}"] += 1
+            metrics[f"max_frontier_size_{direction}"] = max(metrics[f"max_frontier_size_{direction}"], len(frontiers[direction]))
+            metrics["max_frontier_size"] = max(metrics["max_frontier_size"], len(frontiers["forward"]) + len(frontiers["backward"]))
+
+            meeting = best_nodes[other].get(child_node.state)
+            if meeting is not None and g_cost + meeting.path_cost < best_cost:
+                best_cost = g_cost + meeting.path_cost
+                best_meeting = (child_node, meeting) if direction == "forward" else (meeting, child_node)
+
+    if best_meeting is None:
+        return None, metrics
+    return _stitch(problem, *best_meeting), metrics
@@ -0,0 +1,159 @@
+import json
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_MAX_SOLUTIONS = 20000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS solutions (
+    id INTEGER PRIMARY KEY,
+    domain TEXT NOT NULL,
+    state TEXT NOT NULL,
+    algorithm TEXT NOT NULL,
+    heuristic TEXT NOT NULL,
+    cost INTEGER,
+    actions TEXT,
+    metrics TEXT NOT NULL,
+    last_used REAL NOT NULL,
+    UNIQUE (domain, state, algorithm, heuristic)
+);
+CREATE INDEX IF NOT EXISTS solutions_last_used ON solutions (last_used);
+CREATE TABLE IF NOT EXISTS distances (
+    domain TEXT NOT NULL,
+    state TEXT NOT NULL,
+    distance INTEGER NOT NULL,
+    solution_id INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    PRIMARY KEY (domain, state)
+);
+CREATE INDEX IF NOT EXISTS distances_solution ON distances (solution_id);
+"""
+
+def encode_state(state: Any) -> str:
+    return json.dumps(list(state) if isinstance(state, tuple) else state)
+
+def decode_state(text: str) -> Any:
+    value = json.loads(text)
+    return tuple(value) if isinstance(value, list) else value
+
+class ExactDistances:
+    """
+    Exact goal distances for states that lie on cached optimal solutions. get(state)
+    returns the distance or None; suffix(state) returns the cached actions from the
+    state to the goal. Passed to astar as exact_distances.
+    """
+
+    def __init__(self, entries: Dict[Any, Tuple[int, int, int]], solution_actions: Dict[int, List[Any]]):
+        self._entries = entries
+        self._solution_actions = solution_actions
+
+    def get(self, state: Any) -> Optional[int]:
+        entry = self._entries.get(state)
+        return entry[0] if entry is not None else None
+
+    def suffix(self, state: Any) -> List[Any]:
+        _, solution_id, offset = self._entries[state]
+        return self._solution_actions[solution_id][offset:]
+
+    def add(self, solution_id: int, actions: List[Any], path: List[Tuple[Any, int]]):
+        cost = path[-1][1]
+        self._solution_actions[solution_id] = actions
+        for offset, (state, path_cost) in enumerate(path):
+            self._entries[state] = (cost - path_cost, solution_id, offset)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class SolutionCache:
+    """
+    Persistent (SQLite) cache of solved start states, keyed by domain, state,
+    algorithm and heuristic. Each stored optimal solution also records, for every
+    state on its path, the exact distance to the goal: suffixes of optimal paths
+    are optimal. Least recently used solutions are evicted once more than
+    max_solutions are stored, together with the distances that point into them.
+    """
+
+    def __init__(self, path: str, max_solutions: int = DEFAULT_MAX_SOLUTIONS):
+        self.path = path
+        self.max_solutions = max_solutions
+        self._connection = sqlite3.connect(path, timeout=30)
+        self._connection.executescript(_SCHEMA)
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self) -> 'SolutionCache':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def lookup(self, domain: str, state: Any, algorithm: str, heuristic: str) -> Optional[Dict[str, Any]]:
+        key = (domain, encode_state(state), algorithm, heuristic)
+        with self._connection:
+            row = self._connection.execute(
+                "SELECT id, cost, actions, metrics FROM solutions "
+                "WHERE domain = ? AND state = ? AND algorithm = ? AND heuristic = ?", key).fetchone()
+            if row is None:
+                return None
+            self._connection.execute("UPDATE solutions SET last_used = ? WHERE id = ?", (time.time(), row[0]))
+        return {
+            'cost': row[1],
+            'actions': json.loads(row[2]) if row[2] is not None else None,
+            'metrics': json.loads(row[3]),
+        }
+
+    def store(self, domain: str, state: Any, algorithm: str, heuristic: str, cost: Optional[int],
+              actions: Optional[List[Any]], metrics: Dict[str, Any], path: Optional[List[Tuple[Any, int]]] = None) -> int:
+        """
+        Stores a result. path, the (state, path cost) pairs from start to goal, is only
+        given for optimal solutions; each state on it gets its exact goal distance.
+        Returns the solution's row id.
+        """
+        with self._connection:
+            key = (domain, encode_state(state), algorithm, heuristic)
+            self._connection.execute(
+                "INSERT INTO solutions (domain, state, algorithm, heuristic, cost, actions, metrics, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (domain, state, algorithm, heuristic) DO UPDATE SET "
+                "cost = excluded.cost, actions = excluded.actions, metrics = excluded.metrics, last_used = excluded.last_used",
+                key + (cost, json.dumps(actions) if actions is not None else None, json.dumps(metrics), time.time()))
+            solution_id = self._connection.execute(
+                "SELECT id FROM solutions WHERE domain = ? AND state = ? AND algorithm = ? AND heuristic = ?", key).fetchone()[0]
+            self._connection.execute("DELETE FROM distances WHERE solution_id = ?", (solution_id,))
+            if path is not None and cost is not None:
+                # A state another solution already gives a distance for keeps that row (the
+                # distances agree), so evicting this solution never takes the other's rows.
+                self._connection.executemany(
+                    "INSERT OR IGNORE INTO distances (domain, state, distance, solution_id, offset) VALUES (?, ?, ?, ?, ?)",
+                    [(domain, encode_state(path_state), cost - path_cost, solution_id, offset)
+                     for offset, (path_state, path_cost) in enumerate(path)])
+            self._evict()
+        return solution_id
+
+    def _evict(self):
+        count = self._connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+        excess = count - self.max_solutions
+        if excess <= 0:
+            return
+        stale_ids = [row[0] for row in self._connection.execute(
+            "SELECT id FROM solutions ORDER BY last_used LIMIT ?", (excess,))]
+        self._connection.executemany("DELETE FROM distances WHERE solution_id = ?", [(i,) for i in stale_ids])
+        self._connection.executemany("DELETE FROM solutions WHERE id = ?", [(i,) for i in stale_ids])
+
+    def exact_distances(self, domain: str) -> ExactDistances:
+        entries = {}
+        for state, distance, solution_id, offset in self._connection.execute(
+                "SELECT state, distance, solution_id, offset FROM distances WHERE domain = ?", (domain,)):
+            entries[decode_state(state)] = (distance, solution_id, offset)
+        solution_actions = {}
+        for solution_id, actions in self._connection.execute(
+                "SELECT d.solution_id, s.actions FROM (SELECT DISTINCT solution_id FROM distances WHERE domain = ?) d "
+                "JOIN solutions s ON s.id = d.solution_id", (domain,)):
+            solution_actions[solution_id] = json.loads(actions)
+        return ExactDistances(entries, solution_actions)
+
+    def stats(self) -> Dict[str, int]:
+        solutions = self._connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+        distances = self._connection.execute("SELECT COUNT(*) FROM distances").fetchone()[0]
+        return {'solutions': solutions, 'distances': distances}
@@ -0,0 +1,367 @@
+import collections
+import inspect
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+from heuristic_cache import CachedHeuristicProblem, HeuristicCache, load_heuristic_entries, make_heuristic_cache
+from instrumentation import SearchProfiler
+from search_budget import SearchBudget
+from solution_cache import SolutionCache
+from search_core import StateSpaceTooLarge, compile_problem, Node, bfs, ids, astar, ida_star, oracle_search, bidirectional_bfs, bidirectional_astar
+
+# --gentable keys: (display name, search function, keyword arguments)
+ALGORITHMS = {
+    'bfs': ('BFS', bfs, {}), 'ids': ('IDS', ids, {}),
+    'ucs': ('UCS', astar, {'heuristic_variant': 'h0'}),
+    'astar_h1': ('A* (h1)', astar, {'heuristic_variant': 'h1'}),
+    'astar_h2': ('A* (h2)', astar, {'heuristic_variant': 'h2'}),
+    'astar_h3': ('A* (h3)', astar, {'heuristic_variant': 'h3'}),
+    'idastar_h1': ('IDA* (h1)', ida_star, {'heuristic_variant': 'h1'}),
+    'idastar_h2': ('IDA* (h2)', ida_star, {'heuristic_variant': 'h2'}),
+    'oracle': ('Oracle', oracle_search, {}),
+    'bibfs': ('Bi-BFS', bidirectional_bfs, {}),
+    'biucs': ('Bi-UCS', bidirectional_astar, {'heuristic_variant': 'h0'}),
+    'biastar_h1': ('Bi-A* (h1)', bidirectional_astar, {'heuristic_variant': 'h1'}),
+    'biastar_h2': ('Bi-A* (h2)', bidirectional_astar, {'heuristic_variant': 'h2'}),
+    'astar_lc': ('A* (lc)', astar, {'heuristic_variant': 'lc'}),
+    'idastar_lc': ('IDA* (lc)', ida_star, {'heuristic_variant': 'lc'}),
+}
+
+# Single-run algorithm names; the ones in HEURISTIC_ALGORITHMS take --heuristic.
+SINGLE_RUN_ALGORITHMS = {
+    'bfs': ('BFS', bfs), 'ids': ('IDS', ids),
+    'ucs': ('UCS', astar), 'astar': ('A*', astar),
+    'idastar': ('IDA*', ida_star), 'oracle': ('Oracle', oracle_search),
+    'bibfs': ('Bi-BFS', bidirectional_bfs),
+    'biucs': ('Bi-UCS', bidirectional_astar), 'biastar': ('Bi-A*', bidirectional_astar),
+}
+HEURISTIC_ALGORITHMS = ['astar', 'idastar', 'biastar']
+UNIFORM_COST_ALGORITHMS = ['ucs', 'biucs']
+
+# Algorithms that need an informed or table-driven problem; skipped for WGC.
+PUZZLE_ONLY_ALGORITHMS = [
+    'ucs', 'astar', 'astar_h1', 'astar_h2', 'astar_h3',
+    'idastar', 'idastar_h1', 'idastar_h2', 'oracle',
+    'biucs', 'biastar', 'biastar_h1', 'biastar_h2', 'astar_lc', 'idastar_lc',
+]
+# Algorithms tied to the 3x3 tables (pattern database, exact distances) or to the N-puzzle's lc heuristic.
+EIGHT_PUZZLE_ONLY_ALGORITHMS = ['astar_h3', 'oracle']
+N_PUZZLE_ONLY_ALGORITHMS = ['astar_lc', 'idastar_lc']
+
+DOMAIN_NAMES = {'wgc': 'WGC', '8puzzle': '8-Puzzle', 'npuzzle': 'N-Puzzle'}
+DOMAIN_HEURISTICS = {'8puzzle': ['h1', 'h2', 'h3', 'hstar'], 'npuzzle': ['h1', 'h2', 'lc']}
+
+def skip_reason(algorithm: str, domain: str) -> Optional[str]:
+    """Why algorithm (a --gentable key or single-run name) can't run on domain, or None if it can."""
+    if domain == 'wgc' and algorithm in PUZZLE_ONLY_ALGORITHMS:
+        return "it needs an informed or table-driven problem"
+    if domain != '8puzzle' and algorithm in EIGHT_PUZZLE_ONLY_ALGORITHMS:
+        return "its tables only exist for the 3x3 board"
+    if domain != 'npuzzle' and algorithm in N_PUZZLE_ONLY_ALGORITHMS:
+        return "the lc heuristic is only implemented for the npuzzle domain"
+    return None
+
+def resolve_algorithm(algorithm: str, heuristic: Optional[str] = None) -> Tuple[str, Any, Dict[str, Any]]:
+    """Maps a single-run algorithm name and heuristic to (display name, function, kwargs)."""
+    if algorithm not in SINGLE_RUN_ALGORITHMS:
+        raise ValueError(f"Unknown algorithm: {algorithm}")
+    name, func = SINGLE_RUN_ALGORITHMS[algorithm]
+    if algorithm in UNIFORM_COST_ALGORITHMS:
+        return name, func, {'heuristic_variant': 'h0'}
+    if algorithm in HEURISTIC_ALGORITHMS:
+        if not heuristic:
+            raise ValueError(f"{name} requires --heuristic.")
+        return f"{name} ({heuristic.upper()})", func, {'heuristic_variant': heuristic}
+    return name, func, {}
+
+def analyze_problem(domain: str, state: Any, size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Cheap checks before any search runs: input validation, solvability (inversion
+    parity) and an admissible lower bound on the solution cost. Returns a dict with
+    'status' ('ok', 'invalid' or 'unsolvable'), 'reason' and 'lower_bound'.
+    """
+    if domain == 'wgc':
+        return {'status': 'ok', 'reason': None, 'lower_bound': None}
+    from domains.n_puzzle import NPuzzleProblem, validate_state, is_solvable
+    size = size or 3
+    reason = validate_state(state, size)
+    if reason is not None:
+        return {'status': 'invalid', 'reason': reason, 'lower_bound': None}
+    if not is_solvable(state, size):
+        return {'status': 'unsolvable', 'reason': "the tile permutation has the wrong inversion parity", 'lower_bound': None}
+    variant = 'lc' if size > 3 else 'h2'
+    return {'status': 'ok', 'reason': None, 'lower_bound': NPuzzleProblem(state, size).heuristic(state, variant)}
+
+def build_problem(domain: str, state: Any, packed: bool = False, size: Optional[int] = None):
+    if domain == 'wgc':
+        from domains.wgc import WGCProblem
+        return WGCProblem()
+    if domain == 'npuzzle':
+        from domains.n_puzzle import NPuzzleProblem
+        return NPuzzleProblem(state, size)
+    from domains.eight_puzzle import EightPuzzleProblem, PackedEightPuzzleProblem
+    return PackedEightPuzzleProblem(state) if packed else EightPuzzleProblem(state)
+
+def solution_actions(node: Node) -> List[Any]:
+    actions = []
+    while node.parent:
+        actions.append(node.action)
+        node = node.parent
+    actions.reverse()
+    return actions
+
+def replay_actions(problem, actions: List[Any]) -> Node:
+    """Rebuilds the Node chain of a solution from its action sequence."""
+    node = Node(problem.initial_state)
+    for action in actions:
+        node = Node(problem.result(node.state, action), node, action,
+                    node.path_cost + problem.step_cost(node.state, action))
+    return node
+
+def solution_path(problem, actions: List[Any]) -> List[Tuple[Any, int]]:
+    """(state, path cost) pairs along a solution, start to goal."""
+    state, path_cost = problem.initial_state, 0
+    path = [(state, path_cost)]
+    for action in actions:
+        path_cost += problem.step_cost(state, action)
+        state = problem.result(state, action)
+        path.append((state, path_cost))
+    return path
+
+# Keyword arguments that don't change which solution or metrics a search produces.
+_UNCACHED_KWARGS = ('heuristic_variant', 'check_heuristic', 'observer', 'exact_distances')
+
+def cache_key(job: Dict[str, Any]) -> Tuple[str, str, str]:
+    """(domain, algorithm, heuristic) part of a job's solution cache key."""
+    domain = job['domain'] + (str(job['size']) if job.get('size') else '') + ('-packed' if job.get('packed') else '')
+    options = ','.join(f"{key}={value}" for key, value in sorted(job['kwargs'].items()) if key not in _UNCACHED_KWARGS)
+    algorithm = job['func'].__name__ + (f"[{options}]" if options else '')
+    return domain, algorithm, job['kwargs'].get('heuristic_variant', '')
+
+# Solution cache connections per path, opened on first use and kept for the life of the process.
+_solution_caches: Dict[str, SolutionCache] = {}
+_solution_caches_pid: Optional[int] = None
+
+def open_solution_cache(path: str) -> SolutionCache:
+    """This process's connection to the solution cache at path."""
+    global _solution_caches_pid
+    if _solution_caches_pid != os.getpid():
+        # A SQLite connection must not be used across a fork; a child opens its own.
+        _solution_caches.clear()
+        _solution_caches_pid = os.getpid()
+    if path not in _solution_caches:
+        _solution_caches[path] = SolutionCache(path)
+    return _solution_caches[path]
+
+# Exact distances loaded from a cache file, per (path, domain), kept for the life of the process.
+_exact_distances = {}
+
+def _cached_exact_distances(cache: SolutionCache, domain: str):
+    key = (cache.path, domain)
+    if key not in _exact_distances:
+        _exact_distances[key] = cache.exact_distances(domain)
+    return _exact_distances[key]
+
+# Compiled state graphs per domain key, least recently used first, for the life of the
+# process. An int entry is the max_states limit the domain's space was too large for.
+_compiled_problems: 'collections.OrderedDict[str, Any]' = collections.OrderedDict()
+_MAX_COMPILED_GRAPHS = 4
+
+def _compiled_problem(problem, domain_key: str, max_states: int):
+    """
+    The domain's compiled graph (see search_core.compile_problem) searched from
+    problem's start state, or None when the space has more than max_states states.
+    One graph per domain is compiled and saved under pdb_cache/; every start state
+    in it shares it.
+    """
+    entry = _compiled_problems.get(domain_key)
+    if entry is None or (isinstance(entry, int) and max_states > entry) or (
+            not isinstance(entry, int) and entry.with_start(problem.initial_state) is None):
+        from domains.pattern_database import DEFAULT_CACHE_DIR
+        cache_path = os.path.join(DEFAULT_CACHE_DIR, f"compiled_{domain_key}.json")
+        try:
+            entry = compile_problem(problem, max_states, cache_path)
+        except StateSpaceTooLarge:
+            entry = max_states
+    _compiled_problems[domain_key] = entry
+    _compiled_problems.move_to_end(domain_key)
+    while len(_compiled_problems) > _MAX_COMPILED_GRAPHS:
+        _compiled_problems.popitem(last=False)
+    if isinstance(entry, int) or len(entry) > max_states:
+        return None
+    return entry.with_start(problem.initial_state, problem)
+
+# Heuristic caches per domain key, shared by every job this process runs.
+_heuristic_caches: Dict[str, HeuristicCache] = {}
+
+def heuristic_caches() -> Dict[str, HeuristicCache]:
+    return _heuristic_caches
+
+def _heuristic_cache(domain_key: str, options: Dict[str, Any]) -> HeuristicCache:
+    """This process's heuristic cache for the domain, preloaded from options['path'] when first made."""
+    if domain_key not in _heuristic_caches:
+        cache = make_heuristic_cache(options['capacity'], options['policy'])
+        if options.get('path'):
+            cache.preload(load_heuristic_entries(options['path'], domain_key))
+        _heuristic_caches[domain_key] = cache
+    return _heuristic_caches[domain_key]
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far, or None where it can't be measured."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def run_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Solves one (instance, algorithm) job. The job only carries plain data (domain,
+    start state, search function and kwargs) and the result holds the action path
+    instead of a Node chain, so both can be sent to and from worker processes.
+
+    With job['profile'] set, searches that accept an observer run under a
+    SearchProfiler and its report is returned under 'profile'.
+
+    With job['cache'] set to a SolutionCache path (one connection per process, see
+    open_solution_cache), a cached result for the same key
+    is returned without searching ('cache': 'hit'); otherwise the solution is stored
+    and astar may stop early on states with cached exact distances. Only solutions
+    known to be optimal contribute exact distances.
+
+    job['budget'], a dict of SearchBudget limits (timeout in seconds, max_expansions,
+    max_frontier), starts its clock when the search starts. A search stopped by it
+    has metrics['status'] == 'budget_exceeded' and is never cached.
+
+    With job['compile'] set to a state limit, the search runs on the problem's
+    compiled state graph (integer states, CSR edges) when the reachable space has at
+    most that many states, and on the problem itself otherwise
+    (metrics['compile_skipped']).
+
+    With job['heuristic_cache'] (capacity, policy and an optional preload path),
+    every heuristic lookup (incremental heuristic_delta updates included, which then
+    become full lookups) goes through a bounded cache shared by all of this
+    process's jobs in the domain; the job's hits, misses and evictions are added to
+    its metrics. Compiled searches keep their own per-state heuristic table instead.
+
+    Every job first goes through analyze_problem; invalid or unsolvable start states
+    return at once with zeroed metrics and metrics['search_run'] = False.
+    """
+    analysis = analyze_problem(job['domain'], job['state'], job.get('size'))
+    if analysis['status'] != 'ok':
+        return {
+            'instance': job['instance'],
+            'name': job['name'],
+            'actions': None,
+            'solution_cost': None,
+            'solution_depth': None,
+            'metrics': {'nodes_generated': 0, 'nodes_expanded': 0, 'max_frontier_size': 0, 'search_run': False},
+            'wall_time': 0.0,
+            'cpu_time': 0.0,
+            'peak_rss_mb': peak_rss_mb(),
+            'worker': os.getpid(),
+            'profile': None,
+            'cache': None,
+            'analysis': analysis,
+        }
+
+    problem = build_problem(job['domain'], job['state'], job.get('packed', False), job.get('size'))
+    kwargs = job['kwargs']
+    cache = open_solution_cache(job['cache']) if job.get('cache') else None
+    if cache is not None:
+        domain_key, algorithm_key, heuristic_key = cache_key(job)
+        start_wall = time.perf_counter()
+        cached = cache.lookup(domain_key, problem.initial_state, algorithm_key, heuristic_key)
+        if cached is not None:
+            return {
+                'instance': job['instance'],
+                'name': job['name'],
+                'actions': cached['actions'],
+                'solution_cost': cached['cost'],
+                'solution_depth': len(cached['actions']) if cached['actions'] is not None else None,
+                'metrics': cached['metrics'],
+                'wall_time': time.perf_counter() - start_wall,
+                'cpu_time': 0.0,
+                'peak_rss_mb': peak_rss_mb(),
+                'worker': os.getpid(),
+                'profile': None,
+                'cache': 'hit',
+                'analysis': analysis,
+            }
+        if job['func'] is astar and not job.get('compile'):
+            kwargs = dict(kwargs, exact_distances=_cached_exact_distances(cache, domain_key))
+
+    search_problem = problem
+    compiled = None
+    if job.get('compile'):
+        compiled = _compiled_problem(problem, cache_key(job)[0], job['compile'])
+        search_problem = compiled or problem
+    heuristic_cache = None
+    if job.get('heuristic_cache') and compiled is None:
+        heuristic_cache = _heuristic_cache(cache_key(job)[0], job['heuristic_cache'])
+        search_problem = CachedHeuristicProblem(problem, heuristic_cache)
+        counts_before = heuristic_cache.counts()
+
+    profiler = None
+    if job.get('profile') and 'observer' in inspect.signature(job['func']).parameters:
+        profiler = SearchProfiler()
+        kwargs = dict(kwargs, observer=profiler)
+
+    if job.get('budget'):
+        limits = dict(job['budget'])
+        kwargs = dict(kwargs, budget=SearchBudget.with_timeout(limits.pop('timeout', None), **limits))
+
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+    solution_node, metrics = job['func'](search_problem, **kwargs)
+    wall_time = time.perf_counter() - start_wall
+    cpu_time = time.process_time() - start_cpu
+    if compiled is not None:
+        solution_node = compiled.decompile(solution_node)
+        metrics['compiled_states'] = len(compiled)
+    elif job.get('compile'):
+        metrics['compile_skipped'] = 1
+    if heuristic_cache is not None:
+        hits, misses, evictions = (now - before for now, before in zip(heuristic_cache.counts(), counts_before))
+        if hits + misses:
+            metrics.update(heuristic_cache_hits=hits, heuristic_cache_misses=misses,
+                           heuristic_cache_evictions=evictions, heuristic_cache_hit_rate=hits / (hits + misses))
+
+    profile = None
+    if profiler is not None:
+        profile = profiler.report(wall_time, metrics['nodes_generated'],
+                                  solution_node.depth if solution_node else None)
+
+    actions = solution_actions(solution_node) if solution_node else None
+    if cache is not None and 'budget_hit' not in metrics:
+        # Only an optimal solution's path has exact goal distances; weighted A* and
+        # ARA* report a suboptimality bound above 1 when theirs may not be.
+        optimal = metrics.get('suboptimality_bound', 1) <= 1
+        path = solution_path(problem, actions) if actions is not None and optimal else None
+        solution_id = cache.store(domain_key, problem.initial_state, algorithm_key, heuristic_key,
+                                  solution_node.path_cost if solution_node else None, actions, metrics, path)
+        if path is not None and (cache.path, domain_key) in _exact_distances:
+            _exact_distances[cache.path, domain_key].add(solution_id, actions, path)
+
+    return {
+        'instance': job['instance'],
+        'name': job['name'],
+        'actions': actions,
+        'solution_cost': solution_node.path_cost if solution_node else None,
+        'solution_depth': solution_node.depth if solution_node else None,
+        'metrics': metrics,
+        'wall_time': wall_time,
+        'cpu_time': cpu_time,
+        'peak_rss_mb': peak_rss_mb(),
+        'worker': os.getpid(),
+        'profile': profile,
+        'cache': 'miss' if cache is not None else None,
+        'analysis': analysis,
+    }
@@ -0,0 +1,333 @@
+import argparse
+import asyncio
+import collections
+import http.client
+import json
+import os
+import socket
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from search_core import (astar, astar_batched, ara_star, bfs, bidirectional_astar, bidirectional_bfs, ida_star,
+                         ids, oracle_search)
+from solver import ALGORITHMS, DOMAIN_NAMES, SINGLE_RUN_ALGORITHMS, open_solution_cache, resolve_algorithm, run_job, skip_reason
+from parallel_search import hda_star
+
+DEFAULT_ADDRESS = 'http://127.0.0.1:8765'
+
+# Search functions a request may name directly, with the rest of its kwargs under 'options'.
+SEARCH_FUNCTIONS = {func.__name__: func for func in (
+    bfs, ids, astar, astar_batched, ara_star, ida_star, oracle_search, bidirectional_bfs, bidirectional_astar, hda_star)}
+
+# Latencies kept for the percentiles in /stats, and the window for the recent throughput.
+LATENCY_WINDOW = 1000
+THROUGHPUT_WINDOW_SECONDS = 60.0
+
+def request_job(request: Dict[str, Any], cache: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Turns a JSON solve request into a solver.run_job job. Fields: domain, state,
+    algorithm (a --gentable key such as 'astar_h2', a single-run name such as
+    'astar' with heuristic, or a search_core function name such as 'ara_star'),
+    heuristic, and optionally size, packed, options (extra search kwargs, e.g.
+    weight), timeout, max_nodes and compile (a state limit). Raises ValueError for a malformed request.
+    """
+    domain = request.get('domain')
+    if domain not in DOMAIN_NAMES:
+        raise ValueError(f"domain must be one of {', '.join(DOMAIN_NAMES)}")
+    algorithm = request.get('algorithm')
+    heuristic = request.get('heuristic')
+    if algorithm in ALGORITHMS:
+        name, func, kwargs = ALGORITHMS[algorithm]
+    elif algorithm in SINGLE_RUN_ALGORITHMS:
+        name, func, kwargs = resolve_algorithm(algorithm, heuristic)
+    elif algorithm in SEARCH_FUNCTIONS:
+        func = SEARCH_FUNCTIONS[algorithm]
+        name, kwargs = algorithm, {'heuristic_variant': heuristic} if heuristic else {}
+    else:
+        raise ValueError(f"unknown algorithm: {algorithm}")
+    reason = skip_reason(algorithm, domain)
+    if reason:
+        raise ValueError(f"{algorithm} can't run on {domain}: {reason}")
+    options = request.get('options') or {}
+    if not isinstance(options, dict) or any(key in ('observer', 'exact_distances', 'budget') for key in options):
+        raise ValueError("options must be an object of plain search keyword arguments")
+
+    if domain == 'wgc':
+        state = ('0', '0', '0', '0')
+    else:
+        try:
+            state = tuple(int(tile) for tile in request['state'])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("state must be a list of integers") from None
+    budget = {'timeout': request.get('timeout'), 'max_expansions': request.get('max_nodes')}
+    return {
+        'instance': 0, 'domain': domain, 'state': state, 'packed': bool(request.get('packed')),
+        'size': request.get('size', 4) if domain == 'npuzzle' else None,
+        'name': request.get('name') or name, 'func': func, 'kwargs': dict(kwargs, **options),
+        'profile': bool(request.get('profile')), 'cache': cache, 'compile': request.get('compile'),
+        'budget': budget if any(value is not None for value in budget.values()) else None,
+    }
+
+def job_request(job: Dict[str, Any]) -> Dict[str, Any]:
+    """The JSON request for a run.py job (the inverse of request_job)."""
+    options = dict(job['kwargs'])
+    heuristic = options.pop('heuristic_variant', None)
+    budget = job.get('budget') or {}
+    return {
+        'domain': job['domain'], 'state': list(job['state']), 'size': job.get('size'), 'packed': job.get('packed', False),
+        'algorithm': job['func'].__name__, 'heuristic': heuristic, 'options': options, 'name': job['name'],
+        'profile': job.get('profile', False), 'compile': job.get('compile'), 'timeout': budget.get('timeout'), 'max_nodes': budget.get('max_expansions'),
+    }
+
+def _coalesce_key(job: Dict[str, Any]) -> str:
+    """Jobs with equal keys would produce the same result, so one search answers all of them."""
+    return json.dumps([job['domain'], job['size'], job['packed'], list(job['state']), job['func'].__name__,
+                       sorted(job['kwargs'].items()), job['profile'], job['compile'], sorted((job['budget'] or {}).items())])
+
+def _warm_worker(domains: Tuple[str, ...], cache: Optional[str] = None):
+    """
+    Process-pool initializer: loads (building if needed) the tables a worker will
+    search with, and opens the worker's one solution cache connection.
+    """
+    if cache:
+        open_solution_cache(cache)
+    if '8puzzle' in domains:
+        from domains.eight_puzzle import GOAL_STATE, EightPuzzleProblem
+        problem = EightPuzzleProblem(GOAL_STATE)
+        for variant in ('h1', 'h2', 'h3', 'hstar'):
+            problem.heuristic(GOAL_STATE, variant)
+    if 'npuzzle' in domains:
+        import domains.n_puzzle  # noqa: F401
+
+def _ready() -> int:
+    return os.getpid()
+
+class SolverService:
+    """
+    Asyncio HTTP front end for run_job. CPU-bound searches go to a pool of warm
+    worker processes; identical requests that arrive while a search for them is
+    running wait for that search instead of starting another.
+
+    POST /solve takes a request_job() JSON body and returns the run_job result plus
+    'latency_s' and 'coalesced'. GET /stats returns the counters described in stats().
+    """
+
+    def __init__(self, workers: int = 1, cache: Optional[str] = None, warm: Tuple[str, ...] = ('8puzzle', 'wgc')):
+        self.workers = workers
+        self.cache = cache
+        self.warm = warm
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.started = time.monotonic()
+        self.counters = collections.Counter()
+        self.pending_searches = 0
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self._completions = collections.deque()
+
+    async def start(self):
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker, initargs=(self.warm, self.cache))
+        loop = asyncio.get_running_loop()
+        # One call per worker starts them all now, so the first requests find warm tables.
+        await asyncio.gather(*(loop.run_in_executor(self.executor, _ready) for _ in range(self.workers)))
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+
+    async def _search(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        self.pending_searches += 1
+        self.counters['searches'] += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, run_job, job)
+        finally:
+            self.pending_searches -= 1
+
+    async def solve(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        job = request_job(request, self.cache)
+        self.counters['requests'] += 1
+        key = _coalesce_key(job)
+        future = self._in_flight.get(key)
+        coalesced = future is not None
+        if coalesced:
+            self.counters['coalesced'] += 1
+        else:
+            future = asyncio.ensure_future(self._search(job))
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # shield: a client that disconnects must not cancel a search others may share.
+        result = dict(await asyncio.shield(future))
+        latency = time.perf_counter() - start
+        self._latencies.append(latency)
+        self._completions.append(time.monotonic())
+        self.counters['completed'] += 1
+        result.update({'name': job['name'], 'latency_s': latency, 'coalesced': coalesced})
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Request counters, searches running or queued (queue_depth counts the ones
+        waiting for a free worker), latency percentiles over the last LATENCY_WINDOW
+        requests, and throughput since start and over the last minute.
+        """
+        now = time.monotonic()
+        while self._completions and now - self._completions[0] > THROUGHPUT_WINDOW_SECONDS:
+            self._completions.popleft()
+        uptime = now - self.started
+        latencies = sorted(self._latencies)
+        latency = None
+        if latencies:
+            latency = {
+                'mean': statistics.fmean(latencies), 'p50': latencies[len(latencies) // 2],
+                'p95': latencies[max(int(0.95 * len(latencies) + 0.5) - 1, 0)], 'max': latencies[-1],
+            }
+        return {
+            'uptime_s': uptime,
+            'workers': self.workers,
+            'requests': self.counters['requests'],
+            'completed': self.counters['completed'],
+            'coalesced': self.counters['coalesced'],
+            'searches': self.counters['searches'],
+            'errors': self.counters['errors'],
+            'in_flight_searches': self.pending_searches,
+            'queue_depth': max(self.pending_searches - self.workers, 0),
+            'latency_s': latency,
+            'throughput_rps': self.counters['completed'] / uptime if uptime > 0 else 0.0,
+            'recent_throughput_rps': len(self._completions) / min(uptime, THROUGHPUT_WINDOW_SECONDS) if uptime > 0 else 0.0,
+        }
+
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        if method == 'GET' and path == '/stats':
+            return 200, self.stats()
+        if method == 'POST' and path == '/solve':
+            try:
+                request = json.loads(body)
+                if not isinstance(request, dict):
+                    raise ValueError("the request body must be a JSON object")
+                return 200, await self.solve(request)
+            except ValueError as e:
+                self.counters['errors'] += 1
+                return 400, {'error': str(e)}
+            except Exception as e:
+                self.counters['errors'] += 1
+                return 500, {'error': f"{type(e).__name__}: {e}"}
+        return 404, {'error': f"no route for {method} {path}"}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Minimal HTTP/1.1: JSON in and out, keep-alive unless the client sends Connection: close."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+                status, payload = await self._route(method, path, body)
+                data = json.dumps(payload).encode()
+                writer.write(f"HTTP/1.1 {status} {http.client.responses[status]}\r\n"
+                             f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data)
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+async def serve(address: str = DEFAULT_ADDRESS, workers: int = 1, cache: Optional[str] = None,
+                warm: Tuple[str, ...] = ('8puzzle', 'wgc')):
+    service = SolverService(workers, cache, warm)
+    await service.start()
+    if address.startswith('unix:'):
+        server = await asyncio.start_unix_server(service.handle_connection, path=address[len('unix:'):])
+    else:
+        host, port = _host_port(address)
+        server = await asyncio.start_server(service.handle_connection, host, port)
+    print(f"Solver service on {address} with {workers} warm worker(s).", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+def _host_port(address: str) -> Tuple[str, int]:
+    host = port = ''
+    if address.startswith('http://'):
+        host, _, port = address[len('http://'):].rstrip('/').partition(':')
+    if not host or not port.isdigit():
+        raise ValueError(f"service address must be http://HOST:PORT or unix:PATH, got {address!r}")
+    return host, int(port)
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: Optional[float] = None):
+        super().__init__('localhost', timeout=timeout)
+        self._path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
+
+class ServiceClient:
+    """Thin client for a running SolverService; safe to share between threads (one connection per call)."""
+
+    def __init__(self, address: str = DEFAULT_ADDRESS, timeout: Optional[float] = None):
+        self.address = address
+        self.timeout = timeout
+        if not address.startswith('unix:'):
+            _host_port(address)
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self.address.startswith('unix:'):
+            return _UnixHTTPConnection(self.address[len('unix:'):], self.timeout)
+        host, port = _host_port(self.address)
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    def _call(self, method: str, path: str, payload: Any = None) -> Any:
+        connection = self._connection()
+        try:
+            body = json.dumps(payload).encode() if payload is not None else None
+            connection.request(method, path, body=body, headers={'Content-Type': 'application/json', 'Connection': 'close'})
+            response = connection.getresponse()
+            data = json.loads(response.read())
+        finally:
+            connection.close()
+        if response.status != 200:
+            raise RuntimeError(f"solver service: {data.get('error', response.reason)}")
+        return data
+
+    def solve(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        return self._call('POST', '/solve', request)
+
+    def solve_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Runs a run.py job on the service; the result has run_job's shape."""
+        result = self.solve(job_request(job))
+        result['instance'] = job['instance']
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return self._call('GET', '/stats')
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-running solver service: JSON solve requests over localhost HTTP or a Unix socket.")
+    parser.add_argument('--address', type=str, default=DEFAULT_ADDRESS, help='http://HOST:PORT or unix:PATH to listen on.')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Search worker processes.')
+    parser.add_argument('--cache', type=str, metavar='PATH', help='SQLite solution cache shared by all requests.')
+    parser.add_argument('--warm', type=str, default='8puzzle,wgc', help='Comma-separated domains whose tables each worker loads at start.')
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.address, args.workers, args.cache, tuple(args.warm.split(','))))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,39 @@
+import csv
+import html
+import math
 import os
-from PIL import Image, ImageDraw, ImageFont
+import random
+import statistics
 from typing import Dict, Any, Tuple, List
 
-def _draw_single_table(draw: ImageDraw.Draw, instance_data: Dict, fonts: Dict):
+# PIL is imported inside the drawing functions, so console-only runs never load it.
+
+METRICS_ORDER = [
+    "Solution Cost", "Solution Depth", "Nodes Generated",
+    "Nodes Expanded", "Max Frontier Size"
+]
+SUMMARY_METRICS = METRICS_ORDER + ["Runtime (s)"]
+SUMMARY_COLUMNS = ["Depth", "Algorithm", "Metric", "Runs", "Mean", "Median", "P95", "Max"]
+# Values kept per (depth, algorithm, metric) for the median and p95.
+DEFAULT_SUMMARY_SAMPLE_SIZE = 1024
+
+def _load_fonts() -> Dict:
+    from PIL import ImageFont
+    try:
+        return {
+            'title': ImageFont.truetype("arialbd.ttf", 28),
+            'header': ImageFont.truetype("arialbd.ttf", 18),
+            'body': ImageFont.truetype("arial.ttf", 16)
+        }
+    except IOError:
+        print("Arial font not found. Using default font.")
+        return {
+            'title': ImageFont.load_default(),
+            'header': ImageFont.load_default(),
+            'body': ImageFont.load_default()
+        }
+
+def _draw_single_table(draw: 'ImageDraw.ImageDraw', instance_data: Dict, fonts: Dict):
     """Helper function to draw one complete table on the provided canvas."""
     
     results_data = instance_data['results_data']
@@ -11,10 +42,7 @@ def _draw_single_table(draw: ImageDraw.Draw, instance_data: Dict, fonts: Dict):
     
     algorithms = list(results_data.keys())
     
-    metrics_order = [
-        "Solution Cost", "Solution Depth", "Nodes Generated", 
-        "Nodes Expanded", "Max Frontier Size"
-    ]
+    metrics_order = METRICS_ORDER
     
     # --- Configuration ---
     margin = 40
@@ -92,6 +120,7 @@ def generate_table_images(instance_results: List[Dict[str, Any]]):
     if not instance_results:
         print("No results data provided to generate table.")
         return
+    from PIL import Image, ImageDraw
 
     # --- Create output directory if it doesn't exist ---
     output_dir = "table_results"
@@ -100,19 +129,7 @@ def generate_table_images(instance_results: List[Dict[str, Any]]):
         print(f"Created directory: '{output_dir}'")
     
     # --- Load fonts once ---
-    try:
-        fonts = {
-            'title': ImageFont.truetype("arialbd.ttf", 28),
-            'header': ImageFont.truetype("arialbd.ttf", 18),
-            'body': ImageFont.truetype("arial.ttf", 16)
-        }
-    except IOError:
-        print("Arial font not found. Using default font.")
-        fonts = {
-            'title': ImageFont.load_default(),
-            'header': ImageFont.load_default(),
-            'body': ImageFont.load_default()
-        }
+    fonts = _load_fonts()
 
     # --- Loop through each instance and create a separate image ---
     for i, instance_data in enumerate(instance_results):
@@ -139,3 +156,128 @@ def generate_table_images(instance_results: List[Dict[str, Any]]):
         print(f"  - Saved table for instance {i+1} to '{full_path}'")
 
     print(f"\nGenerated {len(instance_results)} table image(s) in the '{output_dir}' directory.")
+
+class _RunningStats:
+    """Count, sum and max of a stream of values, plus a uniform reservoir sample of them for quantiles."""
+
+    def __init__(self, sample_size: int, rng: random.Random):
+        self.count = 0
+        self.total = 0.0
+        self.maximum = None
+        self.sample: List[float] = []
+        self._sample_size = sample_size
+        self._rng = rng
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+        if len(self.sample) < self._sample_size:
+            self.sample.append(value)
+        else:
+            slot = self._rng.randrange(self.count)
+            if slot < self._sample_size:
+                self.sample[slot] = value
+
+class SummaryAggregator:
+    """
+    Summarizes metric values per (solution depth, algorithm) as results stream in,
+    for a single summary instead of one table per instance. Runs without a solution
+    are grouped under depth 'unsolved'. Each metric keeps a running count, sum and
+    max, and a reservoir of up to sample_size values for the median and p95, so
+    memory does not grow with the number of runs; the quantiles are exact until a
+    group has more runs than that. Runtimes of solution cache hits are left out,
+    since no search ran.
+    """
+
+    def __init__(self, metrics: List[str] = SUMMARY_METRICS, sample_size: int = DEFAULT_SUMMARY_SAMPLE_SIZE,
+                 seed: int = 0):
+        self.metrics = metrics
+        self.sample_size = sample_size
+        self._rng = random.Random(seed)
+        self._stats: Dict[Tuple[Any, str], Dict[str, _RunningStats]] = {}
+
+    def add(self, algorithm: str, results: Dict[str, Any]):
+        depth = results.get("Solution Depth")
+        group = self._stats.setdefault((depth if isinstance(depth, int) else 'unsolved', algorithm),
+                                       {metric: _RunningStats(self.sample_size, self._rng) for metric in self.metrics})
+        cache_hit = results.get("Solution Cache") == 'hit'
+        for metric in self.metrics:
+            if cache_hit and metric == "Runtime (s)":
+                continue
+            value = results.get(metric)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                group[metric].add(value)
+
+    def rows(self) -> List[List[Any]]:
+        """One row per (depth, algorithm, metric), in SUMMARY_COLUMNS order."""
+        def group_order(key: Tuple[Any, str]) -> Tuple:
+            depth, _ = key
+            return (depth == 'unsolved', depth if depth != 'unsolved' else 0)
+
+        rows = []
+        for depth, algorithm in sorted(self._stats, key=group_order):
+            for metric, stats in self._stats[depth, algorithm].items():
+                if not stats.count:
+                    continue
+                ordered = sorted(stats.sample)
+                p95 = ordered[max(math.ceil(0.95 * len(ordered)) - 1, 0)]
+                rows.append([depth, algorithm, metric, stats.count, stats.total / stats.count,
+                             statistics.median(ordered), p95, stats.maximum])
+        return rows
+
+def _format_stat(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:,.4f}" if value < 10 else f"{value:,.1f}"
+    return f"{value:,}" if isinstance(value, int) else str(value)
+
+def _write_summary_image(rows: List[List[Any]], path: str, title: str):
+    from PIL import Image, ImageDraw
+    fonts = _load_fonts()
+    margin = 40
+    row_height = 36
+    col_widths = [90, 200, 190, 80, 150, 150, 150, 150]
+    img_width = margin * 2 + sum(col_widths)
+    table_y_start = 80
+    img_height = table_y_start + (len(rows) + 1) * row_height + margin
+
+    img = Image.new('RGB', (img_width, img_height), color=(245, 245, 245))
+    draw = ImageDraw.Draw(img)
+    draw.text((margin, 25), title, font=fonts['title'], fill=(10, 10, 10))
+    for r, row in enumerate([SUMMARY_COLUMNS] + rows):
+        row_y = table_y_start + r * row_height
+        if r == 0:
+            draw.rectangle([margin, row_y, margin + sum(col_widths), row_y + row_height], fill=(70, 130, 180))
+        current_x = margin
+        for c, value in enumerate(row):
+            text = value if r == 0 else _format_stat(value)
+            draw.text((current_x + 10, row_y + 9), text, font=fonts['header' if r == 0 else 'body'],
+                      fill=(255, 255, 255) if r == 0 else (50, 50, 50))
+            current_x += col_widths[c]
+        draw.line([(margin, row_y + row_height), (margin + sum(col_widths), row_y + row_height)], fill=(200, 200, 200), width=1)
+    img.save(path)
+
+def _write_summary_html(rows: List[List[Any]], path: str, title: str):
+    with open(path, 'w') as f:
+        f.write(f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title></head><body>\n")
+        f.write(f"<h1>{html.escape(title)}</h1>\n<table border=\"1\" cellspacing=\"0\" cellpadding=\"4\">\n")
+        f.write("<tr>" + "".join(f"<th>{html.escape(column)}</th>" for column in SUMMARY_COLUMNS) + "</tr>\n")
+        for row in rows:
+            f.write("<tr>" + "".join(f"<td>{html.escape(_format_stat(value))}</td>" for value in row) + "</tr>\n")
+        f.write("</table>\n</body></html>\n")
+
+def write_summary(aggregator: SummaryAggregator, path: str, title: str = "Performance Summary"):
+    """Writes the aggregate table as CSV, HTML or (for any other extension) a PNG image."""
+    rows = aggregator.rows()
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(SUMMARY_COLUMNS)
+            writer.writerows(rows)
+    elif extension in ('.html', '.htm'):
+        _write_summary_html(rows, path, title)
+    else:
+        _write_summary_image(rows, path, title)
+    print(f"\nWrote summary of {len(rows)} (depth, algorithm, metric) row(s) to '{path}'.")
@@ -0,0 +1,19 @@
+import random
+
+from domains.eight_puzzle import EightPuzzleProblem
+from domains.instance_generator import sample_unique
+from search_core import ara_star
+
+def test_improvements_respect_their_bounds():
+    for state in sample_unique(10, 'uniform', 3, rng=random.Random(19)):
+        problem = EightPuzzleProblem(state)
+        optimal = problem.heuristic(state, 'hstar')
+        node, metrics = ara_star(problem, 'h2', initial_weight=5.0, weight_step=1.0)
+        assert metrics['solutions']
+        costs = [improvement['cost'] for improvement in metrics['solutions']]
+        assert costs == sorted(costs, reverse=True)
+        for improvement in metrics['solutions']:
+            assert improvement['cost'] <= improvement['bound'] * optimal + 1e-9
+        assert node.path_cost == costs[-1]
+        if metrics['suboptimality_bound'] <= 1:
+            assert node.path_cost == optimal
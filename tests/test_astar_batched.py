@@ -0,0 +1,19 @@
+import random
+
+import pytest
+
+from domains.eight_puzzle import EightPuzzleProblem, PackedEightPuzzleProblem
+from domains.instance_generator import sample_unique
+from search_core import astar, astar_batched
+
+pytest.importorskip('numpy')
+
+@pytest.mark.parametrize('variant', ['h1', 'h2', 'h3'])
+def test_batched_metrics_match_scalar(variant):
+    for state in sample_unique(3, 'uniform', 3, rng=random.Random(13)):
+        for problem in (EightPuzzleProblem(state), PackedEightPuzzleProblem(state)):
+            node, metrics = astar(problem, variant)
+            for batch_size in (1, 64):
+                batched_node, batched_metrics = astar_batched(problem, variant, batch_size=batch_size)
+                assert batched_metrics == metrics
+                assert batched_node.path_cost == node.path_cost
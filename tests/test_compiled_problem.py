@@ -0,0 +1,32 @@
+import random
+
+from domains.eight_puzzle import EightPuzzleProblem
+from domains.instance_generator import sample_unique
+from search_core import astar, bidirectional_astar, bidirectional_bfs, compile_problem
+
+def _actions(node):
+    actions = []
+    while node is not None and node.parent is not None:
+        actions.append(node.action)
+        node = node.parent
+    return actions[::-1]
+
+def test_compiled_searches_match_uncompiled():
+    states = sample_unique(3, 'uniform', 3, rng=random.Random(22))
+    compiled = compile_problem(EightPuzzleProblem(states[0]), max_states=200000)
+    searches = [
+        lambda problem: astar(problem, 'h2'),
+        lambda problem: bidirectional_astar(problem, 'h2'),
+        lambda problem: bidirectional_astar(problem, 'h0'),
+        bidirectional_bfs,
+    ]
+    for state in states:
+        problem = EightPuzzleProblem(state)
+        view = compiled.with_start(state, problem)
+        for search in searches:
+            node, metrics = search(problem)
+            compiled_node, compiled_metrics = search(view)
+            assert compiled_metrics == metrics
+            decoded = view.decompile(compiled_node)
+            assert decoded.path_cost == node.path_cost
+            assert _actions(decoded) == _actions(node)
@@ -0,0 +1,21 @@
+import collections
+
+from domains.distance_oracle import load_distance_table
+from domains.eight_puzzle import GOAL_STATE, PackedEightPuzzleProblem
+from domains.n_puzzle import NPuzzleProblem, goal_state, pack_tiles, tile_bits, unpack_tiles
+from search_core import external_bfs
+
+def test_eight_puzzle_layers_match_oracle(tmp_path):
+    # A tiny budget forces many sorted runs per layer through the merge.
+    counts, metrics = external_bfs(PackedEightPuzzleProblem(GOAL_STATE), memory_budget_mb=0.01,
+                                   work_dir=str(tmp_path), state_bits=40)
+    histogram = collections.Counter(d for d in load_distance_table()[:] if d != 255)
+    assert counts == [histogram[depth] for depth in range(len(histogram))]
+    assert sum(counts) == 181440 and len(counts) == 32
+    assert metrics['sorted_runs'] > len(counts)
+    assert not list(tmp_path.iterdir())
+
+def test_fifteen_puzzle_prefix():
+    counts, _ = external_bfs(NPuzzleProblem(goal_state(4), 4), memory_budget_mb=0.05, state_bits=tile_bits(4) * 16,
+                             encode=lambda s: pack_tiles(s, 4), decode=lambda v: unpack_tiles(v, 4), max_depth=10)
+    assert counts == [1, 2, 4, 10, 24, 54, 107, 212, 446, 946, 1948]
@@ -0,0 +1,61 @@
+from domains.eight_puzzle import EightPuzzleProblem
+from heuristic_cache import (CachedHeuristicProblem, ClockHeuristicCache, LRUHeuristicCache, load_heuristic_entries,
+                             save_heuristic_caches, state_key)
+from search_core import astar
+
+def _keys(cache):
+    return sorted(key for key, _ in cache.items())
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUHeuristicCache(2)
+    cache.put(('h2', 'a'), 1)
+    cache.put(('h2', 'b'), 2)
+    assert cache.get(('h2', 'a')) == 1
+    cache.put(('h2', 'c'), 3)
+    assert _keys(cache) == [('h2', 'a'), ('h2', 'c')]
+    assert cache.get(('h2', 'b')) is None
+    assert cache.counts() == (1, 1, 1)
+
+def test_clock_gives_referenced_entries_a_second_chance():
+    cache = ClockHeuristicCache(3)
+    for value, name in enumerate('abc'):
+        cache.put(('h2', name), value)
+    # Every bit is set, so the hand clears them all and evicts the first entry.
+    cache.put(('h2', 'd'), 3)
+    assert _keys(cache) == [('h2', 'b'), ('h2', 'c'), ('h2', 'd')]
+    # b's bit is still clear, c's is set again by the hit.
+    assert cache.get(('h2', 'c')) == 2
+    cache.put(('h2', 'e'), 4)
+    assert _keys(cache) == [('h2', 'c'), ('h2', 'd'), ('h2', 'e')]
+    assert cache.counts() == (1, 0, 2)
+
+def test_save_and_preload_round_trip(tmp_path):
+    path = str(tmp_path / 'hcache.json')
+    boards = LRUHeuristicCache(10)
+    boards.preload([('h3', (1, 2, 3, 4, 5, 6, 7, 0, 8), 1), ('h3', (1, 2, 3, 4, 5, 6, 0, 7, 8), 2)])
+    packed = ClockHeuristicCache(10)
+    packed.preload([('h2', 123456789, 7)])
+    save_heuristic_caches({'8puzzle': boards, '8puzzle_packed': packed}, path)
+
+    for domain, original in (('8puzzle', boards), ('8puzzle_packed', packed)):
+        restored = LRUHeuristicCache(10)
+        assert restored.preload(load_heuristic_entries(path, domain)) == len(original)
+        assert dict(restored.items()) == dict(original.items())
+        # Preloading is not a lookup.
+        assert restored.counts() == (0, 0, 0)
+    assert load_heuristic_entries(path, 'npuzzle') == []
+    assert load_heuristic_entries(str(tmp_path / 'missing.json'), '8puzzle') == []
+
+def test_every_child_lookup_goes_through_the_cache():
+    state = (8, 6, 7, 2, 5, 4, 3, 0, 1)
+    node, metrics = astar(EightPuzzleProblem(state), 'h2')
+    cache = LRUHeuristicCache(1000000)
+    cached_node, cached_metrics = astar(CachedHeuristicProblem(EightPuzzleProblem(state), cache), 'h2')
+    assert cached_metrics == metrics and cached_node.path_cost == node.path_cost
+    hits, misses, evictions = cache.counts()
+    assert hits + misses == metrics['nodes_generated'] and misses == len(cache) and evictions == 0
+    assert cache.get(('h2', state_key(state))) == EightPuzzleProblem(state).heuristic(state, 'h2')
+
+    # A second search finds every value in the cache.
+    astar(CachedHeuristicProblem(EightPuzzleProblem(state), cache), 'h2')
+    assert cache.misses == misses
@@ -0,0 +1,24 @@
+from domains.eight_puzzle import EightPuzzleProblem
+from domains.n_puzzle import NPuzzleProblem
+from search_core import bfs, dls, ids
+
+def test_ids_stops_when_no_depth_has_a_solution():
+    # Swapping two tiles of the 2x2 goal leaves the goal unreachable; 12 states are.
+    node, metrics = ids(NPuzzleProblem((2, 1, 3, 0)))
+    assert node is None
+    assert 'cutoff' not in metrics
+
+def test_dls_reports_no_cutoff_once_the_space_is_covered():
+    # The 12 states form a cycle, so none is more than 6 moves from the start.
+    problem = NPuzzleProblem((2, 1, 3, 0))
+    assert dls(problem, 5)[1]['cutoff'] is True
+    assert dls(problem, 6)[1]['cutoff'] is False
+
+def test_ids_finds_a_shortest_solution():
+    problem = EightPuzzleProblem((1, 2, 3, 4, 0, 6, 7, 5, 8))
+    node, _ = ids(problem)
+    assert node.depth == bfs(problem)[0].depth
+
+def test_ids_max_depth_reports_cutoff():
+    node, metrics = ids(EightPuzzleProblem((8, 6, 7, 2, 5, 4, 3, 0, 1)), max_depth=5)
+    assert node is None and metrics['cutoff'] is True
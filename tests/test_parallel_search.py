@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+from domains.eight_puzzle import GOAL_STATE, EightPuzzleProblem
+from domains.instance_generator import sample_unique
+from parallel_search import hda_star
+from search_budget import BUDGET_EXCEEDED, SearchBudget
+
+def _instances(count=4, seed=11):
+    return sample_unique(count, 'uniform', 3, rng=random.Random(seed))
+
+def _check_path(problem, node):
+    cost = 0
+    while node.parent is not None:
+        assert problem.result(node.parent.state, node.action) == node.state
+        cost += problem.step_cost(node.parent.state, node.action)
+        node = node.parent
+    assert node.state == problem.initial_state
+    return cost
+
+@pytest.mark.parametrize('workers', [1, 2, 3])
+@pytest.mark.parametrize('batch_size', [1, 64])
+def test_hda_star_is_optimal(workers, batch_size):
+    for state in _instances():
+        problem = EightPuzzleProblem(state)
+        node, metrics = hda_star(problem, 'h2', workers=workers, batch_size=batch_size)
+        optimal = problem.heuristic(state, 'hstar')
+        assert node.path_cost == optimal
+        assert _check_path(problem, node) == optimal
+        assert len(metrics['workers']) == workers
+        assert metrics['nodes_expanded'] == sum(w['nodes_expanded'] for w in metrics['workers'])
+
+def test_hda_star_goal_start():
+    node, metrics = hda_star(EightPuzzleProblem(GOAL_STATE), 'h2', workers=3)
+    assert node.state == GOAL_STATE and node.parent is None and node.path_cost == 0
+    assert metrics['nodes_expanded'] == 0
+
+def test_hda_star_budget_stop():
+    problem = EightPuzzleProblem(_instances(1)[0])
+    node, metrics = hda_star(problem, 'h1', workers=2, budget=SearchBudget(max_expansions=50))
+    assert node is None
+    assert metrics['status'] == BUDGET_EXCEEDED
+    assert metrics['budget_hit'] == 'max_expansions'
@@ -0,0 +1,77 @@
+import random
+
+from domains.eight_puzzle import EightPuzzleProblem
+from domains.instance_generator import sample_unique
+from search_core import astar
+from solution_cache import SolutionCache
+from solver import run_job
+
+def _job(state, cache_path, kwargs, name='A* (h2)', budget=None):
+    return {'instance': 0, 'domain': '8puzzle', 'state': state, 'packed': False, 'size': None,
+            'name': name, 'func': astar, 'kwargs': kwargs, 'profile': False, 'cache': cache_path,
+            'budget': budget}
+
+def _state(seed=5):
+    return sample_unique(1, 'uniform', 3, rng=random.Random(seed))[0]
+
+def test_weighted_and_budget_results_give_no_exact_distances(tmp_path):
+    cache_path = str(tmp_path / 'cache.sqlite')
+    state = _state()
+    weighted = run_job(_job(state, cache_path, {'heuristic_variant': 'h2', 'weight': 3}, 'A* (h2) [w=3]'))
+    assert weighted['actions'] is not None
+    stopped = run_job(_job(state, cache_path, {'heuristic_variant': 'h1'}, 'A* (h1)', budget={'max_expansions': 5}))
+    assert stopped['actions'] is None and stopped['metrics']['budget_hit'] == 'max_expansions'
+    with SolutionCache(cache_path) as cache:
+        assert len(cache.exact_distances('8puzzle')) == 0
+        # The budget-stopped run is not stored at all, so the next run searches again.
+        assert cache.stats()['solutions'] == 1
+    rerun = run_job(_job(state, cache_path, {'heuristic_variant': 'h1'}, 'A* (h1)', budget={'max_expansions': 5}))
+    assert rerun['cache'] == 'miss'
+
+def test_cache_hit_matches_fresh_search(tmp_path):
+    cache_path = str(tmp_path / 'cache.sqlite')
+    state = _state()
+    optimal = EightPuzzleProblem(state).heuristic(state, 'hstar')
+    fresh = run_job(_job(state, cache_path, {'heuristic_variant': 'h2'}))
+    assert fresh['cache'] == 'miss' and fresh['solution_cost'] == optimal
+    hit = run_job(_job(state, cache_path, {'heuristic_variant': 'h2'}))
+    assert hit['cache'] == 'hit'
+    assert hit['solution_cost'] == fresh['solution_cost'] and hit['actions'] == fresh['actions']
+    with SolutionCache(cache_path) as cache:
+        assert len(cache.exact_distances('8puzzle')) == len(fresh['actions']) + 1
+
+def test_exact_distance_early_stop_stays_optimal(tmp_path):
+    cache_path = str(tmp_path / 'cache.sqlite')
+    state = _state(7)
+    first = run_job(_job(state, cache_path, {'heuristic_variant': 'h1'}))
+    # A start state two moves along the cached path has an exact distance, so astar splices in the cached suffix.
+    problem = EightPuzzleProblem(state)
+    inner = problem.result(state, first['actions'][0])
+    inner = problem.result(inner, first['actions'][1])
+    second = run_job(_job(inner, cache_path, {'heuristic_variant': 'h1'}))
+    assert second['solution_cost'] == problem.heuristic(inner, 'hstar')
+    assert 'cached_suffix' in second['metrics']
+
+def test_lru_eviction_drops_distances(tmp_path):
+    with SolutionCache(str(tmp_path / 'cache.sqlite'), max_solutions=2) as cache:
+        for i in range(3):
+            cache.store('d', (i,), 'astar', 'h2', 1, ['a'], {}, [((i,), 0), ((9, i), 1)])
+            if i == 1:
+                assert cache.lookup('d', (0,), 'astar', 'h2') is not None
+        assert cache.lookup('d', (1,), 'astar', 'h2') is None
+        assert cache.lookup('d', (0,), 'astar', 'h2') is not None
+        distances = cache.exact_distances('d')
+        assert distances.get((1,)) is None and distances.get((2,)) == 1
+        assert cache.stats() == {'solutions': 2, 'distances': 4}
+
+def test_evicting_a_solution_keeps_distances_owned_by_another(tmp_path):
+    with SolutionCache(str(tmp_path / 'cache.sqlite'), max_solutions=2) as cache:
+        cache.store('d', (0,), 'astar', 'h2', 2, ['a', 'b'], {}, [((0,), 0), ((5,), 1), ((9,), 2)])
+        cache.store('d', (1,), 'astar', 'h2', 2, ['c', 'b'], {}, [((1,), 0), ((5,), 1), ((9,), 2)])
+        # Touch the first solution so the second is the one evicted.
+        assert cache.lookup('d', (0,), 'astar', 'h2') is not None
+        cache.store('d', (2,), 'astar', 'h2', 1, ['e'], {}, [((2,), 0), ((8,), 1)])
+        assert cache.lookup('d', (1,), 'astar', 'h2') is None
+        distances = cache.exact_distances('d')
+        assert distances.get((5,)) == 1 and distances.suffix((5,)) == ['b']
+        assert distances.get((9,)) == 0 and distances.get((1,)) is None
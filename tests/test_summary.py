@@ -0,0 +1,30 @@
+from table_generator import SummaryAggregator
+
+def _rows(aggregator):
+    return {(row[0], row[1], row[2]): row[3:] for row in aggregator.rows()}
+
+def test_small_groups_get_exact_statistics():
+    aggregator = SummaryAggregator()
+    for expanded in (5, 1, 3, 2, 4):
+        aggregator.add('A*', {'Solution Depth': 10, 'Nodes Expanded': expanded, 'Runtime (s)': 0.5})
+    aggregator.add('A*', {'Solution Depth': 'N/A', 'Nodes Expanded': 7})
+    rows = _rows(aggregator)
+    assert rows[10, 'A*', 'Nodes Expanded'] == [5, 3.0, 3, 5, 5]
+    assert rows['unsolved', 'A*', 'Nodes Expanded'] == [1, 7.0, 7, 7, 7]
+
+def test_large_groups_keep_a_bounded_sample():
+    aggregator = SummaryAggregator(sample_size=64)
+    for expanded in range(10000):
+        aggregator.add('A*', {'Solution Depth': 10, 'Nodes Expanded': expanded})
+    runs, mean, median, p95, maximum = _rows(aggregator)[10, 'A*', 'Nodes Expanded']
+    assert (runs, mean, maximum) == (10000, 4999.5, 9999)
+    assert 2000 < median < 8000 and median <= p95 <= maximum
+    assert len(aggregator._stats[10, 'A*']['Nodes Expanded'].sample) == 64
+
+def test_cache_hit_runtimes_are_left_out():
+    aggregator = SummaryAggregator()
+    aggregator.add('A*', {'Solution Depth': 10, 'Nodes Expanded': 8, 'Runtime (s)': 2.0, 'Solution Cache': 'miss'})
+    aggregator.add('A*', {'Solution Depth': 10, 'Nodes Expanded': 8, 'Runtime (s)': 0.0001, 'Solution Cache': 'hit'})
+    rows = _rows(aggregator)
+    assert rows[10, 'A*', 'Runtime (s)'] == [1, 2.0, 2.0, 2.0, 2.0]
+    assert rows[10, 'A*', 'Nodes Expanded'][0] == 2